@@ -0,0 +1,738 @@
+"""Evaluate a well-defined subset of XPath directly on the AST of Python source code."""
+
+import ast
+import functools
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import (
+    Any,
+    DefaultDict,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from pyastgrep import asts  # type: ignore
+from pyastgrep import search as pyastgrepsearch  # type: ignore
+
+# the kinds of nodes in the XML document that pyastgrep creates for an AST: the
+# document itself, the element of an AST node, the element of one of a node's
+# fields (like body) and the element of a literal in a list (like the names of
+# a global statement); note that text and attributes are not nodes of the tree
+DOCUMENT = 0
+NODE = 1
+FIELD = 2
+ITEM = 3
+
+ITEM_NAME = "item"
+NODE_TEST = "node()"
+WILDCARD = "*"
+
+# the axes that a step of a path can use, listing each reverse axis in the
+# document order of its results, which is the order used by elementpath
+CHILD_AXIS = "child"
+ATTRIBUTE_AXIS = "attribute"
+FORWARD_AXES = {
+    CHILD_AXIS,
+    "descendant",
+    "descendant-or-self",
+    "following-sibling",
+    "self",
+}
+REVERSE_AXES = {"ancestor", "ancestor-or-self", "parent", "preceding-sibling"}
+
+STRING_FUNCTIONS = {"contains", "starts-with"}
+
+TOKEN_PATTERN = re.compile(
+    r"""\s*(?:
+    (?P<operator>//|/|\[|\]|\(|\)|@|::|,|!=|=|\||\.\.|\.|\*)
+    |(?P<literal>"[^"]*"|'[^']*')
+    |(?P<name>[A-Za-z_][A-Za-z0-9_.\-]*)
+    |(?P<other>\S)
+    )""",
+    re.VERBOSE,
+)
+
+
+class UnsupportedPatternError(Exception):
+    """Signal that a pattern uses a part of XPath that is not in the supported subset."""
+
+
+@dataclass(frozen=True)
+class Step:
+    """Describe one step of a path: an axis, a name test and the predicates that filter its nodes."""
+
+    axis: str
+    name: str
+    predicates: Tuple[Any, ...] = ()
+
+
+@dataclass(frozen=True)
+class LocationPath:
+    """Describe a path that starts from the context node or from the document."""
+
+    absolute: bool
+    steps: Tuple[Tuple[str, Step], ...]
+
+
+@dataclass(frozen=True)
+class UnionPath:
+    """Describe the union of the nodes that several paths select."""
+
+    paths: Tuple[LocationPath, ...]
+
+
+@dataclass(frozen=True)
+class BooleanOperation:
+    """Describe the conjunction or the disjunction of two predicate expressions."""
+
+    operator: str
+    left: Any
+    right: Any
+
+
+@dataclass(frozen=True)
+class FunctionCall:
+    """Describe a call of not, contains or starts-with in a predicate."""
+
+    name: str
+    arguments: Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """Describe a comparison of the attributes that a path selects to a string literal."""
+
+    operator: str
+    path: LocationPath
+    literal: str
+
+
+@dataclass(frozen=True)
+class Literal:
+    """Describe a string literal."""
+
+    value: str
+
+
+Query = Union[LocationPath, UnionPath]
+
+
+class Element:
+    """Represent a node of pyastgrep's XML document for an AST without creating the document."""
+
+    __slots__ = ("kind", "name", "value", "parent", "index", "_children", "_order")
+
+    def __init__(  # noqa: PLR0913
+        self,
+        kind: int,
+        name: str,
+        value: Any,
+        parent: Optional["Element"] = None,
+        index: int = 0,
+    ) -> None:
+        """Define the kind, the name, the value and the place in the tree of the node."""
+        self.kind = kind
+        self.name = name
+        self.value = value
+        self.parent = parent
+        self.index = index
+        self._children: Optional[List[Element]] = None
+        self._order: Optional[Tuple[int, ...]] = None
+
+    def children(self) -> List["Element"]:
+        """Return the children of the node, creating them only the first time."""
+        # each node is only created once so that a node reached in two
+        # different ways is the same object, as required by XPath's node-sets
+        if self._children is None:
+            self._children = create_children(self)
+        return self._children
+
+    def order(self) -> Tuple[int, ...]:
+        """Return a key that sorts the nodes of the tree in document order."""
+        if self._order is None:
+            if self.parent is None:
+                self._order = ()
+            else:
+                self._order = (*self.parent.order(), self.index)
+        return self._order
+
+
+class Document(Element):
+    """Represent the document node of pyastgrep's XML document for an AST."""
+
+    __slots__ = ("_named_descendant_children", "selections")
+
+    def __init__(self, parsed_ast: ast.AST) -> None:
+        """Define the document node for the tree of an AST."""
+        super().__init__(DOCUMENT, "", parsed_ast)
+        self._named_descendant_children: Optional[Dict[str, List[Element]]] = None
+        # the nodes that each prefix of the patterns' paths selects from the root
+        self.selections: Dict[LocationPath, List[Element]] = {}
+
+    def named_descendant_children(self) -> Dict[str, List[Element]]:
+        """Index the children of the root element and of each of its descendants by name."""
+        # almost every pattern starts with a step like .//FunctionDef and thus
+        # the nodes of these steps are found with one walk of the whole tree
+        if self._named_descendant_children is None:
+            named_children: DefaultDict[str, List[Element]] = defaultdict(list)
+            for child in iter_descendant_children(self.children()[0], WILDCARD):
+                named_children[child.name].append(child)
+            self._named_descendant_children = dict(named_children)
+        return self._named_descendant_children
+
+
+def create_document(parsed_ast: ast.AST) -> Document:
+    """Create the document node for the tree of an AST."""
+    return Document(parsed_ast)
+
+
+def create_children(element: Element) -> List[Element]:
+    """Create the children of a node, mirroring pyastgrep's conversion of an AST to XML."""
+    children: List[Element] = []
+    # the only child of the document is the element of the root of the AST
+    if element.kind == DOCUMENT:
+        children.append(
+            Element(NODE, element.value.__class__.__name__, element.value, element)
+        )
+    # an AST node has an element for each of its fields that contains a node or
+    # a list, including an empty list; every other field becomes an attribute
+    elif element.kind == NODE:
+        for field_name in element.value._fields:
+            field_value = getattr(element.value, field_name)
+            if isinstance(field_value, (ast.AST, list)):
+                children.append(
+                    Element(FIELD, field_name, field_value, element, len(children))
+                )
+    # the element of a field contains an element for each of its nodes and
+    # an item element, with the literal as its text, for everything else
+    elif element.kind == FIELD:
+        field_values = (
+            [element.value] if isinstance(element.value, ast.AST) else element.value
+        )
+        for index, field_value in enumerate(field_values):
+            if isinstance(field_value, ast.AST):
+                children.append(
+                    Element(
+                        NODE,
+                        field_value.__class__.__name__,
+                        field_value,
+                        element,
+                        index,
+                    )
+                )
+            else:
+                children.append(Element(ITEM, ITEM_NAME, field_value, element, index))
+    return children
+
+
+def get_attributes(element: Element) -> Dict[str, str]:
+    """Get the attributes of a node, mirroring pyastgrep's conversion of an AST to XML."""
+    attributes: Dict[str, str] = {}
+    if element.kind != NODE:
+        return attributes
+    ast_node = element.value
+    for attribute_name in ("lineno", "col_offset"):
+        attribute_value = getattr(ast_node, attribute_name, None)
+        if attribute_value is not None:
+            attributes[attribute_name] = asts._encoded_literal(attribute_value)
+    # note that the type attribute records the type of the last literal field
+    for field_name in ast_node._fields:
+        field_value = getattr(ast_node, field_name)
+        if isinstance(field_value, (ast.AST, list)) or field_value is None:
+            continue
+        attributes["type"] = asts._encoded_literal(type(field_value).__name__)
+        attributes[field_name] = asts._encoded_literal(field_value)
+    return attributes
+
+
+def iter_descendants(element: Element, with_self: bool) -> Iterator[Element]:
+    """Iterate through the descendants of a node in document order."""
+    if with_self:
+        yield element
+    stack = list(reversed(element.children()))
+    while stack:
+        descendant = stack.pop()
+        yield descendant
+        stack.extend(reversed(descendant.children()))
+
+
+def iter_ancestors(element: Element, with_self: bool) -> Iterator[Element]:
+    """Iterate through the ancestors of a node in document order, starting at the document."""
+    ancestors: List[Element] = [element] if with_self else []
+    parent = element.parent
+    while parent is not None:
+        ancestors.append(parent)
+        parent = parent.parent
+    return reversed(ancestors)
+
+
+def iter_siblings(element: Element, following: bool) -> Iterator[Element]:
+    """Iterate through the following or the preceding siblings of a node in document order."""
+    if element.parent is None:
+        return iter(())
+    siblings = element.parent.children()
+    if following:
+        return iter(siblings[element.index + 1 :])
+    return iter(siblings[: element.index])
+
+
+def iter_axis(element: Element, axis: str) -> Iterator[Element]:
+    """Iterate through the nodes on an axis of a node."""
+    if axis == CHILD_AXIS:
+        return iter(element.children())
+    if axis in ("descendant", "descendant-or-self"):
+        return iter_descendants(element, axis == "descendant-or-self")
+    if axis in ("ancestor", "ancestor-or-self"):
+        return iter_ancestors(element, axis == "ancestor-or-self")
+    if axis == "parent":
+        return iter(() if element.parent is None else (element.parent,))
+    if axis == "self":
+        return iter((element,))
+    return iter_siblings(element, axis == "following-sibling")
+
+
+def is_name_match(element: Element, name: str) -> bool:
+    """Determine whether or not a node passes a name test."""
+    # the test of the self step in a path like .//If passes for every node
+    if name == NODE_TEST:
+        return True
+    if element.kind == DOCUMENT:
+        return False
+    return name in (WILDCARD, element.name)
+
+
+def get_document(element: Element) -> Document:
+    """Get the document node of the tree that contains a node."""
+    while element.parent is not None:
+        element = element.parent
+    return element  # type: ignore
+
+
+def select_path(path: LocationPath, context: Element) -> Iterator[Element]:
+    """Select the nodes of a path from a context node in the same order as elementpath."""
+    # the nodes of an absolute path, or of a path from the root of the AST like
+    # the pattern of every check, do not depend on the context node and thus
+    # the nodes of each of their prefixes are shared by all of the patterns
+    if path.absolute or isinstance(context.parent, Document):
+        return iter(select_shared_path(path, get_document(context)))
+    elements: Iterable[Element] = (context,)
+    for separator, step in path.steps:
+        elements = select_separated_step(separator, step, elements)
+    return iter(elements)
+
+
+def select_shared_path(path: LocationPath, document: Document) -> List[Element]:
+    """Select the nodes of a path from the document or its root, reusing the nodes of its prefixes."""
+    selected = document.selections.get(path, None)
+    if selected is not None:
+        return selected
+    if not path.steps:
+        return [document if path.absolute else document.children()[0]]
+    # the nodes of a path are the nodes that its last step selects from the nodes
+    # of its prefix, which is shared with every other path that starts the same
+    # way; note that the order of the nodes of a prefix does not depend on the
+    # steps after it, as in .//FunctionDef/body and .//FunctionDef/body//If
+    (separator, step) = path.steps[-1]
+    if step.predicates:
+        # a predicate only depends on the node that it filters and thus a step
+        # with predicates filters the nodes of the same step without them,
+        # as in .//FunctionDef and .//FunctionDef[not(contains(@name, "test_"))]
+        unfiltered_step = Step(step.axis, step.name)
+        unfiltered_path = LocationPath(
+            path.absolute, (*path.steps[:-1], (separator, unfiltered_step))
+        )
+        selected = [
+            element
+            for element in select_shared_path(unfiltered_path, document)
+            if all(is_true(predicate, element) for predicate in step.predicates)
+        ]
+    else:
+        prefix = LocationPath(path.absolute, path.steps[:-1])
+        selected = list(
+            select_separated_step(separator, step, select_shared_path(prefix, document))
+        )
+        # when an absolute path starts with //, elementpath sorts the nodes
+        # of its first step into document order
+        if path.absolute and len(path.steps) == 1 and separator == "//":
+            selected.sort(key=Element.order)
+    document.selections[path] = selected
+    return selected
+
+
+def select_separated_step(
+    separator: str, step: Step, elements: Iterable[Element]
+) -> Iterator[Element]:
+    """Select the nodes of a step from each of the nodes, removing the duplicates."""
+    # for each of the nodes, in order, select the nodes of the step from either
+    # the node itself or, for //, from the node and each of its descendants;
+    # like elementpath, the nodes are not sorted again after removing duplicates
+    selected: Set[Element] = set()
+    for element in elements:
+        if separator == "//" and step.axis == CHILD_AXIS:
+            candidates = find_descendant_children(element, step.name)
+        elif separator == "//":
+            candidates = (
+                selected_element
+                for step_context in iter_descendants(element, with_self=True)
+                for selected_element in iter_axis(step_context, step.axis)
+                if is_name_match(selected_element, step.name)
+            )
+        else:
+            candidates = (
+                selected_element
+                for selected_element in iter_axis(element, step.axis)
+                if is_name_match(selected_element, step.name)
+            )
+        for candidate in candidates:
+            if candidate not in selected and all(
+                is_true(predicate, candidate) for predicate in step.predicates
+            ):
+                selected.add(candidate)
+                yield candidate
+
+
+def find_descendant_children(element: Element, name: str) -> Iterable[Element]:
+    """Find the children with a name of a node and each of its descendants."""
+    # use the index of the document for the root element and for the document,
+    # whose only child is the root element, when looking for a name
+    if name != WILDCARD:
+        if isinstance(element, Document):
+            root = element.children()[0]
+            named_children = element.named_descendant_children().get(name, [])
+            return [root, *named_children] if root.name == name else named_children
+        if isinstance(element.parent, Document):
+            return element.parent.named_descendant_children().get(name, [])
+    return iter_descendant_children(element, name)
+
+
+def iter_descendant_children(element: Element, name: str) -> Iterator[Element]:
+    """Iterate through the children with a name of a node and each of its descendants."""
+    # this is the most common step, as in .//FunctionDef, and thus it walks the
+    # tree directly instead of iterating through the child axis of each node
+    stack = [element]
+    while stack:
+        descendant = stack.pop()
+        children = descendant.children()
+        for child in children:
+            if name in (WILDCARD, child.name):
+                yield child
+        stack.extend(reversed(children))
+
+
+def select_query(query: Query, context: Element) -> Iterator[Element]:
+    """Select the nodes of a path, or of a union of paths, from the context node."""
+    if isinstance(query, UnionPath):
+        # the nodes of a union are always sorted into document order
+        selected: Set[Element] = set()
+        for path in query.paths:
+            selected.update(select_path(path, context))
+        return iter(sorted(selected, key=Element.order))
+    return select_path(query, context)
+
+
+def get_string_values(path: LocationPath, context: Element) -> List[str]:
+    """Get the values of the attributes that a path ending in an attribute selects."""
+    (_, attribute_step) = path.steps[-1]
+    elements: Iterable[Element] = (context,)
+    if len(path.steps) > 1:
+        elements = select_path(LocationPath(path.absolute, path.steps[:-1]), context)
+    values: List[str] = []
+    for element in elements:
+        attribute_value = get_attributes(element).get(attribute_step.name, None)
+        if attribute_value is not None:
+            values.append(attribute_value)
+    return values
+
+
+def evaluate_string(argument: Any, context: Element) -> str:
+    """Evaluate the argument of a string function as a string."""
+    if isinstance(argument, Literal):
+        return argument.value
+    # the argument is a single attribute of the context node, whose string
+    # value is the empty string when the context node does not have it
+    values = get_string_values(argument, context)
+    return values[0] if values else ""
+
+
+def is_boolean_operation_true(expression: BooleanOperation, context: Element) -> bool:
+    """Evaluate a conjunction or a disjunction, only evaluating the right side when needed."""
+    if expression.operator == "and":
+        return is_true(expression.left, context) and is_true(expression.right, context)
+    return is_true(expression.left, context) or is_true(expression.right, context)
+
+
+def is_function_call_true(expression: FunctionCall, context: Element) -> bool:
+    """Evaluate a call of not, contains or starts-with."""
+    if expression.name == "not":
+        return not is_true(expression.arguments[0], context)
+    (string, substring) = (
+        evaluate_string(argument, context) for argument in expression.arguments
+    )
+    if expression.name == "contains":
+        return substring in string
+    return string.startswith(substring)
+
+
+def is_comparison_true(expression: Comparison, context: Element) -> bool:
+    """Evaluate a comparison, which is true when at least one of the attributes compares."""
+    values = get_string_values(expression.path, context)
+    if expression.operator == "=":
+        return any(value == expression.literal for value in values)
+    return any(value != expression.literal for value in values)
+
+
+def is_path_true(path: LocationPath, context: Element) -> bool:
+    """Evaluate a path, which is true when it selects at least one node or attribute."""
+    if path.steps[-1][1].axis == ATTRIBUTE_AXIS:
+        return len(get_string_values(path, context)) > 0
+    return next(select_path(path, context), None) is not None
+
+
+def is_true(expression: Any, context: Element) -> bool:
+    """Evaluate the effective boolean value of a predicate's expression for the context node."""
+    if isinstance(expression, BooleanOperation):
+        return is_boolean_operation_true(expression, context)
+    if isinstance(expression, FunctionCall):
+        return is_function_call_true(expression, context)
+    if isinstance(expression, Comparison):
+        return is_comparison_true(expression, context)
+    if isinstance(expression, Literal):
+        return len(expression.value) > 0
+    return is_path_true(expression, context)
+
+
+def find_positions(
+    query: Query, document: Element, xpath2: bool = True
+) -> List[pyastgrepsearch.Position]:
+    """Find the positions of the AST nodes that a query selects from the root of the tree."""
+    elements: Iterable[Element] = select_query(query, document.children()[0])
+    # XPath 1.0 always returns the nodes in document order, unlike elementpath
+    if not xpath2:
+        elements = sorted(elements, key=Element.order)
+    # only keep the nodes that correspond to an AST node with a position,
+    # which mirrors the matches created by pyastgrep
+    positions: List[pyastgrepsearch.Position] = []
+    for element in elements:
+        if element.kind == NODE:
+            position = pyastgrepsearch.position_from_node(element.value)
+            if position is not None:
+                positions.append(position)
+    return positions
+
+
+def tokenize(pattern: str) -> List[Tuple[str, str]]:
+    """Split a pattern into its tokens, rejecting the tokens outside of the supported subset."""
+    tokens: List[Tuple[str, str]] = []
+    index = 0
+    pattern = pattern.rstrip()
+    while index < len(pattern):
+        token_match = TOKEN_PATTERN.match(pattern, index)
+        if token_match is None or token_match.lastgroup == "other":
+            raise UnsupportedPatternError(pattern)
+        kind = str(token_match.lastgroup)
+        value = token_match.group(kind)
+        index = token_match.end()
+        # XPath 2.0, but not XPath 1.0, escapes a quote by doubling it
+        if kind == "literal" and pattern[index : index + 1] == value[0]:
+            raise UnsupportedPatternError(pattern)
+        tokens.append((kind, value))
+    return tokens
+
+
+class PatternParser:
+    """Parse a pattern in the supported subset of XPath with recursive descent."""
+
+    def __init__(self, pattern: str) -> None:
+        """Split the pattern into its tokens."""
+        self.tokens = tokenize(pattern)
+        self.index = 0
+
+    def peek(self, offset: int = 0) -> Tuple[str, str]:
+        """Return a token after the current one without consuming it."""
+        if self.index + offset < len(self.tokens):
+            return self.tokens[self.index + offset]
+        return ("end", "")
+
+    def is_next(self, value: str) -> bool:
+        """Determine whether or not the next token is an operator with the value."""
+        return self.peek() == ("operator", value)
+
+    def advance(self) -> Tuple[str, str]:
+        """Consume the current token and return it."""
+        token = self.peek()
+        if token[0] == "end":
+            raise UnsupportedPatternError(token)
+        self.index += 1
+        return token
+
+    def expect(self, value: str) -> None:
+        """Consume an operator with the value, which must be the next token."""
+        if not self.is_next(value):
+            raise UnsupportedPatternError(self.peek())
+        self.index += 1
+
+    def parse_query(self) -> Query:
+        """Parse a path or a union of paths, which must be all of the pattern."""
+        paths = [self.parse_path()]
+        while self.is_next("|"):
+            self.advance()
+            paths.append(self.parse_path())
+        if self.peek()[0] != "end":
+            raise UnsupportedPatternError(self.peek())
+        # the nodes of a query are the only results with a position and thus a
+        # path ending in an attribute is left to the XPath engines
+        for path in paths:
+            if path.steps[-1][1].axis == ATTRIBUTE_AXIS:
+                raise UnsupportedPatternError(path)
+        if len(paths) == 1:
+            return paths[0]
+        return UnionPath(tuple(paths))
+
+    def parse_path(self) -> LocationPath:
+        """Parse an absolute or a relative path, dropping a leading self step."""
+        absolute = self.is_next("/") or self.is_next("//")
+        steps: List[Tuple[str, Step]] = []
+        separator = self.advance()[1] if absolute else "/"
+        while True:
+            step = self.parse_step()
+            # the path ./body or .//body selects the same nodes as body or //body
+            # from the context node, with the only difference of the separator
+            if not (step == Step("self", NODE_TEST) and not absolute and not steps):
+                steps.append((separator, step))
+            if not (self.is_next("/") or self.is_next("//")):
+                break
+            separator = self.advance()[1]
+        if not steps:
+            steps.append(("/", Step("self", NODE_TEST)))
+        # the attribute axis can only be the last step of a path
+        if any(step.axis == ATTRIBUTE_AXIS for _, step in steps[:-1]):
+            raise UnsupportedPatternError(steps)
+        return LocationPath(absolute, tuple(steps))
+
+    def parse_step(self) -> Step:
+        """Parse one step of a path, with its axis, name test and predicates."""
+        if self.is_next("."):
+            self.advance()
+            return Step("self", NODE_TEST)
+        axis = CHILD_AXIS
+        if self.is_next("@"):
+            self.advance()
+            axis = ATTRIBUTE_AXIS
+        elif self.peek(1) == ("operator", "::"):
+            axis = self.advance()[1]
+            if axis not in FORWARD_AXES | REVERSE_AXES:
+                raise UnsupportedPatternError(axis)
+            self.advance()
+        (kind, name) = self.advance()
+        if not (kind == "name" or (kind, name) == ("operator", WILDCARD)):
+            raise UnsupportedPatternError(name)
+        # a function call, like text() or node(), is not a name test
+        if self.is_next("("):
+            raise UnsupportedPatternError(name)
+        predicates: List[Any] = []
+        while self.is_next("["):
+            if axis == ATTRIBUTE_AXIS:
+                raise UnsupportedPatternError(name)
+            self.advance()
+            predicates.append(self.parse_or())
+            self.expect("]")
+        return Step(axis, name, tuple(predicates))
+
+    def parse_or(self) -> Any:
+        """Parse a disjunction of predicate expressions."""
+        expression = self.parse_and()
+        while self.peek() == ("name", "or"):
+            self.advance()
+            expression = BooleanOperation("or", expression, self.parse_and())
+        return expression
+
+    def parse_and(self) -> Any:
+        """Parse a conjunction of predicate expressions."""
+        expression = self.parse_comparison()
+        while self.peek() == ("name", "and"):
+            self.advance()
+            expression = BooleanOperation("and", expression, self.parse_comparison())
+        return expression
+
+    def parse_comparison(self) -> Any:
+        """Parse a comparison of the attributes of a path to a string literal, or a primary expression."""
+        left = self.parse_primary()
+        if not (self.is_next("=") or self.is_next("!=")):
+            return left
+        operator = self.advance()[1]
+        right = self.parse_primary()
+        # the comparison is symmetric for the equality and the inequality
+        # of the attributes, which are always strings, and a string literal
+        if isinstance(left, Literal):
+            (left, right) = (right, left)
+        if not (
+            isinstance(left, LocationPath)
+            and left.steps[-1][1].axis == ATTRIBUTE_AXIS
+            and isinstance(right, Literal)
+        ):
+            raise UnsupportedPatternError(operator)
+        return Comparison(operator, left, right.value)
+
+    def parse_primary(self) -> Any:
+        """Parse a literal, a function call, a parenthesized expression or a path."""
+        (kind, value) = self.peek()
+        if kind == "literal":
+            self.advance()
+            return Literal(value[1:-1])
+        if self.is_next("("):
+            self.advance()
+            expression = self.parse_or()
+            self.expect(")")
+            return expression
+        if kind == "name" and self.peek(1) == ("operator", "("):
+            return self.parse_function_call()
+        return self.parse_path()
+
+    def parse_function_call(self) -> FunctionCall:
+        """Parse a call of one of the supported functions."""
+        name = self.advance()[1]
+        self.expect("(")
+        arguments = [self.parse_or()]
+        while self.is_next(","):
+            self.advance()
+            arguments.append(self.parse_or())
+        self.expect(")")
+        if name == "not" and len(arguments) == 1:
+            return FunctionCall(name, tuple(arguments))
+        # the arguments of a string function are literals or an attribute of
+        # the context node, whose values are the same for both XPath engines
+        if name in STRING_FUNCTIONS and len(arguments) == 2:  # noqa: PLR2004
+            for argument in arguments:
+                if not (
+                    isinstance(argument, Literal)
+                    or (
+                        isinstance(argument, LocationPath)
+                        and not argument.absolute
+                        and len(argument.steps) == 1
+                        and argument.steps[0][1].axis == ATTRIBUTE_AXIS
+                    )
+                ):
+                    raise UnsupportedPatternError(argument)
+            return FunctionCall(name, tuple(arguments))
+        raise UnsupportedPatternError(name)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_query(pattern: str) -> Optional[Query]:
+    """Compile a pattern into a query when it is in the supported subset of XPath."""
+    try:
+        return PatternParser(pattern).parse_query()
+    except UnsupportedPatternError:
+        return None
+
+
+def compile_queries(patterns: Iterable[str]) -> List[Optional[Query]]:
+    """Compile each of the patterns into a query when it is in the supported subset of XPath."""
+    return [compile_query(pattern) for pattern in patterns]
@@ -0,0 +1,437 @@
+"""Cache the XML-based representations of Python source code and their matches across analyses."""
+
+import hashlib
+import importlib.metadata
+import platform
+import sqlite3
+import time
+import zlib
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from lxml import etree  # type: ignore
+from lxml.etree import _Element  # type: ignore
+from pyastgrep import search as pyastgrepsearch  # type: ignore
+
+from chasten import constants
+
+DatabaseCacheType = TypeVar("DatabaseCacheType", bound="DatabaseCache")
+
+CREATE_TREES_TABLE = """
+CREATE TABLE IF NOT EXISTS trees (
+  content_id TEXT NOT NULL,
+  environment TEXT NOT NULL,
+  parsed INTEGER NOT NULL,
+  error TEXT,
+  xml BLOB,
+  positions BLOB,
+  size INTEGER NOT NULL,
+  accessed REAL NOT NULL,
+  PRIMARY KEY (content_id, environment)
+)
+"""
+
+CREATE_TREES_INDEX = """
+CREATE INDEX IF NOT EXISTS trees_accessed ON trees (accessed)
+"""
+
+CREATE_MATCHES_TABLE = """
+CREATE TABLE IF NOT EXISTS matches (
+  content_id TEXT NOT NULL,
+  pattern_id TEXT NOT NULL,
+  positions BLOB NOT NULL,
+  size INTEGER NOT NULL,
+  accessed REAL NOT NULL,
+  PRIMARY KEY (content_id, pattern_id)
+)
+"""
+
+CREATE_MATCHES_INDEX = """
+CREATE INDEX IF NOT EXISTS matches_accessed ON matches (accessed)
+"""
+
+CREATE_STATISTICS_TABLE = """
+CREATE TABLE IF NOT EXISTS statistics (
+  name TEXT PRIMARY KEY,
+  value INTEGER NOT NULL
+)
+"""
+
+
+@dataclass(frozen=True)
+class CachedTree:
+    """Record a cached XML tree or the error that prevented parsing the source code."""
+
+    parsed: bool
+    error: str = ""
+    xml_root: Optional[_Element] = None
+    element_positions: Optional[Dict[_Element, pyastgrepsearch.Position]] = None
+
+
+@dataclass(frozen=True)
+class CacheStatistics:
+    """Record the size and the effectiveness of the cache."""
+
+    entries: int
+    failures: int
+    size: int
+    hits: int
+    misses: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Calculate the percentage of the lookups that found a cached tree."""
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return (self.hits / lookups) * constants.markers.Percent_Multiplier
+
+
+def create_content_id(contents: bytes) -> str:
+    """Create the identifier for the contents of a file, which is the same as git's object id."""
+    # hashing the contents in the same way as git means that the identifier
+    # of a file can also be found from git's metadata without reading the file
+    hasher = hashlib.sha1(usedforsecurity=False)
+    hasher.update(b"blob %d\0" % len(contents))
+    hasher.update(contents)
+    return hasher.hexdigest()
+
+
+def get_environment() -> str:
+    """Describe the versions of the tools that determine the contents of a tree."""
+    # the AST of the same source code can differ between versions of Python
+    # and the XML can differ between versions of pyastgrep; the format version
+    # invalidates all of the entries when the layout of the cache changes
+    pyastgrep_version = importlib.metadata.version("pyastgrep")
+    return constants.filesystem.Dash.join(
+        [
+            constants.cache.Format_Version,
+            platform.python_version(),
+            pyastgrep_version,
+        ]
+    )
+
+
+def encode_positions(
+    xml_root: _Element, element_positions: Dict[_Element, pyastgrepsearch.Position]
+) -> bytes:
+    """Encode the position of every element in document order as an array of integers."""
+    encoded = array("i")
+    # elements that do not correspond to an AST node with a
+    # position (for instance, the body of a function) are marked
+    for element in xml_root.iter():
+        position = element_positions.get(element, None)
+        if position is None:
+            encoded.extend((constants.cache.No_Position, constants.cache.No_Position))
+        else:
+            encoded.extend((position.lineno, position.col_offset))
+    return encoded.tobytes()
+
+
+def decode_positions(
+    xml_root: _Element, encoded_positions: bytes
+) -> Dict[_Element, pyastgrepsearch.Position]:
+    """Decode the positions of the elements, pairing them with the elements in document order."""
+    decoded = array("i")
+    decoded.frombytes(encoded_positions)
+    element_positions: Dict[_Element, pyastgrepsearch.Position] = {}
+    for index, element in enumerate(xml_root.iter()):
+        lineno = decoded[2 * index]
+        if lineno != constants.cache.No_Position:
+            element_positions[element] = pyastgrepsearch.Position(
+                lineno, decoded[2 * index + 1]
+            )
+    return element_positions
+
+
+def encode_match_positions(positions: List[pyastgrepsearch.Position]) -> bytes:
+    """Encode the positions of the matches as an array of integers."""
+    encoded = array("i")
+    for position in positions:
+        encoded.extend((position.lineno, position.col_offset))
+    return encoded.tobytes()
+
+
+def decode_match_positions(encoded_positions: bytes) -> List[pyastgrepsearch.Position]:
+    """Decode the positions of the matches from an array of integers."""
+    decoded = array("i")
+    decoded.frombytes(encoded_positions)
+    return [
+        pyastgrepsearch.Position(decoded[index], decoded[index + 1])
+        for index in range(0, len(decoded), 2)
+    ]
+
+
+class DatabaseCache:
+    """Store the entries of a cache in a SQLite database and track their use."""
+
+    database_name = ""
+    table_name = ""
+    key_columns = ("", "")
+    create_statements: Tuple[str, ...] = ()
+
+    def __init__(self, cache_directory: Path) -> None:
+        """Open (and create, if needed) the cache in the directory."""
+        cache_directory.mkdir(parents=True, exist_ok=True)
+        self.database_path = cache_directory / self.database_name
+        # use autocommit mode and write-ahead logging so that several worker
+        # processes can add entries to the same cache without blocking each other
+        self.connection = sqlite3.connect(
+            self.database_path,
+            timeout=constants.cache.Timeout,
+            isolation_level=None,
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        for create_statement in self.create_statements:
+            self.connection.execute(create_statement)
+        self.connection.execute(CREATE_STATISTICS_TABLE)
+        self.environment = get_environment()
+        self.hits = 0
+        self.misses = 0
+        self.accessed: List[Tuple[str, str]] = []
+
+    def __enter__(self: DatabaseCacheType) -> DatabaseCacheType:
+        """Use the cache as a context manager."""
+        return self
+
+    def __exit__(self, *_) -> None:
+        """Close the cache when leaving the context manager."""
+        self.close()
+
+    def flush(self) -> None:
+        """Write the entries that are waiting to be added to the cache."""
+
+    def close(self) -> None:
+        """Record the accesses and the statistics of this use of the cache and then close it."""
+        now = time.time()
+        (first_key, second_key) = self.key_columns
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.flush()
+            # update the access times in a single transaction to support the
+            # eviction of the least recently used entries
+            self.connection.executemany(
+                f"UPDATE {self.table_name} SET accessed = ?"
+                f" WHERE {first_key} = ? AND {second_key} = ?",
+                [(now, *key) for key in self.accessed],
+            )
+            for name, value in (("hits", self.hits), ("misses", self.misses)):
+                self.connection.execute(
+                    "INSERT INTO statistics VALUES (?, ?)"
+                    " ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                    (name, value),
+                )
+        self.connection.close()
+
+    def evict(self, maximum_size: int) -> int:
+        """Evict the least recently used entries until the cache is no larger than the maximum size."""
+        rows = self.connection.execute(
+            f"SELECT rowid, size FROM {self.table_name} ORDER BY accessed DESC"
+        ).fetchall()
+        # keep the most recently used entries that fit in the maximum size
+        # and then delete all of the entries that were used less recently
+        total_size = 0
+        evicted_rowids: List[Tuple[int]] = []
+        for rowid, size in rows:
+            total_size += size
+            if total_size > maximum_size:
+                evicted_rowids.append((rowid,))
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.executemany(
+                f"DELETE FROM {self.table_name} WHERE rowid = ?", evicted_rowids
+            )
+        return len(evicted_rowids)
+
+    def count_failures(self) -> int:
+        """Count the entries that record a failure."""
+        return 0
+
+    def statistics(self) -> CacheStatistics:
+        """Summarize the size and the effectiveness of the cache."""
+        (entries, size) = self.connection.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table_name}"
+        ).fetchone()
+        counters = dict(
+            self.connection.execute("SELECT name, value FROM statistics").fetchall()
+        )
+        return CacheStatistics(
+            entries=entries,
+            failures=self.count_failures(),
+            size=size,
+            hits=counters.get("hits", 0) + self.hits,
+            misses=counters.get("misses", 0) + self.misses,
+        )
+
+    def clear(self) -> None:
+        """Remove all of the entries and the statistics from the cache."""
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.execute(f"DELETE FROM {self.table_name}")
+            self.connection.execute("DELETE FROM statistics")
+        self.connection.execute("VACUUM")
+        self.hits = 0
+        self.misses = 0
+        self.accessed = []
+
+
+class TreeCache(DatabaseCache):
+    """Store the XML trees of Python source code in a SQLite database keyed by their contents."""
+
+    database_name = constants.cache.Trees_Database
+    table_name = "trees"
+    key_columns = ("content_id", "environment")
+    create_statements = (CREATE_TREES_TABLE, CREATE_TREES_INDEX)
+
+    def __init__(self, cache_directory: Path) -> None:
+        """Open (and create, if needed) the cache in the directory."""
+        super().__init__(cache_directory)
+        self.parser = etree.XMLParser(huge_tree=True)
+
+    def get(self, content_id: str) -> Optional[CachedTree]:
+        """Get the cached tree for the contents, if there is one."""
+        row = self.connection.execute(
+            "SELECT parsed, error, xml, positions FROM trees"
+            " WHERE content_id = ? AND environment = ?",
+            (content_id, self.environment),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        (parsed, error, xml, positions) = row
+        self.hits += 1
+        self.accessed.append((content_id, self.environment))
+        # the source code could not be parsed the last time it was seen
+        if not parsed:
+            return CachedTree(parsed=False, error=error)
+        xml_root = etree.fromstring(zlib.decompress(xml), self.parser)
+        return CachedTree(
+            parsed=True,
+            xml_root=xml_root,
+            element_positions=decode_positions(xml_root, positions),
+        )
+
+    def put(
+        self,
+        content_id: str,
+        xml_root: _Element,
+        element_positions: Dict[_Element, pyastgrepsearch.Position],
+    ) -> None:
+        """Add the tree for the contents to the cache."""
+        xml = zlib.compress(etree.tostring(xml_root), constants.cache.Compression_Level)
+        positions = encode_positions(xml_root, element_positions)
+        self.store(content_id, True, None, xml, positions)
+
+    def put_failure(self, content_id: str, error: str) -> None:
+        """Record that the contents could not be parsed."""
+        self.store(content_id, False, error, None, None)
+
+    def store(  # noqa: PLR0913
+        self,
+        content_id: str,
+        parsed: bool,
+        error: Optional[str],
+        xml: Optional[bytes],
+        positions: Optional[bytes],
+    ) -> None:
+        """Store an entry in the cache, replacing any existing entry for the contents."""
+        size = len(xml or b"") + len(positions or b"") + len(error or "")
+        self.connection.execute(
+            "INSERT OR REPLACE INTO trees VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                content_id,
+                self.environment,
+                parsed,
+                error,
+                xml,
+                positions,
+                size,
+                time.time(),
+            ),
+        )
+
+    def count_failures(self) -> int:
+        """Count the source code that could not be parsed."""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM trees WHERE NOT parsed"
+        ).fetchone()[0]
+
+
+class MatchCache(DatabaseCache):
+    """Store the positions that each pattern matched in Python source code keyed by their contents."""
+
+    database_name = constants.cache.Matches_Database
+    table_name = "matches"
+    key_columns = ("content_id", "pattern_id")
+    create_statements = (CREATE_MATCHES_TABLE, CREATE_MATCHES_INDEX)
+
+    def __init__(self, cache_directory: Path, xpath2: bool = True) -> None:
+        """Open (and create, if needed) the cache in the directory."""
+        super().__init__(cache_directory)
+        self.xpath2 = xpath2
+        self.pattern_ids: Dict[str, str] = {}
+        self.pending: List[Tuple[str, str, bytes, int, float]] = []
+
+    def create_pattern_id(self, pattern: str) -> str:
+        """Create the identifier for a pattern that is evaluated with this cache's XPath version."""
+        # the same pattern may produce different matches with another
+        # version of XPath or of the tools that create the XML trees
+        pattern_id = self.pattern_ids.get(pattern, None)
+        if pattern_id is None:
+            hasher = hashlib.sha1(usedforsecurity=False)
+            for part in (self.environment, str(self.xpath2), pattern):
+                hasher.update(part.encode())
+                hasher.update(b"\0")
+            pattern_id = hasher.hexdigest()
+            self.pattern_ids[pattern] = pattern_id
+        return pattern_id
+
+    def get(
+        self, content_id: str, patterns: Sequence[str]
+    ) -> List[Optional[List[pyastgrepsearch.Position]]]:
+        """Get the cached positions of each pattern's matches in the contents, if there are any."""
+        # read all of the cached matches for the contents with one query
+        # and then pick out the matches for each of the current patterns
+        rows = dict(
+            self.connection.execute(
+                "SELECT pattern_id, positions FROM matches WHERE content_id = ?",
+                (content_id,),
+            ).fetchall()
+        )
+        cached_positions: List[Optional[List[pyastgrepsearch.Position]]] = []
+        for pattern in patterns:
+            pattern_id = self.create_pattern_id(pattern)
+            encoded_positions = rows.get(pattern_id, None)
+            if encoded_positions is None:
+                self.misses += 1
+                cached_positions.append(None)
+            else:
+                self.hits += 1
+                self.accessed.append((content_id, pattern_id))
+                cached_positions.append(decode_match_positions(encoded_positions))
+        return cached_positions
+
+    def put(
+        self,
+        content_id: str,
+        pattern: str,
+        positions: List[pyastgrepsearch.Position],
+    ) -> None:
+        """Add the positions of a pattern's matches in the contents to the cache."""
+        # the entries are written in a single transaction when the cache is closed
+        encoded_positions = encode_match_positions(positions)
+        pattern_id = self.create_pattern_id(pattern)
+        size = len(content_id) + len(pattern_id) + len(encoded_positions)
+        self.pending.append(
+            (content_id, pattern_id, encoded_positions, size, time.time())
+        )
+
+    def flush(self) -> None:
+        """Write the positions of the matches that are waiting to be added to the cache."""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?)", self.pending
+        )
+        self.pending = []
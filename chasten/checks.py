@@ -1,6 +1,8 @@
 """Extract and analyze details about specific checks."""
 
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 from chasten import constants, enumerations, util
 
@@ -94,6 +96,54 @@ def check_match_count(
     return False
 
 
+def exceeds_max(count: int, max_value: Union[int, None] = None) -> bool:
+    """Determine whether or not the count is above max_value, meaning the check cannot pass."""
+    # there is no maximum value and thus the count can never exceed it
+    if max_value is None:
+        return False
+    # more matches can only increase the count and thus, once the count is
+    # above the maximum value, the check fails no matter what else is found
+    return count > max_value
+
+
+def fill_limits(limits: Sequence[Optional[int]], missing: int) -> np.ndarray:
+    """Create an array of the minimums or maximums of the checks, using a value for a missing one."""
+    return np.array(
+        [missing if limit is None else limit for limit in limits], dtype=np.int64
+    )
+
+
+def are_checkable(
+    min_values: Sequence[Optional[int]], max_values: Sequence[Optional[int]]
+) -> np.ndarray:
+    """Determine which of the checks have a minimum or a maximum."""
+    return np.array(
+        [
+            is_checkable(min_value, max_value)
+            for min_value, max_value in zip(min_values, max_values)
+        ],
+        dtype=bool,
+    )
+
+
+def check_match_counts(
+    counts: np.ndarray,
+    min_values: Sequence[Optional[int]],
+    max_values: Sequence[Optional[int]],
+) -> np.ndarray:
+    """Confirm which of the counts are between their checks' min_value and max_value."""
+    # a missing minimum or maximum does not limit the count, which is the
+    # same as check_match_count for each of the checks
+    return (counts >= fill_limits(min_values, 0)) & (
+        counts <= fill_limits(max_values, np.iinfo(np.int64).max)
+    )
+
+
+def exceed_maxes(counts: np.ndarray, max_values: Sequence[Optional[int]]) -> np.ndarray:
+    """Determine which of the counts are above their checks' max_value."""
+    return counts > fill_limits(max_values, np.iinfo(np.int64).max)
+
+
 def make_checks_status_message(check_status: bool) -> str:
     """Make a check status message in human readable format."""
     if check_status:
@@ -14,7 +14,7 @@ from rich.logging import RichHandler
 from rich.traceback import install
 from urllib3.util import Url, parse_url
 
-from chasten import constants, filesystem, output, util, validate
+from chasten import constants, filesystem, output, patterns, util, validate
 
 
 def configure_tracebacks() -> None:
@@ -33,6 +33,17 @@ def user_config_dir(application_name: str, application_author: str) -> str:
     return chasten_user_config_dir_str
 
 
+def user_cache_dir(application_name: str, application_author: str) -> str:
+    """Return the user's cache directory using platformdirs."""
+    # access the directory and then return it based on the
+    # provided name of the application and the application's author
+    chasten_user_cache_dir_str = platformdirs.user_cache_dir(
+        appname=application_name,
+        appauthor=application_author,
+    )
+    return chasten_user_cache_dir_str
+
+
 def configure_logging(
     debug_level: str = constants.logging.Default_Logging_Level,
     debug_dest: str = constants.logging.Default_Logging_Destination,
@@ -180,6 +191,7 @@ def validate_checks_file(
 def validate_configuration_files(
     config: str,
     verbose: bool = False,
+    xpath2: bool = True,
 ) -> Tuple[
     bool, Union[Dict[str, List[Dict[str, Union[str, Dict[str, int]]]]], Dict[Any, Any]]
 ]:
@@ -331,15 +343,40 @@ def validate_configuration_files(
         overall_checks_dict[constants.checks.Checks_Label].extend(checks_file_yaml_data_dict[constants.checks.Checks_Label])  # type: ignore
     # the check files are only validated if all of them are valid
     check_files_validated = all(checks_files_validated_list)
-    # the files validated correctly; return an indicator to
+    # the files validated correctly and the pattern of every check compiled
+    # into a valid XPath expression, which means that invalid patterns are
+    # reported before any of the source code is analyzed (note that the compiled
+    # patterns are reused when evaluating them); return an indicator to
     # show that validation worked and then return the overall
     # dictionary that contains the listing of valid checks
-    if config_file_validated and check_files_validated:
+    if (
+        config_file_validated
+        and check_files_validated
+        and validate_check_patterns(
+            overall_checks_dict[constants.checks.Checks_Label], xpath2
+        )
+    ):
         return (True, overall_checks_dict)
     # there was at least one validation error
     return (False, {})
 
 
+def validate_check_patterns(
+    check_list: List[Dict[str, Union[str, Dict[str, int]]]], xpath2: bool = True
+) -> bool:
+    """Validate that the pattern of every check is a valid XPath expression."""
+    # display the error for each of the patterns that could not be compiled
+    invalid_checks = patterns.validate_patterns(check_list, xpath2)
+    for check_id, error in invalid_checks:
+        # escape the open bracket symbol that may be in the error
+        # and will prevent it from displaying correctly
+        error_escape = error.replace("[", "\\[")
+        output.console.print(
+            f":person_shrugging: Invalid XPath pattern for check '{check_id}': {error_escape}"
+        )
+    return len(invalid_checks) == 0
+
+
 def extract_configuration_details_from_config_dir(
     chasten_user_config_dir_str: Path,
     configuration_file: str = constants.filesystem.Main_Configuration_File,
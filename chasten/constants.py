@@ -51,6 +51,35 @@ chasten = Chasten(
 )
 
 
+# cache constant
+@dataclass(frozen=True)
+class Cache:
+    """Define the Cache dataclass for constant(s)."""
+
+    Bytes_Per_Megabyte: int
+    Compression_Level: int
+    Default_Size_Megabytes: int
+    Format_Version: str
+    Matches_Database: str
+    Matches_Directory: str
+    No_Position: int
+    Timeout: float
+    Trees_Database: str
+
+
+cache = Cache(
+    Bytes_Per_Megabyte=1048576,
+    Compression_Level=1,
+    Default_Size_Megabytes=512,
+    Format_Version="1",
+    Matches_Database="matches.db",
+    Matches_Directory=".chasten_cache",
+    No_Position=-1,
+    Timeout=60.0,
+    Trees_Database="trees.db",
+)
+
+
 # checks constant
 @dataclass(frozen=True)
 class Checks:
@@ -105,6 +134,42 @@ datasette = Datasette(
 )
 
 
+# database constant
+@dataclass(frozen=True)
+class Database:
+    """Define the Database dataclass for constant(s)."""
+
+    Batch_Size: int
+    Cache_Size_Kibibytes: int
+    Link_Separator: str
+
+
+database = Database(
+    Batch_Size=10000,
+    Cache_Size_Kibibytes=65536,
+    Link_Separator=".",
+)
+
+
+# engine constant
+@dataclass(frozen=True)
+class Engine:
+    """Define the Engine dataclass for constant(s)."""
+
+    Chunks_In_Flight_Per_Worker: int
+    Chunks_Per_Worker: int
+    Maximum_Chunk_Size: int
+    Serial_Workers: int
+
+
+engine = Engine(
+    Chunks_In_Flight_Per_Worker=2,
+    Chunks_Per_Worker=4,
+    Maximum_Chunk_Size=64,
+    Serial_Workers=1,
+)
+
+
 # filesystem constant
 @dataclass(frozen=True)
 class Filesystem:
@@ -146,6 +211,23 @@ class Humanreadable:
 humanreadable = Humanreadable(Yes="Yes", No="No")
 
 
+# index constant
+@dataclass(frozen=True)
+class Index:
+    """Define the Index dataclass for constant(s)."""
+
+    Database: str
+    Directory: str
+    Format_Version: str
+
+
+index = Index(
+    Database="index.db",
+    Directory=".chasten_index",
+    Format_Version="1",
+)
+
+
 # logger constant
 @dataclass(frozen=True)
 class Logger:
@@ -255,6 +337,17 @@ markers = Markers(
 )
 
 
+# matrix constant
+@dataclass(frozen=True)
+class Matrix:
+    """Define the Matrix dataclass for constant(s)."""
+
+    Extension: str
+
+
+matrix = Matrix(Extension="npz")
+
+
 # output constant
 @dataclass(frozen=True)
 class Output:
@@ -270,6 +363,18 @@ output = Output(
 )
 
 
+# schema constant
+@dataclass(frozen=True)
+class Schema:
+    """Define the Schema dataclass for constant(s)."""
+
+    Normalized_Version: int
+    Version: str
+
+
+schema = Schema(Normalized_Version=2, Version="version")
+
+
 # server constant
 @dataclass(frozen=True)
 class Server:
@@ -293,3 +398,43 @@ server = Server(
     Port=2525,
     Utf8_Encoding="utf-8",
 )
+
+
+# stream constant
+@dataclass(frozen=True)
+class Stream:
+    """Define the Stream dataclass for constant(s)."""
+
+    Check_Index: str
+    Configuration_Record: str
+    Outcome_Record: str
+    Record: str
+    Source_Record: str
+
+
+stream = Stream(
+    Check_Index="checkindex",
+    Configuration_Record="configuration",
+    Outcome_Record="outcomes",
+    Record="record",
+    Source_Record="source",
+)
+
+
+# vcs constant
+@dataclass(frozen=True)
+class Vcs:
+    """Define the Vcs dataclass for constant(s)."""
+
+    Blob: str
+    Git: str
+    Null: str
+    Tab: str
+
+
+vcs = Vcs(
+    Blob="blob",
+    Git="git",
+    Null="\0",
+    Tab="\t",
+)
@@ -1,14 +1,18 @@
 """Mange the SQLite database containing results from chasten analyses."""
 
+import sqlite3
 import subprocess
 import sys
 from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from sqlite_utils import Database
+from sqlite_utils.db import Table
 
 from chasten import constants, enumerations, filesystem, output, util
 
-CHASTEN_SQL_SELECT_QUERY = """
+# the rows of all of chasten's results, combined from the database tables
+CHASTEN_SQL_SELECT_ROWS = """
 SELECT
   main.configuration_chastenversion as chastenversion,
   main.configuration_projectname as projectname,
@@ -29,14 +33,667 @@ FROM
   sources
   JOIN sources_check_matches ON sources._link = sources_check_matches._link_sources
   JOIN main ON sources._link_main = main._link
-ORDER BY
+"""
+
+CHASTEN_SQL_SELECT_QUERY = (
+    CHASTEN_SQL_SELECT_ROWS
+    + """ORDER BY
   datetime desc;
 """
+)
+
+# the indexes of the columns that link the rows of the tables and of the
+# columns that the results are filtered by, which also have the linking
+# columns so that the joins of the view do not need to read the tables;
+# note that the names of the indexes of the linking columns are the same
+# as those that flatterer creates so that they are not created twice
+CHASTEN_SQL_CREATE_INDEXES = """
+CREATE INDEX IF NOT EXISTS [idx_sources__link_main]
+  ON [sources] ([_link_main]);
+CREATE INDEX IF NOT EXISTS [idx_sources_check_matches__link_sources]
+  ON [sources_check_matches] ([_link_sources]);
+CREATE INDEX IF NOT EXISTS [idx_sources_check_matches__link_main]
+  ON [sources_check_matches] ([_link_main]);
+CREATE INDEX IF NOT EXISTS [idx_main_configuration_datetime]
+  ON [main] ([configuration_datetime] DESC, [_link]);
+CREATE INDEX IF NOT EXISTS [idx_main_configuration_projectname]
+  ON [main] ([configuration_projectname], [configuration_datetime] DESC, [_link]);
+CREATE INDEX IF NOT EXISTS [idx_sources_check_id]
+  ON [sources] ([check_id], [check_passed], [_link_main], [_link]);
+CREATE INDEX IF NOT EXISTS [idx_sources_filename]
+  ON [sources] ([filename], [_link_main], [_link]);
+CREATE INDEX IF NOT EXISTS [idx_sources_check_passed]
+  ON [sources] ([check_passed], [_link_main], [_link]);
+"""
+
+# the indexes of the columns that the materialized table of all of
+# chasten's results is sorted and filtered by in datasette
+CHASTEN_SQL_CREATE_COMPLETE_INDEXES = """
+CREATE INDEX IF NOT EXISTS [idx_chasten_complete_datetime]
+  ON [chasten_complete] ([datetime] DESC);
+CREATE INDEX IF NOT EXISTS [idx_chasten_complete_projectname]
+  ON [chasten_complete] ([projectname], [datetime] DESC);
+CREATE INDEX IF NOT EXISTS [idx_chasten_complete_filename]
+  ON [chasten_complete] ([filename]);
+CREATE INDEX IF NOT EXISTS [idx_chasten_complete_check_id]
+  ON [chasten_complete] ([check_id], [check_passed]);
+CREATE INDEX IF NOT EXISTS [idx_chasten_complete_check_passed]
+  ON [chasten_complete] ([check_passed]);
+"""
+
+# the tables that roll up the results of each analysis into the counts of
+# the matches of each check in each file, of each check, and of the checks
+# that passed and failed, with the indexes of the columns that dashboards
+# filter and sort them by; note that a check's outcome is either 1 or 0,
+# whether the tables were created by chasten or by flatterer
+CHASTEN_SQL_CREATE_ROLLUP_TABLES = [
+    """
+CREATE TABLE IF NOT EXISTS rollup_run_file_checks (
+  _link_main TEXT,
+  filename TEXT,
+  check_id TEXT,
+  check_name TEXT,
+  check_passed INTEGER,
+  match_count INTEGER
+)""",
+    """
+CREATE INDEX IF NOT EXISTS [idx_rollup_run_file_checks__link_main]
+  ON [rollup_run_file_checks] ([_link_main], [check_id])""",
+    """
+CREATE INDEX IF NOT EXISTS [idx_rollup_run_file_checks_filename]
+  ON [rollup_run_file_checks] ([filename], [check_id])""",
+    """
+CREATE TABLE IF NOT EXISTS rollup_run_checks (
+  _link_main TEXT,
+  projectname TEXT,
+  datetime TIMESTAMP,
+  check_id TEXT,
+  check_name TEXT,
+  check_passed INTEGER,
+  file_count INTEGER,
+  match_count INTEGER
+)""",
+    """
+CREATE INDEX IF NOT EXISTS [idx_rollup_run_checks__link_main]
+  ON [rollup_run_checks] ([_link_main])""",
+    """
+CREATE INDEX IF NOT EXISTS [idx_rollup_run_checks_check_id]
+  ON [rollup_run_checks] ([check_id], [datetime] DESC)""",
+    """
+CREATE INDEX IF NOT EXISTS [idx_rollup_run_checks_projectname]
+  ON [rollup_run_checks] ([projectname], [datetime] DESC)""",
+    """
+CREATE TABLE IF NOT EXISTS rollup_runs (
+  _link_main TEXT PRIMARY KEY,
+  projectname TEXT,
+  datetime TIMESTAMP,
+  chastenversion TEXT,
+  check_count INTEGER,
+  passed_count INTEGER,
+  failed_count INTEGER,
+  file_count INTEGER,
+  match_count INTEGER
+)""",
+    """
+CREATE INDEX IF NOT EXISTS [idx_rollup_runs_projectname]
+  ON [rollup_runs] ([projectname], [datetime] DESC)""",
+    """
+CREATE INDEX IF NOT EXISTS [idx_rollup_runs_datetime]
+  ON [rollup_runs] ([datetime] DESC)""",
+]
+
+# the statements that roll up the results of the analyses after the last
+# row of the main table, each from the table of the previous statement
+CHASTEN_SQL_INSERT_ROLLUPS = [
+    """
+INSERT INTO rollup_run_file_checks
+SELECT
+  sources._link_main,
+  sources.filename,
+  sources.check_id,
+  sources.check_name,
+  CASE
+    WHEN sources.check_passed IN (1, 'true') THEN 1
+    WHEN sources.check_passed IN (0, 'false') THEN 0
+  END,
+  COUNT(sources_check_matches._link)
+FROM
+  main
+  JOIN sources ON sources._link_main = main._link
+  LEFT JOIN sources_check_matches ON sources_check_matches._link_sources = sources._link
+WHERE
+  main.rowid > :last_rowid
+GROUP BY
+  sources._link""",
+    """
+INSERT INTO rollup_run_checks
+SELECT
+  rollup_run_file_checks._link_main,
+  main.configuration_projectname,
+  main.configuration_datetime,
+  rollup_run_file_checks.check_id,
+  rollup_run_file_checks.check_name,
+  MIN(rollup_run_file_checks.check_passed),
+  COUNT(*),
+  SUM(rollup_run_file_checks.match_count)
+FROM
+  main
+  JOIN rollup_run_file_checks ON rollup_run_file_checks._link_main = main._link
+WHERE
+  main.rowid > :last_rowid
+GROUP BY
+  rollup_run_file_checks._link_main,
+  rollup_run_file_checks.check_id,
+  rollup_run_file_checks.check_name""",
+    """
+INSERT INTO rollup_runs
+SELECT
+  main._link,
+  main.configuration_projectname,
+  main.configuration_datetime,
+  main.configuration_chastenversion,
+  COUNT(rollup_run_checks.check_id),
+  COALESCE(SUM(rollup_run_checks.check_passed = 1), 0),
+  COALESCE(SUM(rollup_run_checks.check_passed = 0), 0),
+  (
+    SELECT COUNT(DISTINCT rollup_run_file_checks.filename)
+    FROM rollup_run_file_checks
+    WHERE rollup_run_file_checks._link_main = main._link
+  ),
+  COALESCE(SUM(rollup_run_checks.match_count), 0)
+FROM
+  main
+  LEFT JOIN rollup_run_checks ON rollup_run_checks._link_main = main._link
+WHERE
+  main.rowid > :last_rowid
+GROUP BY
+  main._link""",
+]
+
+# the tables that roll up the results, in the order that they are created
+CHASTEN_ROLLUP_TABLES = ("rollup_run_file_checks", "rollup_run_checks", "rollup_runs")
+
+CHASTEN_SQL_CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS main (
+  _link TEXT PRIMARY KEY,
+  configuration_chastenversion TEXT,
+  configuration_debuglevel TEXT,
+  configuration_debugdestination TEXT,
+  configuration_projectname TEXT,
+  configuration_configdirectory TEXT,
+  configuration_searchpath TEXT,
+  configuration_fileuuid TEXT,
+  configuration_datetime TIMESTAMP,
+  configuration_checkinclude_attribute TEXT,
+  configuration_checkinclude_value TEXT,
+  configuration_checkinclude_confidence NUMERIC,
+  configuration_checkexclude_attribute TEXT,
+  configuration_checkexclude_value TEXT,
+  configuration_checkexclude_confidence NUMERIC
+);
+CREATE TABLE IF NOT EXISTS sources (
+  _link TEXT PRIMARY KEY,
+  _link_main TEXT REFERENCES main(_link),
+  filename TEXT,
+  check_id TEXT,
+  check_name TEXT,
+  check_description TEXT,
+  check_min NUMERIC,
+  check_max NUMERIC,
+  check_pattern TEXT,
+  check_passed BOOL
+);
+CREATE TABLE IF NOT EXISTS sources_check_matches (
+  _link TEXT PRIMARY KEY,
+  _link_sources TEXT REFERENCES sources(_link),
+  _link_main TEXT REFERENCES main(_link),
+  lineno NUMERIC,
+  coloffset NUMERIC,
+  linematch TEXT,
+  linematch_context TEXT
+);
+"""
+
+# the columns of the main table that come from the flattened configuration,
+# in the same order as the table, after the column that links to it
+CONFIGURATION_COLUMNS = [
+    "configuration_chastenversion",
+    "configuration_debuglevel",
+    "configuration_debugdestination",
+    "configuration_projectname",
+    "configuration_configdirectory",
+    "configuration_searchpath",
+    "configuration_fileuuid",
+    "configuration_datetime",
+    "configuration_checkinclude_attribute",
+    "configuration_checkinclude_value",
+    "configuration_checkinclude_confidence",
+    "configuration_checkexclude_attribute",
+    "configuration_checkexclude_value",
+    "configuration_checkexclude_confidence",
+]
+
+# the columns of the tables of the sources and their matches, in the same
+# order as the tables, that are inserted for the results of each analysis
+SOURCES_COLUMNS = [
+    "_link",
+    "_link_main",
+    "filename",
+    "check_id",
+    "check_name",
+    "check_description",
+    "check_min",
+    "check_max",
+    "check_pattern",
+    "check_passed",
+]
+
+MATCHES_COLUMNS = [
+    "_link",
+    "_link_sources",
+    "_link_main",
+    "lineno",
+    "coloffset",
+    "linematch",
+    "linematch_context",
+]
+
+# the text that flatterer writes for the outcome of a check
+FLATTERER_BOOLEANS = {True: "true", False: "false"}
+
+# the tables of the results, in the order that their rows are linked
+CHASTEN_TABLES = ("main", "sources", "sources_check_matches")
+
+# the columns of each table that full-text search finds the rows by when
+# other columns are not specified; note that the numbers of the lines and
+# columns of the matches are not searched since they are not text
+FULL_TEXT_SEARCH_COLUMNS = {
+    "main": [
+        "configuration_chastenversion",
+        "configuration_projectname",
+        "configuration_datetime",
+    ],
+    "sources": [
+        "filename",
+        "check_id",
+        "check_name",
+        "check_description",
+        "check_pattern",
+    ],
+    "sources_check_matches": ["linematch"],
+}
 
 # create a small bullet for display in the output
 small_bullet_unicode = constants.markers.Small_Bullet_Unicode
 
 
+def flatten_record(record: Dict[str, Any], prefix: str) -> Dict[str, Any]:
+    """Flatten the nested dictionaries of a record into columns whose names join the keys."""
+    flattened_record: Dict[str, Any] = {}
+    for key, value in record.items():
+        column = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            flattened_record.update(flatten_record(value, column))
+        else:
+            flattened_record[column] = value
+    return flattened_record
+
+
+def find_table_columns(connection: sqlite3.Connection, table_name: str) -> List[str]:
+    """Find the names of the columns of a table in the database."""
+    return [row[1] for row in connection.execute(f"PRAGMA table_info([{table_name}])")]
+
+
+def create_insert_statement(table_name: str, columns: List[str]) -> str:
+    """Create the statement that inserts a row with a value for each of the columns."""
+    return (
+        f"INSERT INTO [{table_name}] ({', '.join(f'[{column}]' for column in columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})"
+    )
+
+
+def find_schema_columns(table_name: str) -> List[str]:
+    """Find the names of the columns of a table that chasten creates."""
+    schema_connection = sqlite3.connect(":memory:")
+    schema_connection.executescript(CHASTEN_SQL_CREATE_TABLES)
+    schema_columns = find_table_columns(schema_connection, table_name)
+    schema_connection.close()
+    return schema_columns
+
+
+def parse_search_columns(column_names: Iterable[str]) -> Dict[str, List[str]]:
+    """Parse the TABLE.COLUMN names of the columns that full-text search finds the rows of each table by."""
+    parsed_columns: Dict[str, List[str]] = {}
+    for column_name in column_names:
+        (table_name, _, column) = column_name.partition(
+            constants.database.Link_Separator
+        )
+        if table_name not in CHASTEN_TABLES:
+            raise ValueError(
+                f"The table of '{column_name}' is not one of {', '.join(CHASTEN_TABLES)}."
+            )
+        if column not in find_schema_columns(table_name):
+            raise ValueError(f"The table '{table_name}' does not have '{column}'.")
+        parsed_columns.setdefault(table_name, []).append(column)
+    # the tables without any specified columns are searched by their defaults
+    return {
+        table_name: parsed_columns.get(table_name, default_columns)
+        for table_name, default_columns in FULL_TEXT_SEARCH_COLUMNS.items()
+    }
+
+
+class ResultsDatabase:
+    """Write the results of analyses straight into the tables of a SQLite database."""
+
+    def __init__(self, database_path: Path) -> None:
+        """Open the database, creating its tables if they do not exist."""
+        self.connection = sqlite3.connect(database_path)
+        # the rows are loaded in one transaction without waiting for each write
+        # to reach the disk; note that the journal is still kept so that an
+        # integration that does not finish leaves the database unchanged
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.execute("PRAGMA temp_store = MEMORY")
+        self.connection.execute(
+            f"PRAGMA cache_size = -{constants.database.Cache_Size_Kibibytes}"
+        )
+        self.connection.executescript(CHASTEN_SQL_CREATE_TABLES)
+        self.add_missing_columns()
+        # the results that are already in the database are not added again,
+        # no matter whether chasten or flatterer linked their rows
+        self.recorded_fileuuids = {
+            row[0]
+            for row in self.connection.execute(
+                "SELECT configuration_fileuuid FROM main"
+            )
+        }
+        # the rows after the last row of each table are the ones that are
+        # added and thus the only ones that the full-text search is missing
+        self.last_rowids = {
+            table_name: self.connection.execute(
+                f"SELECT COALESCE(MAX(rowid), 0) FROM [{table_name}]"
+            ).fetchone()[0]
+            for table_name in CHASTEN_TABLES
+        }
+        # the outcomes of the checks are the text 'true' and 'false' that
+        # flatterer writes and thus the outcomes that were written as 1 and 0
+        # are migrated so that the outcomes in every database of results are
+        # the same, no matter whether chasten or flatterer created it
+        self.migrate_outcomes()
+        self.added_count = 0
+        self.skipped_count = 0
+        self.main_rows: List[Tuple[Any, ...]] = []
+        self.source_rows: List[Tuple[Any, ...]] = []
+        self.match_rows: List[Tuple[Any, ...]] = []
+
+    def add_missing_columns(self) -> None:
+        """Add the columns that a database created by flatterer may not have to its tables."""
+        # flatterer only creates the columns of the values that were in the
+        # results that it flattened and so the columns of the tables that
+        # chasten creates are compared to the columns of the existing tables
+        schema_connection = sqlite3.connect(":memory:")
+        schema_connection.executescript(CHASTEN_SQL_CREATE_TABLES)
+        for table_name in CHASTEN_TABLES:
+            existing_columns = find_table_columns(self.connection, table_name)
+            for row in schema_connection.execute(f"PRAGMA table_info([{table_name}])"):
+                if row[1] not in existing_columns:
+                    self.connection.execute(
+                        f"ALTER TABLE [{table_name}] ADD COLUMN [{row[1]}] {row[2]}"
+                    )
+        schema_connection.close()
+
+    def add_results(self, results_dict: Dict[str, Any]) -> bool:
+        """Add the rows for the configuration, sources, and matches of the results of an analysis unless they were already added."""
+        separator = constants.database.Link_Separator
+        configuration = flatten_record(results_dict["configuration"], "configuration")
+        # the unique identifier of the results links all of their rows so
+        # that the results of other analyses can be added to the same tables
+        main_link = configuration["configuration_fileuuid"]
+        if main_link in self.recorded_fileuuids:
+            self.skipped_count += 1
+            return False
+        self.recorded_fileuuids.add(main_link)
+        self.added_count += 1
+        self.main_rows.append(
+            (
+                main_link,
+                *(configuration.get(column, None) for column in CONFIGURATION_COLUMNS),
+            )
+        )
+        for source_index, source in enumerate(results_dict["sources"]):
+            source_link = f"{main_link}{separator}sources{separator}{source_index}"
+            check = source["check"]
+            self.source_rows.append(
+                (
+                    source_link,
+                    main_link,
+                    source["filename"],
+                    check["id"],
+                    check["name"],
+                    check.get("description", None),
+                    check.get("min", None),
+                    check.get("max", None),
+                    check["pattern"],
+                    FLATTERER_BOOLEANS.get(check["passed"], None),
+                )
+            )
+            for match_index, match in enumerate(check["matches"]):
+                self.match_rows.append(
+                    (
+                        f"{source_link}{separator}check{separator}matches{separator}{match_index}",
+                        source_link,
+                        main_link,
+                        match["lineno"],
+                        match["coloffset"],
+                        match.get("linematch", None),
+                        match.get("linematch_context", None),
+                    )
+                )
+        # insert the rows in batches so that the rows of many results
+        # are not all kept in memory before they are inserted
+        if len(self.match_rows) >= constants.database.Batch_Size:
+            self.insert_rows()
+        return True
+
+    def migrate_outcomes(self) -> None:
+        """Replace the outcomes of the checks that are 1 and 0 with the text that flatterer writes."""
+        # the materialized view has its own copy of the outcomes of the checks
+        table_names = [
+            row[0]
+            for row in self.connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (?, ?)",
+                ("sources", constants.chasten.Chasten_Database_View),
+            )
+        ]
+        for table_name in table_names:
+            self.connection.execute(
+                f"UPDATE [{table_name}] SET check_passed = "
+                "CASE check_passed WHEN 1 THEN 'true' WHEN 0 THEN 'false' END "
+                "WHERE typeof(check_passed) = 'integer'"
+            )
+
+    def insert_rows(self) -> None:
+        """Insert the rows that were added since the last insertion."""
+        # name the columns since the columns of a database created by
+        # flatterer, and then added to, may not be in the same order
+        self.connection.executemany(
+            create_insert_statement("main", ["_link", *CONFIGURATION_COLUMNS]),
+            self.main_rows,
+        )
+        self.connection.executemany(
+            create_insert_statement("sources", SOURCES_COLUMNS), self.source_rows
+        )
+        self.connection.executemany(
+            create_insert_statement("sources_check_matches", MATCHES_COLUMNS),
+            self.match_rows,
+        )
+        self.main_rows.clear()
+        self.source_rows.clear()
+        self.match_rows.clear()
+
+    def close(self) -> None:
+        """Insert the remaining rows, commit the transaction, and close the database."""
+        self.insert_rows()
+        self.connection.commit()
+        self.connection.close()
+
+
+def write_results_database(
+    database_path: Path,
+    results_dicts: Iterable[Dict[str, Any]],
+    materialize: bool = False,
+    search_columns: Optional[Dict[str, List[str]]] = None,
+    defer_search: bool = False,
+) -> Tuple[int, int]:
+    """Write the results of analyses that are not yet in a database into it, with the view and full-text search of chasten's results."""
+    results_database = ResultsDatabase(database_path)
+    try:
+        for results_dict in results_dicts:
+            results_database.add_results(results_dict)
+    except BaseException:
+        results_database.connection.close()
+        raise
+    results_database.close()
+    # index the tables after the rows are inserted so that the indexes
+    # are not updated for each of the rows while they are inserted
+    create_indexes(database_path)
+    # roll up the counts of the matches of the new results, using the
+    # indexes of the columns that link their rows in the tables
+    update_rollup_tables(database_path, results_database.last_rowids["main"])
+    # create the view of all of the results, unless it or the table that
+    # materializes it exists, and add the new rows to the table if it does
+    if materialize or is_materialized(database_path):
+        update_materialized_view(
+            database_path, results_database.last_rowids["sources_check_matches"]
+        )
+    elif not Database(database_path)[constants.chasten.Chasten_Database_View].exists():
+        create_chasten_view(str(database_path))
+    # add the new rows to the full-text search, if it exists, or create it
+    # unless it is created later, after all of the results are added
+    if Database(database_path)["main_fts"].exists():
+        update_full_text_search(database_path, results_database.last_rowids)
+    elif not defer_search:
+        enable_full_text_search(str(database_path), search_columns)
+    return (results_database.added_count, results_database.skipped_count)
+
+
+def create_indexes(database_path: Path) -> None:
+    """Create the indexes of the columns that link and filter the rows of the results."""
+    connection = sqlite3.connect(database_path)
+    connection.executescript(CHASTEN_SQL_CREATE_INDEXES)
+    # gather the statistics of the new indexes for the query planner
+    connection.execute("PRAGMA optimize")
+    connection.close()
+
+
+def insert_rollup_rows(connection: sqlite3.Connection, last_rowid: int) -> None:
+    """Create the tables that roll up the results, if they do not exist, and roll up the results after the last row."""
+    for statement in CHASTEN_SQL_CREATE_ROLLUP_TABLES:
+        connection.execute(statement)
+    for statement in CHASTEN_SQL_INSERT_ROLLUPS:
+        connection.execute(statement, {"last_rowid": last_rowid})
+
+
+def update_rollup_tables(database_path: Path, last_rowid: int) -> None:
+    """Roll up the results of the analyses after the last row of the main table."""
+    connection = sqlite3.connect(database_path)
+    # the results that were in the database before it had the tables that
+    # roll them up, like those integrated by flatterer, are also rolled up
+    table_count = connection.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (CHASTEN_ROLLUP_TABLES[-1],),
+    ).fetchone()[0]
+    if table_count == 0:
+        last_rowid = 0
+    with connection:
+        insert_rollup_rows(connection, last_rowid)
+    connection.close()
+
+
+def refresh_rollup_tables(database_path: Path) -> int:
+    """Replace the tables that roll up the results with new tables of all of the results."""
+    connection = sqlite3.connect(database_path)
+    with connection:
+        for table_name in CHASTEN_ROLLUP_TABLES:
+            connection.execute(f"DROP TABLE IF EXISTS [{table_name}]")
+        insert_rollup_rows(connection, 0)
+    run_count = connection.execute(
+        f"SELECT COUNT(*) FROM [{CHASTEN_ROLLUP_TABLES[-1]}]"
+    ).fetchone()[0]
+    connection.close()
+    return run_count
+
+
+def is_materialized(database_path: Path) -> bool:
+    """Determine whether or not the view of all of the results is materialized as a table."""
+    connection = sqlite3.connect(database_path)
+    table_count = connection.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (constants.chasten.Chasten_Database_View,),
+    ).fetchone()[0]
+    connection.close()
+    return table_count > 0
+
+
+def refresh_materialized_view(database_path: Path) -> int:
+    """Replace the view of all of the results, or the table that materializes it, with a new table of its rows."""
+    view_name = constants.chasten.Chasten_Database_View
+    # sqlite only drops a view with DROP VIEW and a table with DROP TABLE
+    drop_type = "TABLE" if is_materialized(database_path) else "VIEW"
+    connection = sqlite3.connect(database_path)
+    # replace the view or the table in one transaction so that datasette
+    # never sees a database without a table of all of the results
+    connection.executescript(
+        f"""
+BEGIN;
+DROP {drop_type} IF EXISTS [{view_name}];
+CREATE TABLE [{view_name}] AS {CHASTEN_SQL_SELECT_QUERY}
+{CHASTEN_SQL_CREATE_COMPLETE_INDEXES}
+COMMIT;
+"""
+    )
+    row_count = connection.execute(f"SELECT COUNT(*) FROM [{view_name}]").fetchone()[0]
+    connection.close()
+    return row_count
+
+
+def update_materialized_view(database_path: Path, last_rowid: int) -> None:
+    """Add the rows of the matches after the last row to the table that materializes the view of all of the results."""
+    if not is_materialized(database_path):
+        refresh_materialized_view(database_path)
+        return
+    connection = sqlite3.connect(database_path)
+    # only the new matches are joined with their sources and configuration
+    # instead of creating the rows of all of the results again
+    with connection:
+        connection.execute(
+            f"INSERT INTO [{constants.chasten.Chasten_Database_View}] "
+            f"{CHASTEN_SQL_SELECT_ROWS} WHERE sources_check_matches.rowid > ? "
+            "ORDER BY datetime desc",
+            (last_rowid,),
+        )
+    connection.close()
+
+
+def update_full_text_search(database_path: Path, last_rowids: Dict[str, int]) -> None:
+    """Add the rows after the last row of each table to its full-text search."""
+    connection = sqlite3.connect(database_path)
+    with connection:
+        for table_name in CHASTEN_TABLES:
+            full_text_table_name = f"{table_name}_fts"
+            full_text_columns = find_table_columns(connection, full_text_table_name)
+            if len(full_text_columns) == 0:
+                continue
+            # the full-text search only refers to the rows of its table and
+            # so indexing the new rows does not index all of the rows again
+            columns = ", ".join(f"[{column}]" for column in full_text_columns)
+            connection.execute(
+                f"INSERT INTO [{full_text_table_name}] (rowid, {columns}) "
+                f"SELECT rowid, {columns} FROM [{table_name}] WHERE rowid > ?",
+                (last_rowids[table_name],),
+            )
+    connection.close()
+
+
 def create_chasten_view(chasten_database_name: str) -> None:
     """Create a view that combines results in the database tables."""
     database = Database(chasten_database_name)
@@ -51,35 +708,20 @@ def create_chasten_view(chasten_database_name: str) -> None:
     )
 
 
-def enable_full_text_search(chasten_database_name: str) -> None:
+def enable_full_text_search(
+    chasten_database_name: str,
+    search_columns: Optional[Dict[str, List[str]]] = None,
+) -> None:
     """Enable full-text search in the specific SQLite3 database."""
     database = Database(chasten_database_name)
-    # enable full-text search on the main database table
-    database["main"].enable_fts(
-        [
-            "configuration_chastenversion",
-            "configuration_projectname",
-            "configuration_datetime",
-        ]
-    )
-    # enable full-text search on the sources database table
-    database["sources"].enable_fts(
-        [
-            "filename",
-            "check_id",
-            "check_name",
-            "check_description",
-            "check_pattern",
-        ]
-    )
-    # enable full-text search on the sources database table
-    database["sources_check_matches"].enable_fts(
-        [
-            "lineno",
-            "coloffset",
-            "linematch",
-        ]
-    )
+    if search_columns is None:
+        search_columns = FULL_TEXT_SEARCH_COLUMNS
+    # enable full-text search on the main, sources, and matches tables with
+    # FTS5 tables whose content is in the tables, so that the text is not
+    # stored twice; note that the full-text search of a table is replaced
+    # only when it is not already searching the same columns
+    for table_name in CHASTEN_TABLES:
+        Table(database, table_name).enable_fts(search_columns[table_name], replace=True)
     # note that sqlite-utils does not support the enabling of
     # full-text search on the view called chasten_complete
 
@@ -0,0 +1,663 @@
+"""Search Python source code by parsing each file once for all of the checks."""
+
+import ast
+import itertools
+import math
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    FrozenSet,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from lxml.etree import _Element  # type: ignore
+from pyastgrep import asts, files  # type: ignore
+from pyastgrep import search as pyastgrepsearch  # type: ignore
+
+from chasten import (
+    astpath,
+    cache,
+    constants,
+    histogram,
+    output,
+    patterns,
+    prefilter,
+    projection,
+)
+
+
+@dataclass(frozen=True)
+class FileMatches:
+    """Record the positions that each of the checks matched in one file."""
+
+    path: Path
+    file_lines: List[str]
+    positions: List[List[pyastgrepsearch.Position]]
+
+
+@dataclass(frozen=True)
+class FileRecord:
+    """Record the matches in one file compactly for transfer between processes."""
+
+    path: str
+    matches: List[Tuple[int, int, int]]
+
+
+def get_python_files(paths: Sequence[Path]) -> List[Path]:
+    """Walk the paths once and return every Python source file that they contain."""
+    python_files: List[Path] = []
+    # use the same walker as pyastgrep so that the files (and the order in which
+    # they are found) match those that would be searched by search_python_files;
+    # note that this walker respects .gitignore files and skips hidden files
+    for path in files.get_files_to_search(paths):
+        # a path that does not exist cannot be searched and thus it is only logged
+        if isinstance(path, files.MissingPath):
+            output.logger.debug(f"Could not find the path {path.path}")
+            continue
+        python_files.append(path)
+    return python_files
+
+
+def parse_python_source(
+    path: Path, contents: bytes, names: Optional[FrozenSet[str]] = None
+) -> Tuple[_Element, Dict[_Element, pyastgrepsearch.Position]]:
+    """Parse Python source code and convert its AST to XML."""
+    # parse the contents into an abstract syntax tree, letting
+    # pyastgrep handle the detection of the source code's encoding
+    _, parsed_ast = files.parse_python_file(contents, path, auto_dedent=False)
+    # only create the elements that the patterns can reach when they
+    # name every element and attribute that they need in the tree
+    if names is not None:
+        return projection.create_pruned_xml(parsed_ast, names)
+    # convert the AST to XML, recording the mapping from each of
+    # the XML elements back to the AST node from which it was created
+    node_mappings: Dict[_Element, ast.AST] = {}
+    xml_root = asts.ast_to_xml(parsed_ast, node_mappings)
+    # record the position of each element that corresponds to an AST node;
+    # note that pyastgrep uses the position of the closest ancestor with a
+    # position for a node (like an operator) that does not have its own
+    element_positions: Dict[_Element, pyastgrepsearch.Position] = {}
+    for element, ast_node in node_mappings.items():
+        position = pyastgrepsearch.position_from_node(ast_node)
+        if position is not None:
+            element_positions[element] = position
+    return (xml_root, element_positions)
+
+
+def convert_python_source(
+    path: Path,
+    contents: bytes,
+    tree_cache: Optional[cache.TreeCache] = None,
+    content_id: Optional[str] = None,
+    names: Optional[FrozenSet[str]] = None,
+) -> Tuple[_Element, Dict[_Element, pyastgrepsearch.Position]]:
+    """Convert Python source code to XML, reusing the cached tree for the same contents."""
+    # there is no cache and thus the source code must always be parsed; note
+    # that the cache always stores the full tree, which every check can search,
+    # and thus only a tree that is not cached is pruned to the names of patterns
+    if tree_cache is None:
+        return parse_python_source(path, contents, names)
+    # look for the tree of the same contents in the cache; note that
+    # a failure to parse is also cached so that it is not repeated
+    if content_id is None:
+        content_id = cache.create_content_id(contents)
+    cached_tree = tree_cache.get(content_id)
+    if cached_tree is not None:
+        if not cached_tree.parsed:
+            raise SyntaxError(cached_tree.error)
+        return (cached_tree.xml_root, cached_tree.element_positions)  # type: ignore
+    # parse the source code and then add the tree, or the failure, to the cache
+    try:
+        (xml_root, element_positions) = parse_python_source(path, contents)
+    except (SyntaxError, ValueError) as error:
+        tree_cache.put_failure(content_id, str(error))
+        raise
+    tree_cache.put(content_id, xml_root, element_positions)
+    return (xml_root, element_positions)
+
+
+def decode_python_source(contents: bytes) -> List[str]:
+    """Decode Python source code into lines in the same way as pyastgrep."""
+    # decode the contents of the file with the encoding that pyastgrep would
+    # detect while parsing so that the lines are identical to those of a parse
+    return contents.decode(files.get_encoding(contents)).splitlines()
+
+
+def read_python_file_lines(path: Path) -> List[str]:
+    """Read the lines of a Python source file in the same way as pyastgrep."""
+    return decode_python_source(path.read_bytes())
+
+
+def query_xml_tree(
+    xml_root: _Element,
+    element_positions: Dict[_Element, pyastgrepsearch.Position],
+    expression: str,
+    xpath2: bool = True,
+    document: Optional[Any] = None,
+) -> List[pyastgrepsearch.Position]:
+    """Evaluate an XPath expression on an XML tree and return the matching positions."""
+    positions: List[pyastgrepsearch.Position] = []
+    # evaluate the expression with the same XPath engine that pyastgrep would
+    # use for this XPath version, compiling the expression only the first time
+    # that it is used and reusing the document when one was already created
+    if document is None:
+        document = patterns.create_document(xml_root, xpath2)
+    compiled_pattern = patterns.compile_pattern(expression, xpath2)
+    matching_elements = patterns.evaluate_pattern(compiled_pattern, document)
+    # an expression like count(...) returns a number instead of
+    # a node-set and thus there are no matches to report
+    try:
+        iterator = iter(matching_elements)
+    except TypeError:
+        return positions
+    # only keep those results that are elements corresponding to an AST node
+    # that has a position, which mirrors the matches created by pyastgrep
+    for element in iterator:
+        position = element_positions.get(element, None)
+        if position is not None:
+            positions.append(position)
+    return positions
+
+
+def evaluate_python_source(  # noqa: PLR0913
+    path: Path,
+    contents: bytes,
+    expressions: Sequence[str],
+    xpath2: bool = True,
+    tree_cache: Optional[cache.TreeCache] = None,
+    content_id: Optional[str] = None,
+) -> List[List[pyastgrepsearch.Position]]:
+    """Evaluate every one of the expressions on the XML tree of Python source code."""
+    # evaluate an expression that is in several checks, like the same check in
+    # two checks files, only once and then give each of the checks its matches
+    distinct_expressions = list(dict.fromkeys(expressions))
+    if len(distinct_expressions) < len(expressions):
+        distinct_positions = dict(
+            zip(
+                distinct_expressions,
+                evaluate_python_source(
+                    path,
+                    contents,
+                    distinct_expressions,
+                    xpath2,
+                    tree_cache,
+                    content_id,
+                ),
+            )
+        )
+        return [list(distinct_positions[expression]) for expression in expressions]
+    # an expression that requires text, like the def of a function or the name
+    # in a comparison, that the file does not contain cannot match the file and
+    # thus the file is only parsed when one of the expressions could match it
+    possible = prefilter.find_possible_expressions(contents, expressions)
+    if len(possible) < len(expressions):
+        positions: List[List[pyastgrepsearch.Position]] = [[] for _ in expressions]
+        if len(possible) > 0:
+            possible_positions = evaluate_python_source(
+                path,
+                contents,
+                [expressions[index] for index in possible],
+                xpath2,
+                tree_cache,
+                content_id,
+            )
+            for index, found in zip(possible, possible_positions):
+                positions[index] = found
+        return positions
+    # an expression that only looks for a type, or a pair of types, of AST nodes
+    # is answered from a histogram of the nodes and an expression in the subset
+    # of XPath that astpath supports is evaluated on the AST itself
+    type_queries = histogram.recognize_type_queries(expressions)
+    native_queries = astpath.compile_queries(expressions)
+    # parse the file and convert it to XML only once, no matter how many
+    # expressions there are; source code that cannot be parsed has no matches
+    try:
+        # none of the expressions need XPath and thus the source code is parsed
+        # without converting it to XML; note that the positions of the nodes are
+        # found right after parsing since the AST of a file shares the nodes of
+        # its contexts and operators, like Load, with the AST of every other file
+        if all(native_query is not None for native_query in native_queries):
+            _, parsed_ast = files.parse_python_file(contents, path, auto_dedent=False)
+            # the histogram is only faster when it answers every expression since
+            # the walk that creates it would otherwise repeat the walk of astpath
+            if all(type_query is not None for type_query in type_queries):
+                node_histogram = histogram.create_histogram(parsed_ast, xpath2)
+                return [
+                    list(node_histogram.positions(type_query))  # type: ignore
+                    for type_query in type_queries
+                ]
+            document = astpath.create_document(parsed_ast)
+            return [
+                astpath.find_positions(native_query, document, xpath2)  # type: ignore
+                for native_query in native_queries
+            ]
+        # the XML tree only needs the elements and attributes that are named by
+        # the expressions, unless one of them uses a wildcard
+        (xml_root, element_positions) = convert_python_source(
+            path,
+            contents,
+            tree_cache,
+            content_id,
+            projection.get_projection(tuple(expressions)),
+        )
+    except (SyntaxError, ValueError) as error:
+        output.logger.debug(f"Could not parse {path}: {error}")
+        return [[] for _ in expressions]
+    # the XML tree is needed for some of the expressions; for XPath 2.0, creating
+    # the histogram from the tree is faster than evaluating the recognized
+    # expressions but lxml's compiled XPath 1.0 is faster than a walk in Python
+    xml_histogram: Optional[histogram.NodeHistogram] = None
+    if xpath2 and any(type_query is not None for type_query in type_queries):
+        xml_histogram = histogram.create_histogram_from_xml(
+            xml_root, element_positions, xpath2
+        )
+    # evaluate every one of the other expressions against the same XML tree
+    xml_document = patterns.create_document(xml_root, xpath2)
+    return [
+        list(xml_histogram.positions(type_query))
+        if xml_histogram is not None and type_query is not None
+        else query_xml_tree(
+            xml_root, element_positions, expression, xpath2, xml_document
+        )
+        for expression, type_query in zip(expressions, type_queries)
+    ]
+
+
+def search_python_file(  # noqa: PLR0913
+    path: Path,
+    expressions: Sequence[str],
+    xpath2: bool = True,
+    tree_cache: Optional[cache.TreeCache] = None,
+    match_cache: Optional[cache.MatchCache] = None,
+    content_id: Optional[str] = None,
+    read_lines: bool = True,
+) -> FileMatches:
+    """Search a single Python source file with every one of the expressions."""
+    no_matches = FileMatches(path, [], [[] for _ in expressions])
+    # look up the matches of the expressions that were previously evaluated
+    # on the same contents; note that a file that has not changed since a
+    # git ref already has a known content id and thus it is not read when
+    # all of its matches are cached; only the remaining expressions need a tree
+    cached_positions: List[Optional[List[pyastgrepsearch.Position]]] = [
+        None for _ in expressions
+    ]
+    if match_cache is not None and content_id is not None:
+        cached_positions = match_cache.get(content_id, expressions)
+    missing = [index for index, found in enumerate(cached_positions) if found is None]
+    contents = None
+    evaluated_positions: Iterator[List[pyastgrepsearch.Position]] = iter([])
+    if len(missing) > 0:
+        # a file that cannot be read does not have any matches
+        try:
+            contents = path.read_bytes()
+        except OSError as error:
+            output.logger.debug(f"Could not read {path}: {error}")
+            return no_matches
+        if match_cache is not None and content_id is None:
+            content_id = cache.create_content_id(contents)
+            cached_positions = match_cache.get(content_id, expressions)
+            missing = [
+                index for index, found in enumerate(cached_positions) if found is None
+            ]
+        evaluated_positions = iter(
+            evaluate_python_source(
+                path,
+                contents,
+                [expressions[index] for index in missing],
+                xpath2,
+                tree_cache,
+                content_id,
+            )
+        )
+    positions: List[List[pyastgrepsearch.Position]] = []
+    for index, found in enumerate(cached_positions):
+        if found is not None:
+            positions.append(found)
+            continue
+        evaluated = next(evaluated_positions)
+        # record the matches so that the expression is not evaluated
+        # again for these contents during a later analysis
+        if match_cache is not None and content_id is not None:
+            match_cache.put(content_id, expressions[index], evaluated)
+        positions.append(evaluated)
+    # the lines of the file are only needed, and thus only decoded, when there are
+    # matches whose details are reported instead of only counting the matches
+    if not read_lines or all(len(found) == 0 for found in positions):
+        return FileMatches(path, [], positions)
+    try:
+        if contents is None:
+            contents = path.read_bytes()
+        file_lines = decode_python_source(contents)
+    except (OSError, SyntaxError, ValueError) as error:
+        output.logger.debug(f"Could not decode {path}: {error}")
+        return no_matches
+    return FileMatches(path, file_lines, positions)
+
+
+def open_tree_cache(cache_directory: Optional[Path]) -> Optional[cache.TreeCache]:
+    """Open the tree cache in the directory, if caching is enabled."""
+    if cache_directory is None:
+        return None
+    return cache.TreeCache(cache_directory)
+
+
+def open_match_cache(
+    match_cache_directory: Optional[Path], xpath2: bool = True
+) -> Optional[cache.MatchCache]:
+    """Open the match cache in the directory, if caching is enabled."""
+    if match_cache_directory is None:
+        return None
+    return cache.MatchCache(match_cache_directory, xpath2)
+
+
+def close_caches(*caches: Optional[cache.DatabaseCache]) -> None:
+    """Close each of the caches that is open."""
+    for current_cache in caches:
+        if current_cache is not None:
+            current_cache.close()
+
+
+def search_python_file_chunk(  # noqa: PLR0913
+    paths: Sequence[str],
+    expressions: Sequence[str],
+    xpath2: bool = True,
+    cache_directory: Optional[Path] = None,
+    match_cache_directory: Optional[Path] = None,
+    content_ids: Optional[Sequence[Optional[str]]] = None,
+) -> List[FileRecord]:
+    """Search a chunk of Python source files and return compact records of the matches."""
+    file_records: List[FileRecord] = []
+    # this function runs inside of a worker process and thus it only returns the
+    # check index, line number, and column offset for each match; this avoids
+    # pickling the lines of the file, the XML elements, and the AST nodes
+    tree_cache = open_tree_cache(cache_directory)
+    match_cache = open_match_cache(match_cache_directory, xpath2)
+    if content_ids is None:
+        content_ids = [None for _ in paths]
+    for path, content_id in zip(paths, content_ids):
+        file_matches = search_python_file(
+            Path(path),
+            expressions,
+            xpath2,
+            tree_cache,
+            match_cache,
+            content_id,
+            read_lines=False,
+        )
+        matches = [
+            (check_index, position.lineno, position.col_offset)
+            for check_index, positions in enumerate(file_matches.positions)
+            for position in positions
+        ]
+        file_records.append(FileRecord(path, matches))
+    close_caches(tree_cache, match_cache)
+    return file_records
+
+
+def convert_file_record(
+    file_record: FileRecord, expression_count: int, read_lines: bool = True
+) -> FileMatches:
+    """Convert a compact record of the matches in a file back to the matches in that file."""
+    positions: List[List[pyastgrepsearch.Position]] = [
+        [] for _ in range(expression_count)
+    ]
+    for check_index, lineno, col_offset in file_record.matches:
+        positions[check_index].append(pyastgrepsearch.Position(lineno, col_offset))
+    # the lines of the file are only needed, and thus only read, when there are
+    # matches whose details are reported instead of only counting the matches
+    path = Path(file_record.path)
+    file_lines: List[str] = []
+    if read_lines and len(file_record.matches) > 0:
+        # a file that cannot be read or decoded after it was searched does not
+        # have any matches, in the same way as when it is searched serially
+        try:
+            file_lines = read_python_file_lines(path)
+        except (OSError, SyntaxError, ValueError) as error:
+            output.logger.debug(f"Could not decode {path}: {error}")
+            return FileMatches(path, [], [[] for _ in range(expression_count)])
+    return FileMatches(path, file_lines, positions)
+
+
+def create_chunks(paths: Sequence[Path], workers: int) -> List[List[str]]:
+    """Divide the paths into chunks so that each worker receives several of them."""
+    # create several chunks for each of the workers so that a worker that finishes
+    # early can pick up more work, while bounding the size of a single chunk
+    chunk_size = math.ceil(len(paths) / (workers * constants.engine.Chunks_Per_Worker))
+    chunk_size = max(1, min(chunk_size, constants.engine.Maximum_Chunk_Size))
+    return [
+        [str(path) for path in paths[start : start + chunk_size]]
+        for start in range(0, len(paths), chunk_size)
+    ]
+
+
+def find_content_ids(
+    python_files: Sequence[Path], content_ids: Optional[Dict[Path, str]]
+) -> List[Optional[str]]:
+    """Find the known content id of each file, which is None for a file without one."""
+    if content_ids is None:
+        return [None for _ in python_files]
+    # the known content ids are keyed by absolute paths without symbolic links
+    return [content_ids.get(path.resolve(), None) for path in python_files]
+
+
+def find_file_candidates(
+    python_files: Sequence[Path],
+    candidate_expressions: Optional[Dict[Path, FrozenSet[int]]],
+) -> List[Optional[FrozenSet[int]]]:
+    """Find the expressions that could match each file, which is None when any of them could."""
+    if candidate_expressions is None:
+        return [None for _ in python_files]
+    # the candidate expressions are keyed by absolute paths without symbolic links
+    return [candidate_expressions.get(path.resolve(), None) for path in python_files]
+
+
+def combine_candidates(
+    file_candidates: Sequence[Optional[FrozenSet[int]]],
+) -> Optional[FrozenSet[int]]:
+    """Combine the expressions that could match any of the files in a chunk."""
+    # a chunk of files is searched with the same expressions and thus it is
+    # searched with every expression that could match one of its files
+    if any(candidates is None for candidates in file_candidates):
+        return None
+    return frozenset().union(*file_candidates)  # type: ignore
+
+
+def filter_candidate_expressions(
+    active_expressions: List[int], candidates: Optional[FrozenSet[int]]
+) -> List[int]:
+    """Filter the active expressions to those that could match a file."""
+    if candidates is None:
+        return active_expressions
+    return [index for index in active_expressions if index in candidates]
+
+
+def determine_workers(workers: int) -> int:
+    """Determine the number of worker processes, using all of the CPUs when workers is zero."""
+    if workers <= 0:
+        return os.cpu_count() or constants.engine.Serial_Workers
+    return workers
+
+
+def find_active_expressions(
+    match_counts: Sequence[int],
+    maximum_counts: Optional[Sequence[Optional[int]]] = None,
+) -> List[int]:
+    """Find the indices of the expressions that still need to be evaluated."""
+    # an expression whose count already exceeds its maximum cannot pass and
+    # thus, when stopping early is requested, it is not evaluated on more files
+    if maximum_counts is None:
+        return list(range(len(match_counts)))
+    return [
+        index
+        for index, (match_count, maximum_count) in enumerate(
+            zip(match_counts, maximum_counts)
+        )
+        if maximum_count is None or match_count <= maximum_count
+    ]
+
+
+def expand_file_matches(
+    file_matches: FileMatches, active_expressions: Sequence[int], expression_count: int
+) -> FileMatches:
+    """Expand the matches for the active expressions to the matches for all of the expressions."""
+    if len(active_expressions) == expression_count:
+        return file_matches
+    positions: List[List[pyastgrepsearch.Position]] = [
+        [] for _ in range(expression_count)
+    ]
+    for index, active_positions in zip(active_expressions, file_matches.positions):
+        positions[index] = active_positions
+    return FileMatches(file_matches.path, file_matches.file_lines, positions)
+
+
+def count_file_matches(match_counts: List[int], file_matches: FileMatches) -> None:
+    """Add the number of matches for each of the expressions in a file to the counts."""
+    for index, positions in enumerate(file_matches.positions):
+        match_counts[index] += len(positions)
+
+
+def search_python_files(  # noqa: PLR0913
+    paths: Sequence[Path],
+    expressions: Sequence[str],
+    xpath2: bool = True,
+    workers: int = constants.engine.Serial_Workers,
+    cache_directory: Optional[Path] = None,
+    match_cache_directory: Optional[Path] = None,
+    content_ids: Optional[Dict[Path, str]] = None,
+    maximum_counts: Optional[Sequence[Optional[int]]] = None,
+    read_lines: bool = True,
+    candidate_expressions: Optional[Dict[Path, FrozenSet[int]]] = None,
+) -> Generator[FileMatches, None, None]:
+    """Search all of the Python source files in the paths with every one of the expressions."""
+    # walk the paths only once and then search each of the files that were found;
+    # note that the content ids of the files that did not change since a git ref
+    # are already known and thus those files do not need to be read or hashed;
+    # a file is only searched with the expressions that the index of the
+    # repository found could match it, when there is an index
+    python_files = get_python_files(paths)
+    known_content_ids = find_content_ids(python_files, content_ids)
+    file_candidates = find_file_candidates(python_files, candidate_expressions)
+    workers = determine_workers(workers)
+    # search the files with a pool of worker processes
+    if workers != constants.engine.Serial_Workers and len(python_files) > 1:
+        yield from search_python_files_in_parallel(
+            python_files,
+            (known_content_ids, file_candidates),
+            expressions,
+            xpath2,
+            workers,
+            (cache_directory, match_cache_directory),
+            maximum_counts,
+            read_lines,
+        )
+        return
+    # search the files in this process, yielding the matches for one file at a time;
+    # note that the caches are closed even when the search of the files stops early
+    match_counts = [0 for _ in expressions]
+    tree_cache = open_tree_cache(cache_directory)
+    match_cache = open_match_cache(match_cache_directory, xpath2)
+    try:
+        for path, content_id, candidates in zip(
+            python_files, known_content_ids, file_candidates
+        ):
+            active_expressions = filter_candidate_expressions(
+                find_active_expressions(match_counts, maximum_counts), candidates
+            )
+            file_matches = search_python_file(
+                path,
+                [expressions[index] for index in active_expressions],
+                xpath2,
+                tree_cache,
+                match_cache,
+                content_id,
+                read_lines,
+            )
+            file_matches = expand_file_matches(
+                file_matches, active_expressions, len(expressions)
+            )
+            count_file_matches(match_counts, file_matches)
+            yield file_matches
+    finally:
+        close_caches(tree_cache, match_cache)
+
+
+def search_python_files_in_parallel(  # noqa: PLR0913
+    python_files: Sequence[Path],
+    file_details: Tuple[Sequence[Optional[str]], Sequence[Optional[FrozenSet[int]]]],
+    expressions: Sequence[str],
+    xpath2: bool,
+    workers: int,
+    cache_directories: Tuple[Optional[Path], Optional[Path]],
+    maximum_counts: Optional[Sequence[Optional[int]]] = None,
+    read_lines: bool = True,
+) -> Generator[FileMatches, None, None]:
+    """Search the Python source files with a pool of worker processes."""
+    (cache_directory, match_cache_directory) = cache_directories
+    (known_content_ids, file_candidates) = file_details
+    chunks = create_chunks(python_files, workers)
+    content_id_chunks = []
+    candidate_chunks: List[Optional[FrozenSet[int]]] = []
+    start = 0
+    for chunk in chunks:
+        content_id_chunks.append(known_content_ids[start : start + len(chunk)])
+        candidate_chunks.append(
+            combine_candidates(file_candidates[start : start + len(chunk)])
+        )
+        start += len(chunk)
+    remaining_chunks = iter(zip(chunks, content_id_chunks, candidate_chunks))
+    # only submit a few chunks for each worker at a time so that the chunks
+    # submitted later do not evaluate the expressions that exceeded their
+    # maximum count; note that the records of the chunks are consumed in the
+    # order of the files, thereby ensuring that the results are the same as
+    # those of a serial search (as long as the search does not stop early)
+    maximum_in_flight = workers * constants.engine.Chunks_In_Flight_Per_Worker
+    in_flight: Deque[Tuple[Future, List[int]]] = deque()
+    match_counts = [0 for _ in expressions]
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(chunks)))
+    try:
+        while True:
+            # submit the next chunks with the expressions that are still active
+            for chunk, content_id_chunk, candidates in itertools.islice(
+                remaining_chunks, maximum_in_flight - len(in_flight)
+            ):
+                active_expressions = filter_candidate_expressions(
+                    find_active_expressions(match_counts, maximum_counts), candidates
+                )
+                future = executor.submit(
+                    search_python_file_chunk,
+                    chunk,
+                    [expressions[index] for index in active_expressions],
+                    xpath2,
+                    cache_directory,
+                    match_cache_directory,
+                    content_id_chunk,
+                )
+                in_flight.append((future, active_expressions))
+            if len(in_flight) == 0:
+                break
+            # wait for the oldest chunk and then yield the matches for its files
+            (future, active_expressions) = in_flight.popleft()
+            for file_record in future.result():
+                file_matches = expand_file_matches(
+                    convert_file_record(
+                        file_record, len(active_expressions), read_lines
+                    ),
+                    active_expressions,
+                    len(expressions),
+                )
+                count_file_matches(match_counts, file_matches)
+                yield file_matches
+    finally:
+        # the chunks that did not start are cancelled when the search stops early
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -3,6 +3,28 @@
 from enum import Enum
 
 
+class CacheTask(str, Enum):
+    """Define the different cache task possibilities."""
+
+    CLEAR = "clear"
+    STATS = "stats"
+
+
+class DatabaseTask(str, Enum):
+    """Define the different database task possibilities."""
+
+    INDEX = "index"
+    REFRESH = "refresh"
+
+
+class IndexTask(str, Enum):
+    """Define the different index task possibilities."""
+
+    BUILD = "build"
+    CLEAR = "clear"
+    STATS = "stats"
+
+
 class ConfigureTask(str, Enum):
     """Define the different task possibilities."""
 
@@ -17,6 +39,14 @@ class DatasettePublicationPlatform(str, Enum):
     VERCEL = "vercel"
 
 
+class ResultsFormat(str, Enum):
+    """Define the formats for saving the results of an analysis."""
+
+    JSON = "json"
+    JSON_V2 = "json-v2"
+    NDJSON = "ndjson"
+
+
 class FilterableAttribute(str, Enum):
     """Define the names of attributes that are subject to filtering."""
 
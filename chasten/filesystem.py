@@ -10,7 +10,17 @@ from typing import Any, Dict, List, NoReturn, Optional, Tuple, Union
 import flatterer  # type: ignore
 from rich.tree import Tree
 
-from chasten import configuration, constants, database, results
+from chasten import (
+    configuration,
+    constants,
+    database,
+    enumerations,
+    matrix,
+    normalize,
+    results,
+    stream,
+    util,
+)
 
 CONFIGURATION_FILE_DEFAULT_CONTENTS = """
 # chasten configuration
@@ -86,6 +96,54 @@ def detect_configuration(config: Optional[Path]) -> str:
     return chasten_user_config_dir_str
 
 
+def detect_cache_directory(cache_directory: Optional[Path]) -> Path:
+    """Detect the directory that stores the cache."""
+    # there is a specified cache directory path and thus
+    # this overrides the use of the platform-specific cache
+    if cache_directory is not None:
+        return cache_directory
+    # there is no cache directory specified and thus this function
+    # should use the platform-specific cache directory from platformdirs
+    return Path(
+        configuration.user_cache_dir(
+            application_name=constants.chasten.Application_Name,
+            application_author=constants.chasten.Application_Author,
+        )
+    )
+
+
+def detect_match_cache_directory(
+    config: Optional[str], cache_directory: Optional[Path] = None
+) -> Path:
+    """Detect the directory that stores the cache of matches for a configuration."""
+    # a configuration from a URL does not have a local directory and
+    # thus its matches are stored in the same directory as the trees
+    if config is not None and util.is_url(config):
+        return detect_cache_directory(cache_directory)
+    # store the matches next to the configuration directory so that
+    # each project's configuration has its own cache of matches
+    configuration_directory = Path(
+        detect_configuration(Path(config) if config is not None else None)
+    ).resolve()
+    return configuration_directory.parent / constants.cache.Matches_Directory
+
+
+def detect_index_directory(
+    search_path: Path, index_directory: Optional[Path] = None
+) -> Path:
+    """Detect the directory that stores the index of the Python source code in a search path."""
+    # there is a specified index directory path and thus it is used
+    if index_directory is not None:
+        return index_directory
+    # store the index in a hidden directory of the searched directory, or of
+    # the directory that contains the searched file, so that each repository
+    # has its own index; note that hidden directories are not searched
+    search_directory = search_path.resolve()
+    if not search_directory.is_dir():
+        search_directory = search_directory.parent
+    return search_directory / constants.index.Directory
+
+
 def create_configuration_directory(
     config: Optional[Path] = None, force: bool = False
 ) -> Union[Path, NoReturn]:
@@ -173,6 +231,23 @@ def get_default_directory_list() -> List[Path]:
     return default_directory_list
 
 
+def create_results_file_name(
+    projectname: str, results_configuration: results.Configuration, extension: str
+) -> str:
+    """Create the name of the file for the results of an analysis with its configuration."""
+    # extract the unique hexadecimal code that will ensure that
+    # this file name is unique when it is being saved
+    results_file_uuid = results_configuration.fileuuid
+    # extract the current date and time when results were created
+    formatted_datetime = results_configuration._datetime
+    # create a file name so that it includes:
+    # a) the name of the project
+    # b) the date on which analysis was completed
+    # c) a unique identifier to handle cased when
+    #    two result files are created at "same time"
+    return f"{constants.filesystem.Main_Results_File_Name}-{projectname}-{formatted_datetime}-{results_file_uuid}.{extension}"
+
+
 def write_chasten_results(
     results_path: Path,
     projectname: str,
@@ -181,17 +256,11 @@ def write_chasten_results(
 ) -> str:
     """Write the results of a Chasten subclass of Pydantic BaseModel to the specified directory."""
     if save:
-        # extract the unique hexadecimal code that will ensure that
-        # this file name is unique when it is being saved
-        results_file_uuid = results_content.configuration.fileuuid
-        # extract the current date and time when results were created
-        formatted_datetime = results_content.configuration._datetime
-        # create a file name so that it includes:
-        # a) the name of the project
-        # b) the date on which analysis was completed
-        # c) a unique identifier to handle cased when
-        #    two result files are created at "same time"
-        complete_results_file_name = f"{constants.filesystem.Main_Results_File_Name}-{projectname}-{formatted_datetime}-{results_file_uuid}.{constants.filesystem.Results_Extension}"
+        complete_results_file_name = create_results_file_name(
+            projectname,
+            results_content.configuration,
+            constants.filesystem.Results_Extension,
+        )
         # create the file and then write the text,
         # using indentation to ensure that JSON file is readable
         results_path_with_file = results_path / complete_results_file_name
@@ -209,6 +278,38 @@ def write_chasten_results(
     return constants.markers.Empty_String
 
 
+def write_normalized_results(
+    results_path: Path, projectname: str, results_content: results.NormalizedChasten
+) -> str:
+    """Write the normalized results of an analysis to the specified directory."""
+    complete_results_file_name = create_results_file_name(
+        projectname,
+        results_content.configuration,
+        constants.filesystem.Results_Extension,
+    )
+    # each match is a row that refers to its check and so the checks do not
+    # repeat their matches; note that the JSON is not indented so that the
+    # normalized results are as small as possible
+    results_json = results_content.model_dump_json(
+        exclude={"checks": {"__all__": {"matches"}}}
+    )
+    (results_path / complete_results_file_name).write_text(results_json, "utf-8")
+    return complete_results_file_name
+
+
+def write_count_matrix(
+    results_path: Path, results_file_name: str, count_matrix: matrix.CountMatrix
+) -> str:
+    """Write the matrix of the counts of the matches next to the results file with the same name."""
+    matrix_file_name = str(
+        Path(results_file_name).with_suffix(
+            f"{constants.filesystem.Dot}{constants.matrix.Extension}"
+        )
+    )
+    matrix.write_count_matrix(count_matrix, results_path / matrix_file_name)
+    return matrix_file_name
+
+
 def write_dict_results(
     results_json: str,
     results_path: Path,
@@ -236,30 +337,77 @@ def write_dict_results(
     return complete_results_file_name
 
 
+def create_flattened_directory_name(projectname: str) -> str:
+    """Create the name of the directory for the database of the integrated results."""
+    # generate a unique hexadecimal code that will ensure that
+    # this directory name is unique when it is being created
+    results_file_uuid = uuid.uuid4().hex
+    # create a formatted datetime
+    formatted_datetime = str(datetime.now().strftime("%Y%m%d%H%M%S"))
+    # create a final part of the directory name so that it includes:
+    # a) the name of the project
+    # b) the date on which analysis was completed
+    # c) a unique identifier to handle cased when
+    #    two directories are created at "same time"
+    return f"{constants.filesystem.Main_Results_Flattened_Directory_Name}-{projectname}-{formatted_datetime}-{results_file_uuid}"
+
+
+def write_results_database(  # noqa: PLR0913
+    json_paths: List[Path],
+    results_path: Path,
+    projectname: str,
+    materialize: bool = False,
+    search_columns: Optional[Dict[str, List[str]]] = None,
+    defer_search: bool = False,
+) -> str:
+    """Write the results in each of the files straight into a new database in the specified directory."""
+    database_directory = results_path / create_flattened_directory_name(projectname)
+    database_directory.mkdir()
+    add_results_to_database(
+        json_paths,
+        database_directory / constants.datasette.Chasten_Database,
+        materialize,
+        search_columns,
+        defer_search,
+    )
+    # return the name of the directory that contains the database
+    return str(database_directory)
+
+
+def add_results_to_database(
+    json_paths: List[Path],
+    database_path: Path,
+    materialize: bool = False,
+    search_columns: Optional[Dict[str, List[str]]] = None,
+    defer_search: bool = False,
+) -> Tuple[int, int]:
+    """Add the results in each of the files that are not yet in a database to it."""
+    # read the results in one file at a time so that only the rows of the
+    # results that were not yet inserted into the database are in memory
+    return database.write_results_database(
+        database_path,
+        (read_json_results(json_path) for json_path in json_paths),
+        materialize,
+        search_columns,
+        defer_search,
+    )
+
+
 def write_flattened_csv_and_database(
     combined_results_json: str,
     results_path: Path,
     projectname: str,
+    search_columns: Optional[Dict[str, List[str]]] = None,
+    defer_search: bool = False,
 ) -> str:
     """Write flattened CSV files with results to the specified directory and create the database."""
-    # generate a unique hexadecimal code that will ensure that
-    # this file name is unique when it is being saved
-    results_file_uuid = uuid.uuid4().hex
-    # create a formatted datetime
-    formatted_datetime = str(datetime.now().strftime("%Y%m%d%H%M%S"))
     # create a string-based name for the JSON file that contains
     # the combined results, suitable for input to the flatten function
     combined_results_json_file = results_path / Path(combined_results_json)
     combined_results_json_file_str = str(combined_results_json_file)
-    # create a final part of the directory name so that it includes:
-    # a) the name of the project
-    # b) the date on which analysis was completed
-    # c) a unique identifier to handle cased when
-    #    two directories are created at "same time"
-    complete_flattened_results_directory_name = f"{constants.filesystem.Main_Results_Flattened_Directory_Name}-{projectname}-{formatted_datetime}-{results_file_uuid}"
     # the output directory is contained inside of the results_path
-    flattened_output_directory = (
-        results_path / complete_flattened_results_directory_name
+    flattened_output_directory = results_path / create_flattened_directory_name(
+        projectname
     )
     # the flatten function expects a string-based directory name
     flattened_output_directory_str = str(flattened_output_directory)
@@ -280,24 +428,59 @@ def write_flattened_csv_and_database(
         sqlite=True,
         sqlite_path=database_file_name_str,
     )
+    # index the columns that link and filter the rows of the tables
+    database.create_indexes(database_file_name)
+    # roll up the counts of the matches of all of the flattened results
+    database.update_rollup_tables(database_file_name, 0)
     # create a view that combines all of the data
     database.create_chasten_view(database_file_name_str)
-    # enable full-text search in the SQLite3 database
-    database.enable_full_text_search(database_file_name_str)
+    # enable full-text search in the SQLite3 database, unless it is
+    # enabled later, after the database is created
+    if not defer_search:
+        database.enable_full_text_search(database_file_name_str, search_columns)
     # return the name of the directory that contains the flattened CSV files
     return flattened_output_directory_str
 
 
+def is_results_file(json_path: Path) -> bool:
+    """Determine whether or not a file has the extension of the saved results of an analysis."""
+    return json_path.suffix in (
+        f"{constants.filesystem.Dot}{constants.filesystem.Results_Extension}",
+        f"{constants.filesystem.Dot}{enumerations.ResultsFormat.NDJSON.value}",
+    )
+
+
+def read_json_results(json_path: Path) -> Dict[Any, Any]:
+    """Read the results of an analysis, saved in any of the formats, into a dictionary."""
+    # turn the contents of the current JSON file into a dictionary;
+    # note that the records of a stream are combined into a dictionary
+    # that is the same as the one for the results saved as JSON
+    if (
+        json_path.suffix
+        == f"{constants.filesystem.Dot}{enumerations.ResultsFormat.NDJSON.value}"
+    ):
+        with json_path.open(encoding="utf-8") as results_file:
+            json_dict = stream.read_results_stream(results_file)
+    else:
+        json_dict = json.loads(json_path.read_text("utf-8"))
+    # the normalized results are expanded into the same dictionary as the
+    # results that are not normalized so that both can be combined
+    if (
+        json_dict.get(constants.schema.Version, None)
+        == constants.schema.Normalized_Version
+    ):
+        json_dict = normalize.expand_normalized_results(json_dict)
+    return json_dict
+
+
 def get_json_results(json_paths: List[Path]) -> List[Dict[Any, Any]]:
     """Get a list of dictionaries, one the contents of each JSON file path."""
     # create an empty list of dictionaries
     json_dicts_list: List[Dict[Any, Any]] = []
     # iterate through each of the provided paths to a JSON file
     for json_path in json_paths:
-        # turn the contents of the current JSON file into a dictionary
-        json_dict = json.loads(json_path.read_text("utf-8"))
         # add the current dictionary to the list of dictionaries
-        json_dicts_list.append(json_dict)
+        json_dicts_list.append(read_json_results(json_path))
     # return the list of JSON dictionaries
     return json_dicts_list
 
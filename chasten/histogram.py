@@ -0,0 +1,244 @@
+"""Answer the checks that only look for types of AST nodes from a histogram of a file's nodes."""
+
+import ast
+import functools
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, DefaultDict, Dict, List, Optional, Sequence, Tuple
+
+from lxml.etree import _Element  # type: ignore
+from pyastgrep import search as pyastgrepsearch  # type: ignore
+
+NAME = r"[A-Za-z_][A-Za-z0-9_]*"
+
+# a pattern like .//ClassDef or //ClassDef matches every node of one type
+TYPE_PATTERN = re.compile(rf"(\.?)//({NAME})")
+
+# a pattern like .//FunctionDef/body/If matches every node of one type that is
+# in a field of a node of another type; note that the absolute form of this
+# pattern is not recognized because, unlike the relative form, it also matches
+# the nodes in the fields of the root Module of the tree
+PAIR_PATTERN = re.compile(rf"\.//({NAME})/({NAME})/({NAME})")
+
+Positions = List[pyastgrepsearch.Position]
+
+PairKey = Tuple[str, str, str]
+
+FIELD_ENTRY_LENGTH = 4
+
+
+@dataclass(frozen=True)
+class TypeQuery:
+    """Describe a pattern that only looks for a type, or a pair of types, of AST nodes."""
+
+    node_type: str
+    parent_type: Optional[str] = None
+    field_name: Optional[str] = None
+    absolute: bool = False
+
+
+@dataclass(frozen=True)
+class NodeHistogram:
+    """Record the positions of the AST nodes in a file by their type and by their parent's type."""
+
+    types: Dict[str, Positions]
+    document_types: Dict[str, Positions]
+    pairs: Dict[PairKey, Positions]
+
+    def positions(self, type_query: TypeQuery) -> Positions:
+        """Return the positions of the nodes that a query matches, in the order of XPath's results."""
+        if type_query.parent_type is not None:
+            pair_key = (
+                type_query.parent_type,
+                str(type_query.field_name),
+                type_query.node_type,
+            )
+            return self.pairs.get(pair_key, [])
+        if type_query.absolute:
+            return self.document_types.get(type_query.node_type, [])
+        return self.types.get(type_query.node_type, [])
+
+    def count(self, type_query: TypeQuery) -> int:
+        """Return the number of nodes that a query matches."""
+        return len(self.positions(type_query))
+
+
+@functools.lru_cache(maxsize=None)
+def recognize_type_query(pattern: str) -> Optional[TypeQuery]:
+    """Recognize a pattern that only looks for a type, or a pair of types, of AST nodes."""
+    pattern = pattern.strip()
+    type_match = TYPE_PATTERN.fullmatch(pattern)
+    if type_match is not None:
+        (relative, node_type) = type_match.groups()
+        return TypeQuery(node_type, absolute=not relative)
+    pair_match = PAIR_PATTERN.fullmatch(pattern)
+    if pair_match is not None:
+        (parent_type, field_name, node_type) = pair_match.groups()
+        return TypeQuery(node_type, parent_type, field_name)
+    # every other pattern must be evaluated with XPath
+    return None
+
+
+def recognize_type_queries(patterns: Sequence[str]) -> List[Optional[TypeQuery]]:
+    """Recognize each of the patterns that only look for types of AST nodes."""
+    return [recognize_type_query(pattern) for pattern in patterns]
+
+
+def sort_by_parent(
+    ranked_positions: List[Tuple[int, pyastgrepsearch.Position]]
+) -> Positions:
+    """Sort the positions of nodes by the rank of their parents, keeping the order of each parent's nodes."""
+    return [
+        position
+        for _, position in sorted(ranked_positions, key=lambda ranked: ranked[0])
+    ]
+
+
+def create_histogram(parsed_ast: ast.AST, xpath2: bool = True) -> NodeHistogram:
+    """Create the histogram of an AST's nodes with a single walk of the tree."""
+    document_types: DefaultDict[str, Positions] = defaultdict(list)
+    document_pairs: DefaultDict[PairKey, Positions] = defaultdict(list)
+    context_types: DefaultDict[str, Positions] = defaultdict(list)
+    ranked_pairs: DefaultDict[
+        PairKey, List[Tuple[int, pyastgrepsearch.Position]]
+    ] = defaultdict(list)
+    # walk the tree in the order of the elements in pyastgrep's XML document,
+    # which is the order of XPath 1.0's results, instead of the breadth-first
+    # order of ast.walk; a node comes before the elements of its fields and the
+    # element of a field comes before the nodes that it contains. Each entry on
+    # the stack is either a field, with its parent's type and rank and its nodes,
+    # or a node, with its position and rank and its parent's type, rank and field
+    stack: List[Any] = [
+        (None, -1, field_name, nodes)
+        for field_name, nodes in reversed(get_fields(parsed_ast))
+    ]
+    rank = 0
+    while stack:
+        entry = stack.pop()
+        if len(entry) == FIELD_ENTRY_LENGTH:
+            # for each context node of a relative pattern, in document order,
+            # elementpath returns the matching children of that node without
+            # sorting them again and thus XPath 2.0 returns the nodes in the
+            # same field together; the rank of a node is its place in that order
+            (parent_type, parent_rank, field_name, nodes) = entry
+            node_entries = []
+            for node in nodes:
+                node_type = node.__class__.__name__
+                position = pyastgrepsearch.position_from_node(node)
+                if position is not None:
+                    context_types[node_type].append(position)
+                node_entries.append(
+                    (
+                        node,
+                        node_type,
+                        position,
+                        rank,
+                        parent_type,
+                        parent_rank,
+                        field_name,
+                    )
+                )
+                rank += 1
+            stack.extend(reversed(node_entries))
+            continue
+        # only count the nodes that have a position, which mirrors pyastgrep;
+        # note that the root of the tree is never the parent in a pair because
+        # the relative patterns of XPath never match the root
+        (
+            node,
+            node_type,
+            position,
+            node_rank,
+            parent_type,
+            parent_rank,
+            field_name,
+        ) = entry
+        if position is not None:
+            document_types[node_type].append(position)
+            if parent_type is not None:
+                pair_key = (parent_type, field_name, node_type)
+                document_pairs[pair_key].append(position)
+                ranked_pairs[pair_key].append((parent_rank, position))
+        stack.extend(
+            (node_type, node_rank, child_field_name, nodes)
+            for child_field_name, nodes in reversed(get_fields(node))
+        )
+    # the absolute patterns of XPath 2.0 and all of XPath 1.0's results are
+    # in document order, unlike the results of XPath 2.0's relative patterns
+    if not xpath2:
+        return NodeHistogram(
+            dict(document_types), dict(document_types), dict(document_pairs)
+        )
+    context_pairs = {
+        pair_key: sort_by_parent(positions)
+        for pair_key, positions in ranked_pairs.items()
+    }
+    return NodeHistogram(dict(context_types), dict(document_types), context_pairs)
+
+
+def get_fields(node: ast.AST) -> List[Tuple[str, List[ast.AST]]]:
+    """Get the AST nodes in each of the fields of a node, as pyastgrep converts them to XML."""
+    fields: List[Tuple[str, List[ast.AST]]] = []
+    for field_name in node._fields:
+        field_value = getattr(node, field_name, None)
+        if isinstance(field_value, ast.AST):
+            fields.append((field_name, [field_value]))
+        elif isinstance(field_value, list):
+            fields.append(
+                (
+                    field_name,
+                    [item for item in field_value if isinstance(item, ast.AST)],
+                )
+            )
+    return fields
+
+
+def create_histogram_from_xml(
+    xml_root: _Element,
+    element_positions: Dict[_Element, pyastgrepsearch.Position],
+    xpath2: bool = True,
+) -> NodeHistogram:
+    """Create the histogram of an AST's nodes from its XML document."""
+    document_types: DefaultDict[str, Positions] = defaultdict(list)
+    document_pairs: DefaultDict[PairKey, Positions] = defaultdict(list)
+    context_types: DefaultDict[str, Positions] = defaultdict(list)
+    context_pairs: DefaultDict[PairKey, Positions] = defaultdict(list)
+    # iterating through the elements visits them in document order; the element
+    # of a node is the only kind of element that has a position and, since the
+    # element of a field contains the nodes of that field, a node's parent is
+    # the parent of the element that contains the node's element
+    for element in xml_root.iter():
+        position = element_positions.get(element, None)
+        if position is None:
+            # mirror the walk of the tree for the element of a field
+            if xpath2 and element is not xml_root:
+                for node_element in element:
+                    node_position = element_positions.get(node_element, None)
+                    if node_position is None:
+                        continue
+                    context_types[node_element.tag].append(node_position)
+                    for field_element in node_element:
+                        for child_element in field_element:
+                            child_position = element_positions.get(child_element, None)
+                            if child_position is not None:
+                                pair_key = (
+                                    node_element.tag,
+                                    field_element.tag,
+                                    child_element.tag,
+                                )
+                                context_pairs[pair_key].append(child_position)
+            continue
+        document_types[element.tag].append(position)
+        field_element = element.getparent()
+        parent_element = field_element.getparent()
+        if parent_element is not xml_root:
+            pair_key = (parent_element.tag, field_element.tag, element.tag)
+            document_pairs[pair_key].append(position)
+    if xpath2:
+        return NodeHistogram(
+            dict(context_types), dict(document_types), dict(context_pairs)
+        )
+    return NodeHistogram(
+        dict(document_types), dict(document_types), dict(document_pairs)
+    )
@@ -0,0 +1,400 @@
+"""Index the types of AST nodes and the identifiers in a repository's Python source code."""
+
+import ast
+import functools
+import sqlite3
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from pyastgrep import files  # type: ignore
+
+from chasten import cache, constants, histogram, prefilter
+
+CREATE_METADATA_TABLE = """
+CREATE TABLE IF NOT EXISTS metadata (
+  name TEXT PRIMARY KEY,
+  value TEXT NOT NULL
+)
+"""
+
+CREATE_FILES_TABLE = """
+CREATE TABLE IF NOT EXISTS files (
+  path TEXT PRIMARY KEY,
+  content_id TEXT NOT NULL,
+  size INTEGER NOT NULL,
+  modified INTEGER NOT NULL
+)
+"""
+
+CREATE_CONTENTS_TABLE = """
+CREATE TABLE IF NOT EXISTS contents (
+  content_id TEXT PRIMARY KEY,
+  parsed INTEGER NOT NULL
+)
+"""
+
+CREATE_TERMS_TABLE = """
+CREATE TABLE IF NOT EXISTS terms (
+  kind TEXT NOT NULL,
+  term TEXT NOT NULL,
+  content_id TEXT NOT NULL,
+  count INTEGER NOT NULL,
+  PRIMARY KEY (kind, term, content_id)
+) WITHOUT ROWID
+"""
+
+CREATE_TERMS_INDEX = """
+CREATE INDEX IF NOT EXISTS terms_content_id ON terms (content_id)
+"""
+
+# the kinds of rows in the terms table: the number of nodes of a type and the
+# number of times that an identifier is the value of one of the attributes
+NODE_KIND = "node"
+IDENTIFIER_KIND = "identifier"
+
+FileStatus = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class IndexStatistics:
+    """Record the size of the index."""
+
+    files: int
+    contents: int
+    failures: int
+    terms: int
+    size: int
+
+
+@dataclass(frozen=True)
+class IndexUpdate:
+    """Record the files that an update of the index added and changed and the contents it parsed."""
+
+    added: int
+    changed: int
+    parsed: int
+
+
+@functools.lru_cache(maxsize=None)
+def get_field_names() -> FrozenSet[str]:
+    """Get the names of the fields of every type of AST node, which are also names of elements."""
+    return frozenset(
+        field_name
+        for node_class in vars(ast).values()
+        if isinstance(node_class, type) and issubclass(node_class, ast.AST)
+        for field_name in node_class._fields
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def is_indexed_node_type(name: str) -> bool:
+    """Determine whether or not the index counts every element with a name."""
+    # the root of the tree and the elements of the fields are not counted and
+    # thus a step with their names does not require any nodes in a file
+    node_class = getattr(ast, name, None)
+    return (
+        isinstance(node_class, type)
+        and issubclass(node_class, ast.AST)
+        and not issubclass(node_class, ast.mod)
+        and name not in get_field_names()
+    )
+
+
+def get_environment() -> str:
+    """Describe the versions of the tools and of the index that determine its contents."""
+    return constants.filesystem.Dash.join(
+        [constants.index.Format_Version, cache.get_environment()]
+    )
+
+
+def get_file_status(path: Path) -> Optional[FileStatus]:
+    """Get the size and the modification time of a file, which change when it is written."""
+    try:
+        status = path.stat()
+    except OSError:
+        return None
+    return (status.st_size, status.st_mtime_ns)
+
+
+def count_terms(contents: bytes, path: Path) -> Optional[Counter]:
+    """Count the types of the nodes and the identifiers in the AST of Python source code."""
+    try:
+        _, parsed_ast = files.parse_python_file(contents, path, auto_dedent=False)
+    except (SyntaxError, ValueError):
+        return None
+    # every node other than the root of the tree has a position, either its
+    # own or its parent's, and thus every other node is found by a pattern;
+    # note that ast.walk visits a shared node, like Load, in each of its places
+    terms: Counter = Counter()
+    for node in ast.walk(parsed_ast):
+        if node is not parsed_ast:
+            terms[(NODE_KIND, node.__class__.__name__)] += 1
+        for field_name in node._fields:
+            if field_name in prefilter.IDENTIFIER_ATTRIBUTES:
+                value = getattr(node, field_name, None)
+                if isinstance(value, str):
+                    terms[(IDENTIFIER_KIND, value)] += 1
+    return terms
+
+
+class RepositoryIndex:
+    """Store the types of the nodes and the identifiers in each file of a repository in a SQLite database."""
+
+    def __init__(self, index_directory: Path) -> None:
+        """Open (and create, if needed) the index in the directory."""
+        index_directory.mkdir(parents=True, exist_ok=True)
+        self.database_path = index_directory / constants.index.Database
+        self.connection = sqlite3.connect(
+            self.database_path,
+            timeout=constants.cache.Timeout,
+            isolation_level=None,
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        for create_statement in (
+            CREATE_METADATA_TABLE,
+            CREATE_FILES_TABLE,
+            CREATE_CONTENTS_TABLE,
+            CREATE_TERMS_TABLE,
+            CREATE_TERMS_INDEX,
+        ):
+            self.connection.execute(create_statement)
+        # the index of another version of Python, of pyastgrep, or of the index
+        # itself may not describe the same nodes and thus it is rebuilt
+        self.environment = get_environment()
+        row = self.connection.execute(
+            "SELECT value FROM metadata WHERE name = 'environment'"
+        ).fetchone()
+        if row is None or row[0] != self.environment:
+            self.clear()
+        self.content_ids: Dict[str, str] = {}
+        self.term_content_ids: Dict[prefilter.Term, Set[str]] = {}
+
+    def __enter__(self) -> "RepositoryIndex":
+        """Use the index as a context manager."""
+        return self
+
+    def __exit__(self, *_) -> None:
+        """Close the index when leaving the context manager."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the index."""
+        self.connection.close()
+
+    def clear(self) -> None:
+        """Remove all of the files and their terms from the index."""
+        with self.connection:
+            self.connection.execute("BEGIN")
+            for table_name in ("files", "contents", "terms", "metadata"):
+                self.connection.execute(f"DELETE FROM {table_name}")
+            self.connection.execute(
+                "INSERT INTO metadata VALUES ('environment', ?)", (self.environment,)
+            )
+        self.connection.execute("VACUUM")
+        self.content_ids = {}
+        self.term_content_ids = {}
+
+    def update(self, python_files: Sequence[Path]) -> IndexUpdate:
+        """Add the files that are new or that changed since they were last indexed."""
+        indexed_files = {
+            path: (content_id, (size, modified))
+            for path, content_id, size, modified in self.connection.execute(
+                "SELECT path, content_id, size, modified FROM files"
+            )
+        }
+        added = changed = parsed = 0
+        with self.connection:
+            self.connection.execute("BEGIN")
+            for python_file in python_files:
+                path = str(python_file.resolve())
+                file_status = get_file_status(python_file)
+                indexed_file = indexed_files.get(path, None)
+                # a file whose size and modification time did not change is not
+                # read again; otherwise, its contents are hashed and only parsed
+                # when no other file, or earlier version of it, had the contents
+                if file_status is None:
+                    continue
+                if indexed_file is not None and indexed_file[1] == file_status:
+                    self.content_ids[path] = indexed_file[0]
+                    continue
+                try:
+                    contents = python_file.read_bytes()
+                except OSError:
+                    continue
+                content_id = cache.create_content_id(contents)
+                parsed += self.add_contents(content_id, contents, python_file)
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                    (path, content_id, *file_status),
+                )
+                self.content_ids[path] = content_id
+                if indexed_file is None:
+                    added += 1
+                else:
+                    changed += 1
+        self.term_content_ids = {}
+        return IndexUpdate(added, changed, parsed)
+
+    def add_contents(self, content_id: str, contents: bytes, path: Path) -> int:
+        """Add the terms of the contents, unless they are indexed, and return the number parsed."""
+        row = self.connection.execute(
+            "SELECT 1 FROM contents WHERE content_id = ?", (content_id,)
+        ).fetchone()
+        if row is not None:
+            return 0
+        terms = count_terms(contents, path)
+        # source code that cannot be parsed does not have any terms
+        self.connection.execute(
+            "INSERT INTO contents VALUES (?, ?)", (content_id, terms is not None)
+        )
+        if terms is not None:
+            self.connection.executemany(
+                "INSERT INTO terms VALUES (?, ?, ?, ?)",
+                [
+                    (kind, term, content_id, count)
+                    for (kind, term), count in terms.items()
+                ],
+            )
+        return 1
+
+    def prune(self, python_files: Sequence[Path]) -> int:
+        """Remove the files that are not in the repository, and the contents of no file, from the index."""
+        current_paths = {str(python_file.resolve()) for python_file in python_files}
+        removed_paths = [
+            (path,)
+            for (path,) in self.connection.execute("SELECT path FROM files")
+            if path not in current_paths
+        ]
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.executemany(
+                "DELETE FROM files WHERE path = ?", removed_paths
+            )
+            self.connection.execute(
+                "DELETE FROM contents WHERE content_id NOT IN"
+                " (SELECT content_id FROM files)"
+            )
+            self.connection.execute(
+                "DELETE FROM terms WHERE content_id NOT IN"
+                " (SELECT content_id FROM contents)"
+            )
+        for path, *_ in removed_paths:
+            self.content_ids.pop(path, None)
+        self.term_content_ids = {}
+        return len(removed_paths)
+
+    def find_content_ids(self, term: prefilter.Term) -> Set[str]:
+        """Find the contents that have a term."""
+        content_ids = self.term_content_ids.get(term, None)
+        if content_ids is not None:
+            return content_ids
+        # an identifier contains a part when it is found with instr, which,
+        # unlike LIKE, is case sensitive like the functions of XPath
+        if term.kind == prefilter.NODE_TERM:
+            rows = self.connection.execute(
+                "SELECT content_id FROM terms WHERE kind = ? AND term = ?",
+                (NODE_KIND, term.text),
+            )
+        elif term.kind == prefilter.IDENTIFIER_TERM:
+            rows = self.connection.execute(
+                "SELECT content_id FROM terms WHERE kind = ? AND term = ?",
+                (IDENTIFIER_KIND, term.text),
+            )
+        else:
+            rows = self.connection.execute(
+                "SELECT content_id FROM terms WHERE kind = ? AND instr(term, ?) > 0",
+                (IDENTIFIER_KIND, term.text),
+            )
+        content_ids = {content_id for (content_id,) in rows}
+        self.term_content_ids[term] = content_ids
+        return content_ids
+
+    def find_expression_content_ids(self, expression: str) -> Optional[Set[str]]:
+        """Find the contents that could match an expression, if the index can tell them apart."""
+        required_terms = prefilter.get_required_terms(expression)
+        if required_terms is None:
+            return None
+        # the contents must have each of the terms that the index records
+        indexed_terms = [
+            term
+            for term in required_terms
+            if term.kind != prefilter.NODE_TERM or is_indexed_node_type(term.text)
+        ]
+        if len(indexed_terms) == 0:
+            return None
+        content_ids = set(self.find_content_ids(indexed_terms[0]))
+        for term in indexed_terms[1:]:
+            content_ids &= self.find_content_ids(term)
+        return content_ids
+
+    def find_candidate_expressions(
+        self, python_files: Sequence[Path], expressions: Sequence[str]
+    ) -> Dict[Path, FrozenSet[int]]:
+        """Find the expressions that could match each of the indexed files."""
+        expression_content_ids = [
+            self.find_expression_content_ids(expression) for expression in expressions
+        ]
+        candidate_expressions: Dict[Path, FrozenSet[int]] = {}
+        # a file that is not in the index could match all of the expressions
+        # and thus it is not given any candidates
+        for python_file in python_files:
+            path = python_file.resolve()
+            content_id = self.content_ids.get(str(path), None)
+            if content_id is None:
+                continue
+            candidate_expressions[path] = frozenset(
+                index
+                for index, content_ids in enumerate(expression_content_ids)
+                if content_ids is None or content_id in content_ids
+            )
+        return candidate_expressions
+
+    def count_nodes(
+        self, python_files: Sequence[Path], node_type: str
+    ) -> Optional[List[int]]:
+        """Count the nodes of a type in each of the files, if all of them are indexed."""
+        node_counts = dict(
+            self.connection.execute(
+                "SELECT content_id, count FROM terms WHERE kind = ? AND term = ?",
+                (NODE_KIND, node_type),
+            ).fetchall()
+        )
+        counts: List[int] = []
+        for python_file in python_files:
+            content_id = self.content_ids.get(str(python_file.resolve()), None)
+            if content_id is None:
+                return None
+            counts.append(node_counts.get(content_id, 0))
+        return counts
+
+    def statistics(self) -> IndexStatistics:
+        """Summarize the size of the index."""
+        (indexed_files,) = self.connection.execute(
+            "SELECT COUNT(*) FROM files"
+        ).fetchone()
+        (contents, failures) = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(NOT parsed), 0) FROM contents"
+        ).fetchone()
+        (terms,) = self.connection.execute("SELECT COUNT(*) FROM terms").fetchone()
+        (page_count,) = self.connection.execute("PRAGMA page_count").fetchone()
+        (page_size,) = self.connection.execute("PRAGMA page_size").fetchone()
+        return IndexStatistics(
+            files=indexed_files,
+            contents=contents,
+            failures=failures,
+            terms=terms,
+            size=page_count * page_size,
+        )
+
+
+def find_counted_node_type(expression: str) -> Optional[str]:
+    """Find the type of the nodes that an expression matches when it only looks for one type."""
+    # a pattern like .//ClassDef or //ClassDef matches every node of the type
+    # and thus its number of matches in a file is the number of those nodes
+    type_query = histogram.recognize_type_query(expression)
+    if type_query is None or type_query.parent_type is not None:
+        return None
+    return type_query.node_type
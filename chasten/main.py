@@ -1,16 +1,18 @@
 """💫 Chasten checks the AST of a Python program."""
 
 import os
+import subprocess
 import sys
 import time
 from pathlib import Path
-from typing import Dict, List, Tuple, Union
+from typing import Dict, FrozenSet, List, Set, Tuple, Union
 
+import numpy as np
 import pyastgrep  # type: ignore
 import typer
-from pyastgrep import search as pyastgrepsearch  # type: ignore
 
 from chasten import (
+    cache,
     checks,
     configApp,
     configuration,
@@ -18,13 +20,20 @@ from chasten import (
     createchecks,
     database,
     debug,
+    engine,
     enumerations,
     filesystem,
+    index,
+    matrix,
+    normalize,
     output,
     process,
     results,
     server,
+    store,
+    stream,
     util,
+    vcs,
 )
 
 # create a Typer object to support the command-line interface
@@ -94,6 +103,17 @@ def display_serve_or_publish_details(
         )
 
 
+def parse_search_columns(search_column: List[str]) -> Dict[str, List[str]]:
+    """Parse the columns that full-text search finds the rows by, exiting if they are not in the tables."""
+    try:
+        return database.parse_search_columns(search_column)
+    except ValueError as error:
+        output.console.print(
+            f"\n:person_shrugging: Cannot search the specified column(s). {error}\n"
+        )
+        sys.exit(constants.markers.Non_Zero_Exit)
+
+
 # ---
 # End region: Helper functions }}}
 # ---
@@ -248,6 +268,49 @@ def configure(  # noqa: PLR0913
             sys.exit(constants.markers.Non_Zero_Exit)
 
 
+def consult_index(
+    valid_directories: List[Path],
+    index_directory: Path,
+    check_patterns: List[str],
+    count_builder: matrix.CountMatrixBuilder,
+    count_nodes: bool,
+) -> Dict[Path, FrozenSet[int]]:
+    """Update the index of the files and find the checks that could match each of them."""
+    output.logger.debug(f"Using the index in {index_directory}")
+    python_files = engine.get_python_files(valid_directories)
+    with index.RepositoryIndex(index_directory) as repository_index:
+        index_update = repository_index.update(python_files)
+        output.logger.debug(
+            f"Indexed {index_update.added} new and {index_update.changed} changed files"
+        )
+        candidate_expressions = repository_index.find_candidate_expressions(
+            python_files, check_patterns
+        )
+        # the number of matches of a check that only looks for one type of
+        # node is the number of those nodes in each file, which is recorded
+        # for the files in the same order as they would be searched; the
+        # check is then not evaluated on any of the files
+        file_ids = [
+            count_builder.add_file(str(python_file)) for python_file in python_files
+        ]
+        answered: Set[int] = set()
+        for check_index, pattern in enumerate(check_patterns):
+            node_type = index.find_counted_node_type(pattern)
+            if not count_nodes or node_type is None:
+                continue
+            node_counts = repository_index.count_nodes(python_files, node_type)
+            if node_counts is None:
+                continue
+            for file_id, node_count in zip(file_ids, node_counts):
+                if node_count > 0:
+                    count_builder.add(file_id, check_index, node_count)
+            answered.add(check_index)
+    return {
+        path: candidates - answered
+        for path, candidates in candidate_expressions.items()
+    }
+
+
 @cli.command()
 def analyze(  # noqa: PLR0912, PLR0913, PLR0915
     project: str = typer.Argument(help="Name of the project."),
@@ -322,6 +385,61 @@ def analyze(  # noqa: PLR0912, PLR0913, PLR0915
         "-c",
         help="A directory with configuration file(s) or URL to configuration file.",
     ),
+    workers: int = typer.Option(
+        constants.engine.Serial_Workers,
+        "--workers",
+        "-w",
+        help="Number of processes for analyzing files in parallel (0 uses all CPUs).",
+        min=0,
+    ),
+    cache_trees: bool = typer.Option(
+        False,
+        "--cache/--no-cache",
+        help="Reuse the XML trees and matches of unchanged files from previous analyses.",
+    ),
+    cache_directory: Path = typer.Option(
+        None,
+        "--cache-directory",
+        help="A directory for the cache (defaults to the user's cache directory).",
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+    ),
+    cache_size: int = typer.Option(
+        constants.cache.Default_Size_Megabytes,
+        "--cache-size",
+        help="Maximum size of the cache in megabytes.",
+        min=1,
+    ),
+    use_index: bool = typer.Option(
+        False,
+        "--index/--no-index",
+        help="Only evaluate each check on the files that the index of the search path finds could match it.",
+    ),
+    index_directory: Path = typer.Option(
+        None,
+        "--index-directory",
+        help="A directory for the index (defaults to .chasten_index in the search path).",
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+    ),
+    changed_since: str = typer.Option(
+        None,
+        "--changed-since",
+        help="Only evaluate the files changed since a git ref, reusing the cached matches of the others.",
+    ),
+    fail_fast: bool = typer.Option(
+        False,
+        "--fail-fast",
+        help="Stop evaluating a check once its number of matches exceeds its maximum.",
+    ),
+    exit_first: bool = typer.Option(
+        False,
+        "--exit-first",
+        "-x",
+        help="Stop the analysis at the first check that exceeds its maximum (implies --fail-fast).",
+    ),
     debug_level: debug.DebugLevel = typer.Option(
         debug.DebugLevel.ERROR.value,
         "--debug-level",
@@ -337,6 +455,22 @@ def analyze(  # noqa: PLR0912, PLR0913, PLR0915
     display: bool = typer.Option(False, help="Display results using frogmouth"),
     verbose: bool = typer.Option(False, help="Enable verbose mode output."),
     save: bool = typer.Option(False, help="Enable saving of output file(s)."),
+    results_format: enumerations.ResultsFormat = typer.Option(
+        enumerations.ResultsFormat.JSON.value,
+        "--format",
+        help="Format of the saved results (json-v2 is normalized and ndjson is written while searching).",
+    ),
+    save_matrix: bool = typer.Option(
+        False,
+        help="Also save the matrix of the number of matches of each check in each file.",
+    ),
+    save_db: Path = typer.Option(
+        None,
+        "--save-db",
+        help="Save the results into a SQLite database, adding them to its results.",
+        dir_okay=False,
+        resolve_path=True,
+    ),
     force: bool = typer.Option(False, help="Force creation of new markdown file"),
 ) -> None:
     """💫 Analyze the AST of Python source code."""
@@ -386,9 +520,16 @@ def analyze(  # noqa: PLR0912, PLR0913, PLR0915
     chasten_results_save = results.Chasten(configuration=chasten_configuration)
     # add extra space after the command to run the program
     output.console.print()
-    # validate the configuration
+    # check XPATH version
+    xpath2 = str(xpath) != "1.0"
+    if not xpath2:
+        output.logger.debug("Using XPath version 1.0")
+    else:
+        output.logger.debug("Using XPath version 2.0")
+    # validate the configuration, including the compilation of each
+    # check's pattern with the requested version of XPath
     (validated, checks_dict) = configuration.validate_configuration_files(
-        config, verbose
+        config, verbose, xpath2
     )
     # some aspect of the configuration was not
     # valid, so exit early and signal an error
@@ -455,74 +596,190 @@ def analyze(  # noqa: PLR0912, PLR0913, PLR0915
     output.console.print()
     output.console.print(f":tada: Performing {len(check_list)} check(s):")
     output.console.print()
-    # create a check_status list for all of the checks
-    check_status_list: List[bool] = []
-    # check XPATH version
-    if xpath == "1.0":
-        output.logger.debug("Using XPath version 1.0")
-    else:
-        output.logger.debug("Using XPath version 2.0")
-    # iterate through and perform each of the checks
+    # detect the directory of the cache that stores the XML trees of files
+    # that were previously analyzed and the directory of the cache that stores
+    # the matches of each pattern in those files, as long as caching was requested
+    tree_cache_directory = None
+    match_cache_directory = None
+    if cache_trees:
+        tree_cache_directory = filesystem.detect_cache_directory(cache_directory)
+        output.logger.debug(f"Using the cache of trees in {tree_cache_directory}")
+    # note that the cache of matches is always needed when only analyzing the
+    # files that changed since a git ref because it stores the previous matches
+    if cache_trees or changed_since is not None:
+        match_cache_directory = filesystem.detect_match_cache_directory(
+            config, cache_directory
+        )
+        output.logger.debug(f"Using the cache of matches in {match_cache_directory}")
+    # find the files that did not change since the git ref so that their matches
+    # come from the cache, while still counting them towards the total matches
+    # that are compared to the minimum and maximum of each check
+    unchanged_content_ids = None
+    if changed_since is not None:
+        try:
+            unchanged_content_ids = vcs.get_unchanged_content_ids(
+                input_path, changed_since
+            )
+        except (OSError, subprocess.CalledProcessError) as error:
+            output.console.print(
+                f"\n:person_shrugging: Cannot find the files changed since '{changed_since}' with git.\n"
+            )
+            output.logger.debug(f"Could not run git: {error}")
+            sys.exit(constants.markers.Non_Zero_Exit)
+        output.logger.debug(
+            f"Found {len(unchanged_content_ids)} files unchanged since {changed_since}"
+        )
+    # create a template for each of the checks that records all of its details
+    # other than its matches, which are added separately for each of the files
+    check_templates: List[results.Check] = []
     for current_check in check_list:
-        # extract the pattern for the current check
-        current_xpath_pattern = str(
-            current_check[constants.checks.Check_Pattern]
-        )  # type: ignore
         # extract the minimum and maximum values for the checks, if they exist
         # note that this function will return None for a min or a max if
         # that attribute does not exist inside of the current_check; importantly,
         # having a count or a min or a max is all optional in a checks file
         (min_count, max_count) = checks.extract_min_max(current_check)
+        check_templates.append(
+            results.Check(
+                id=current_check[constants.checks.Check_Id],  # type: ignore
+                name=current_check[constants.checks.Check_Name],  # type: ignore
+                description=checks.extract_description(current_check),  # type: ignore
+                min=min_count,  # type: ignore
+                max=max_count,  # type: ignore
+                pattern=str(current_check[constants.checks.Check_Pattern]),
+                passed=True,
+            )
+        )
+    # the details of each match, like the matching line of source code, are
+    # only needed when displaying or saving them; otherwise, only the number
+    # of matches in each file is needed and thus the lines of the files
+    # are never read and the models for the matches are never created
+    count_only = not save and not verbose and save_db is None
+    if count_only:
+        output.logger.debug("Only counting the matches")
+    # when streaming the results, the records of each file's matches are
+    # written as soon as the file is searched and thus the positions of the
+    # matches are only stored until the end when they are displayed
+    results_stream = None
+    if save and results_format == enumerations.ResultsFormat.NDJSON:
+        results_stream = stream.open_results_stream(
+            output_directory
+            / filesystem.create_results_file_name(
+                project, chasten_configuration, results_format.value
+            ),
+            chasten_configuration,
+        )
+    store_matches = verbose or save_db is not None or (save and results_stream is None)
+    # when failing fast, a check is no longer evaluated once its number of
+    # matches exceeds its maximum because the check can no longer pass
+    fail_fast = fail_fast or exit_first
+    maximum_counts = None
+    if fail_fast:
+        maximum_counts = [check_template.max for check_template in check_templates]
+    # search for the XML contents of an AST that match the provided XPATH
+    # queries; note that this walks the specified source path only once and
+    # then parses each file and converts it to XML only once, evaluating the
+    # pattern of every check on that tree instead of re-parsing all of the
+    # files for each of the checks; note that the files are searched by a
+    # pool of worker processes when more than one worker is requested
+    check_patterns = [
+        str(current_check[constants.checks.Check_Pattern])
+        for current_check in check_list
+    ]
+    # record the number of matches of each check in each file in a matrix with
+    # a row for each file, in the order they were searched, and a column for
+    # each check; the details of the matches are only kept when they are needed
+    count_builder = matrix.CountMatrixBuilder(
+        [check_template.id for check_template in check_templates]
+    )
+    match_store = store.MatchStore()
+    # update the index of the search path's files and then only evaluate each
+    # check on the files that could match it; note that, when only counting,
+    # a check that only looks for one type of node is answered by the index
+    candidate_expressions = None
+    if use_index:
+        candidate_expressions = consult_index(
+            valid_directories,
+            filesystem.detect_index_directory(input_path, index_directory),
+            check_patterns,
+            count_builder,
+            count_only and not fail_fast,
+        )
+    file_matches_generator = engine.search_python_files(
+        valid_directories,
+        check_patterns,
+        xpath2,
+        workers,
+        tree_cache_directory,
+        match_cache_directory,
+        unchanged_content_ids,
+        maximum_counts,
+        False,
+        candidate_expressions,
+    )
+    # consume the matches one file at a time, counting the matches for each
+    # check and recording them in the results; note that this means that the
+    # lines of a file and its matches from the search are released as soon
+    # as the next file is searched instead of keeping them all in memory
+    min_values = [check_template.min for check_template in check_templates]
+    max_values = [check_template.max for check_template in check_templates]
+    for file_matches in file_matches_generator:
+        file_id = count_builder.add_file(str(file_matches.path))
+        for check_index, positions in enumerate(file_matches.positions):
+            # files without any matches for this check are not recorded
+            if len(positions) == 0:
+                continue
+            count_builder.add(file_id, check_index, len(positions))
+            # only the number of matches in the file is needed when counting;
+            # otherwise, the positions of the matches are stored in columns and
+            # the lines of the file are only read again when the results are
+            # saved or displayed, which means that the lines are never kept
+            if store_matches:
+                match_store.add(file_id, check_index, positions)
+        if results_stream is not None:
+            results_stream.write_file_matches(
+                file_matches.path, check_templates, file_matches.positions
+            )
+        # stop searching the files at the first check that cannot pass
+        if exit_first and any(
+            checks.exceeds_max(match_count, max_value)
+            for match_count, max_value in zip(count_builder.match_counts, max_values)
+        ):
+            break
+    # evaluate the minimum and the maximum of every check on the total number
+    # of its matches at once; note that a check stopped early when its number
+    # of matches exceeded its maximum
+    count_matrix = count_builder.build()
+    match_counts = count_matrix.totals()
+    check_statuses = checks.check_match_counts(match_counts, min_values, max_values)
+    stopped_early = fail_fast & checks.exceed_maxes(match_counts, max_values)
+    exited_first = exit_first and bool(stopped_early.any())
+    # after stopping at the first failing check, the counts for the other
+    # checks are not complete and thus only the failing checks are reported;
+    # only the checks with a minimum or a maximum count towards those passed
+    reported = stopped_early if exited_first else np.ones(len(check_templates), bool)
+    check_status_list = check_statuses[
+        reported & checks.are_checkable(min_values, max_values)
+    ]
+    # iterate through and report on each of the checks, which requires
+    # the count of the matches for a check across all of the files
+    for check_index, check_template in enumerate(check_templates):
+        if not reported[check_index]:
+            continue
+        match_count = int(match_counts[check_index])
+        check_stopped_early = bool(stopped_early[check_index])
+        check_status = bool(check_statuses[check_index])
         # extract details about the check to display in the header
         # of the syntax box for this specific check
-        check_id = current_check[constants.checks.Check_Id]  # type: ignore
+        check_id = check_template.id
         output.logger.debug(f"check id: {check_id}")
-        check_name = current_check[constants.checks.Check_Name]  # type: ignore
-        check_description = checks.extract_description(current_check)
-        # search for the XML contents of an AST that match the provided
-        # XPATH query using the search_python_file in search module of pyastgrep;
-        # this looks for matches across all path(s) in the specified source path
-        # match_generator = pyastgrepsearch.search_python_files(
-        #         paths=valid_directories, expression=current_xpath_pattern, xpath2=True
-        # )
-        if xpath == "1.0":
-            match_generator = pyastgrepsearch.search_python_files(
-                paths=valid_directories, expression=current_xpath_pattern, xpath2=False
-            )
-        else:
-            match_generator = pyastgrepsearch.search_python_files(
-                paths=valid_directories, expression=current_xpath_pattern, xpath2=True
-            )
-        # materia>>> mastlize a list from the generator of (potential) matches;
-        # note that this list will also contain an object that will
-        # indicate that the analysis completed for each located file
-        match_generator_list = list(match_generator)
-        # filter the list of matches so that it only includes
-        # those that are a Match object that will contain source code
-        (match_generator_list, _) = process.filter_matches(
-            match_generator_list, pyastgrepsearch.Match
-        )
-        # organize the matches according to the file to which they
-        # correspond so that processing of matches takes place per-file
-        match_dict = process.organize_matches(match_generator_list)
-        # perform an enforceable check if it is warranted for this check
-        current_check_save = None
-        if checks.is_checkable(min_count, max_count):
-            # determine whether or not the number of found matches is within mix and max
-            check_status = checks.check_match_count(
-                len(match_generator_list), min_count, max_count
-            )
-            # keep track of the outcome for this check
-            check_status_list.append(check_status)
-        # this is not an enforceable check and thus the tool always
-        # records that the checked passed as a default
-        else:
-            check_status = True
+        check_name = check_template.name
+        min_count = check_template.min
+        max_count = check_template.max
         # convert the status of the check to a visible symbol for display
         check_status_symbol = util.get_symbol_boolean(check_status)
         # escape the open bracket symbol that may be in an XPATH expression
         # and will prevent it from displaying correctly
-        current_xpath_pattern_escape = current_xpath_pattern.replace("[", "\\[")
+        current_xpath_pattern_escape = check_template.pattern.replace("[", "\\[")
         # display minimal diagnostic output
         output.console.print(
             f"  {check_status_symbol} id: '{check_id}', name: '{check_name}'"
@@ -540,108 +797,97 @@ def analyze(  # noqa: PLR0912, PLR0913, PLR0915
                 f"\n# {check_pass} **ID:** '{check_id}', **Name:** '{check_name}'"
                 + f", **Pattern:** '{current_xpath_pattern_escape}', min={min_count}, max={max_count}\n\n"
             )
-
-        # for each potential match, log and, if verbose model is enabled,
-        # display details about each of the matches
-        current_result_source = results.Source(
-            filename=str(str(vd) for vd in valid_directories)
-        )
-        # there were no matches and thus the current_check_save of None
-        # should be recorded inside of the source of the results
-        if len(match_generator_list) == 0:
-            current_result_source.check = current_check_save
-        # iteratively analyze:
-        # a) A specific file name
-        # b) All of the matches for that file name
-        # Note: the goal is to only process matches for a
-        # specific file, ensuring that matches for different files
-        # are not mixed together, which would contaminate the results
-        # Note: this is needed because using pyastgrepsearch will
-        # return results for all of the files that matched the check
-        for file_name, matches_list in match_dict.items():
-            # create the current check
-            current_check_save = results.Check(
-                id=check_id,  # type: ignore
-                name=check_name,  # type: ignore
-                description=check_description,  # type: ignore
-                min=min_count,  # type: ignore
-                max=max_count,  # type: ignore
-                pattern=current_xpath_pattern,
-                passed=check_status,
-            )
-            # create a source that is solely for this file name
-            current_result_source = results.Source(filename=file_name)
-            # put the current check into the list of checks in the current source
-            current_result_source.check = current_check_save
+        # report on each of the files that had matches for this check
+        for file_id in count_matrix.matching_files(check_index):
+            file_name = count_matrix.files[file_id]
+            match_total = count_matrix.counts[file_id, check_index]
             # display minimal diagnostic output
             output.console.print(
-                f"    {small_bullet_unicode} {file_name} - {len(matches_list)} matches"
+                f"    {small_bullet_unicode} {file_name} - {match_total} matches"
             )
             if store_result:
                 # stores details of checks in string to be stored later
-                analysis_result += f"    - {file_name} - {len(matches_list)} matches\n"
-            # extract the lines of source code for this file; note that all of
-            # these matches are organized for the same file and thus it is
-            # acceptable to extract the lines of the file from the first match
-            # a long as there are matches available for analysis
-            if len(matches_list) > 0:
-                current_result_source._filelines = matches_list[0].file_lines
-            # iterate through all of the matches that are specifically
-            # connected to this source that is connected to a specific file name
-            for current_match in matches_list:
-                if isinstance(current_match, pyastgrepsearch.Match):
-                    current_result_source._filelines = current_match.file_lines
-                    # extract the direct line number for this match
-                    position_end = current_match.position.lineno
-                    # extract the column offset for this match
-                    column_offset = current_match.position.col_offset
-                    # create a match specifically for this file;
-                    # note that the AST starts line numbering at 1 and
-                    # this means that storing the matching line requires
-                    # the indexing of file_lines with position_end - 1;
-                    # note also that linematch is the result of using
-                    # lstrip to remove any blank spaces before the code
-                    current_match_for_current_check_save = results.Match(
-                        lineno=position_end,
-                        coloffset=column_offset,
-                        linematch=current_match.file_lines[position_end - 1].lstrip(
-                            constants.markers.Space
-                        ),
-                        linematch_context=util.join_and_preserve(
-                            current_match.file_lines,
-                            max(
-                                0,
-                                position_end - constants.markers.Code_Context,
-                            ),
-                            position_end + constants.markers.Code_Context,
-                        ),
-                    )
-                    # save the entire current_match that is an instance of
-                    # pyastgrepsearch.Match for verbose debugging output as needed
-                    current_check_save._matches.append(current_match)
-                    # add the match to the listing of matches for the current check
-                    current_check_save.matches.append(
-                        current_match_for_current_check_save
-                    )  # type: ignore
-            # add the current source to main object that contains a list of source
-            chasten_results_save.sources.append(current_result_source)
-        # add the amount of total matches in each check to the end of each checks output
-        output.console.print(f"   = {len(match_generator_list)} total matches\n")
+                analysis_result += f"    - {file_name} - {match_total} matches\n"
+        # add the amount of total matches in each check to the end of each checks output;
+        # note that a check that stopped early has at least one more match than its maximum
+        if check_stopped_early:
+            output.console.print(f"   = ≥{max_count + 1} total matches\n")  # type: ignore
+        else:
+            output.console.print(f"   = {match_count} total matches\n")
+    # note that the checks that were not reported did not complete
+    if exited_first:
+        output.console.print(
+            f":stop_sign: Stopped at the first failing check; {np.count_nonzero(~stopped_early)} other check(s) did not complete\n"
+        )
+    # evict the least recently used entries so that the caches stay within their size
+    if tree_cache_directory is not None:
+        with cache.TreeCache(tree_cache_directory) as tree_cache:
+            tree_cache.evict(cache_size * constants.cache.Bytes_Per_Megabyte)
+    if match_cache_directory is not None:
+        with cache.MatchCache(match_cache_directory) as match_cache:
+            match_cache.evict(cache_size * constants.cache.Bytes_Per_Megabyte)
     # calculate the final count of matches found
     total_result = util.total_amount_passed(check_status_list)
     # display checks passed, total amount of checks, and percentage of checks passed
     output.console.print(
         f":computer: {total_result[0]} / {total_result[1]} checks passed ({total_result[2]}%)\n"
     )
+    # create the results for the details of the matches, which are only needed
+    # when displaying or saving them, after the outcome of each check is known
+    reported_statuses = {
+        check_index: bool(check_status)
+        for check_index, check_status in enumerate(check_statuses)
+        if reported[check_index]
+    }
+    if store_matches:
+        chasten_results_save.sources = match_store.create_sources(
+            count_matrix.files, check_templates, reported_statuses, verbose
+        )
     # display all of the analysis results if verbose output is requested
     output.print_analysis_details(chasten_results_save, verbose=verbose)
+    # slice the snippets of source code for the matches only when they are saved
+    save_json = save and results_format == enumerations.ResultsFormat.JSON
+    if save_json or save_db is not None:
+        process.fill_match_snippets(chasten_results_save.sources)
     # save all of the results from this analysis
     saved_file_name = filesystem.write_chasten_results(
-        output_directory, project, chasten_results_save, save
+        output_directory, project, chasten_results_save, save_json
     )
+    # save the normalized results that record each check, file, and region
+    # of source code around the matches only once instead
+    if save and results_format == enumerations.ResultsFormat.JSON_V2:
+        saved_file_name = filesystem.write_normalized_results(
+            output_directory,
+            project,
+            normalize.create_normalized_results(
+                chasten_configuration,
+                match_store,
+                count_matrix.files,
+                check_templates,
+                reported_statuses,
+            ),
+        )
+    # finish the stream of the results with whether or not each check passed
+    if results_stream is not None:
+        results_stream.write_outcomes(reported_statuses)
+        results_stream.close()
+        saved_file_name = results_stream.results_path.name
     # output the name of the saved file if saving successfully took place
     if saved_file_name:
         output.console.print(f"\n:sparkles: Saved the file '{saved_file_name}'")
+    # --save-matrix: save the matrix of the counts of the matches next to the results
+    if saved_file_name and save_matrix:
+        saved_matrix_name = filesystem.write_count_matrix(
+            output_directory, saved_file_name, count_matrix
+        )
+        output.console.print(f":sparkles: Saved the file '{saved_matrix_name}'")
+    # --save-db: write the results straight into the tables of the database
+    if save_db is not None:
+        save_db.parent.mkdir(parents=True, exist_ok=True)
+        database.write_results_database(
+            save_db, [chasten_results_save.model_dump(mode="json")]
+        )
+        output.console.print(f":sparkles: Saved the database '{save_db}'")
     # --save-xml and --view-xml
     if save_XML is not None or view_XML is not None:
         output.console.print(":memo: Saving XML...")
@@ -702,7 +948,7 @@ def analyze(  # noqa: PLR0912, PLR0913, PLR0915
             output.console.print(":sweat: Sorry, could not convert to xml.")
     # confirm whether or not all of the checks passed
     # and then display the appropriate diagnostic message
-    all_checks_passed = all(check_status_list)
+    all_checks_passed = bool(check_status_list.all())
     end_time = time.time()
     elapsed_time = end_time - start_time
 
@@ -732,10 +978,10 @@ def analyze(  # noqa: PLR0912, PLR0913, PLR0915
 def integrate(  # noqa: PLR0913
     project: str = typer.Argument(help="Name of the project."),
     json_path: List[Path] = typer.Argument(
-        help="Directories, files, or globs for chasten's JSON result file(s).",
+        help="Directories, files, or globs for chasten's JSON or NDJSON result file(s).",
     ),
     output_directory: Path = typer.Option(
-        ...,
+        None,
         "--save-directory",
         "-s",
         help="A directory for saving converted file(s).",
@@ -762,6 +1008,36 @@ def integrate(  # noqa: PLR0913
         False,
         help="Create converted results files even if they exist",
     ),
+    flatten_csv: bool = typer.Option(
+        False,
+        "--csv/--no-csv",
+        help="Also combine the results into one JSON file and flatten it into CSV files.",
+    ),
+    into_database: Path = typer.Option(
+        None,
+        "--into",
+        help="An existing database to add the results that it does not have to.",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+        writable=True,
+        resolve_path=True,
+    ),
+    materialize: bool = typer.Option(
+        False,
+        help="Materialize the view of all of the results as an indexed table.",
+    ),
+    search_column: List[str] = typer.Option(
+        [],
+        "--search-column",
+        help="A TABLE.COLUMN for full-text search instead of the default columns of that table.",
+    ),
+    defer_search: bool = typer.Option(
+        False,
+        "--defer-search",
+        help="Enable full-text search later with 'chasten db index' instead of now.",
+    ),
     verbose: bool = typer.Option(False, help="Display verbose debugging output"),
 ) -> None:
     """🚧 Integrate files and make a database."""
@@ -774,36 +1050,109 @@ def integrate(  # noqa: PLR0913
         output_directory=output_directory,
         json_path=json_path,
         force=force,
+        into_database=into_database,
+        materialize=materialize,
+        search_column=search_column,
+        defer_search=defer_search,
     )
     output.logger.debug("Integrate function started.")
+    # the results are either added to an existing database or saved,
+    # with a new database, in a new directory of the output directory
+    if (into_database is None) == (output_directory is None):
+        output.console.print(
+            "\n:person_shrugging: Specify either a directory with --save-directory or a database with --into."
+        )
+        sys.exit(constants.markers.Non_Zero_Exit)
+    if into_database is not None and flatten_csv:
+        output.console.print(
+            "\n:person_shrugging: Cannot flatten the results into CSV files when adding them to a database with --into."
+        )
+        sys.exit(constants.markers.Non_Zero_Exit)
+    search_columns = parse_search_columns(search_column)
     # output the list of directories subject to checking
     output.console.print()
     output.console.print(":sparkles: Combining data file(s) in:")
     output.logger.debug(":sparkles: Combining data file(s) in:")
     output.console.print()
     output.print_list_contents(json_path)
-    # extract all of the JSON dictionaries from the specified files
-    json_dicts = filesystem.get_json_results(json_path)
+    # only the files with the results of analyses are integrated, and thus
+    # other files, like the saved matrices of the counts, are skipped
+    skipped_paths = [
+        current_path
+        for current_path in json_path
+        if not filesystem.is_results_file(current_path)
+    ]
+    if skipped_paths:
+        output.console.print(
+            "\n:person_shrugging: Skipping the file(s) that are not JSON or NDJSON results:\n"
+        )
+        output.print_list_contents(skipped_paths)
+    json_path = [
+        current_path
+        for current_path in json_path
+        if filesystem.is_results_file(current_path)
+    ]
+    if not json_path:
+        output.console.print(
+            "\n:person_shrugging: Cannot integrate without any JSON or NDJSON result file(s).\n"
+        )
+        sys.exit(constants.markers.Non_Zero_Exit)
     count = len(json_path)
     output.console.print(f"\n:sparkles: Total of {count} files in all directories.")
-    # combine all of the dictionaries into a single string
-    combined_json_dict = process.combine_dicts(json_dicts)
-    # write the combined JSON file string to the filesystem
-    combined_json_file_name = filesystem.write_dict_results(
-        combined_json_dict, output_directory, project
-    )
-    # output the name of the saved file if saving successfully took place
-    if combined_json_file_name:
-        output.console.print(f"\n:sparkles: Saved the file '{combined_json_file_name}'")
-        output.logger.debug(f"Saved the file '{combined_json_file_name}'.")
-    # "flatten" (i.e., "un-nest") the now-saved combined JSON file using flatterer
-    # create the SQLite3 database and then configure the database for use in datasette
-    combined_flattened_directory = filesystem.write_flattened_csv_and_database(
-        combined_json_file_name,
-        output_directory,
-        project,
-    )
-    output.logger.debug("Flattened JSON and created SQLite database.")
+    if into_database is not None:
+        # add the rows of the results that are not yet in the database,
+        # along with their full-text search, without changing its other rows
+        (added_count, skipped_count) = filesystem.add_results_to_database(
+            json_path, into_database, materialize, search_columns, defer_search
+        )
+        output.console.print(
+            f"\n:sparkles: Added {added_count} result file(s) to the database '{into_database}'"
+            f" and skipped {skipped_count} that it already had."
+        )
+        output.logger.debug("Added the results to the existing SQLite database.")
+        return
+    if flatten_csv:
+        # extract all of the JSON dictionaries from the specified files
+        json_dicts = filesystem.get_json_results(json_path)
+        # combine all of the dictionaries into a single string
+        combined_json_dict = process.combine_dicts(json_dicts)
+        # write the combined JSON file string to the filesystem
+        combined_json_file_name = filesystem.write_dict_results(
+            combined_json_dict, output_directory, project
+        )
+        # output the name of the saved file if saving successfully took place
+        if combined_json_file_name:
+            output.console.print(
+                f"\n:sparkles: Saved the file '{combined_json_file_name}'"
+            )
+            output.logger.debug(f"Saved the file '{combined_json_file_name}'.")
+        # "flatten" (i.e., "un-nest") the now-saved combined JSON file using flatterer
+        # create the SQLite3 database and then configure the database for use in datasette
+        combined_flattened_directory = filesystem.write_flattened_csv_and_database(
+            combined_json_file_name,
+            output_directory,
+            project,
+            search_columns,
+            defer_search,
+        )
+        output.logger.debug("Flattened JSON and created SQLite database.")
+        if materialize:
+            database.refresh_materialized_view(
+                Path(combined_flattened_directory)
+                / constants.datasette.Chasten_Database
+            )
+    else:
+        # insert the rows of each of the results straight into the tables of
+        # the SQLite3 database, without combining them into one JSON file
+        combined_flattened_directory = filesystem.write_results_database(
+            json_path,
+            output_directory,
+            project,
+            materialize,
+            search_columns,
+            defer_search,
+        )
+        output.logger.debug("Inserted the results into the SQLite database.")
     # output the name of the saved file if saving successfully took place
     if combined_flattened_directory:
         output.console.print(
@@ -968,6 +1317,247 @@ def datasette_publish(  # noqa: PLR0913
     )
 
 
+def display_cache_statistics(
+    label: str, cache_directory: Path, statistics: cache.CacheStatistics
+) -> None:
+    """Display the size of a cache and the rate at which it is hit."""
+    output.console.print(f":card_file_box:  Cache of {label} in {cache_directory}:")
+    output.console.print(
+        f"{constants.markers.Indent}{small_bullet_unicode} Entries: {statistics.entries} ({statistics.failures} parse failures)"
+    )
+    output.console.print(
+        f"{constants.markers.Indent}{small_bullet_unicode} Size: {statistics.size / constants.cache.Bytes_Per_Megabyte:.2f} MB"
+    )
+    output.console.print(
+        f"{constants.markers.Indent}{small_bullet_unicode} Hits: {statistics.hits}, Misses: {statistics.misses}"
+    )
+    output.console.print(
+        f"{constants.markers.Indent}{small_bullet_unicode} Hit rate: {statistics.hit_rate:.2f}%"
+    )
+
+
+@cli.command(name="cache")
+def manage_cache(  # noqa: PLR0913
+    task: enumerations.CacheTask = typer.Argument(enumerations.CacheTask.STATS.value),
+    config: str = typer.Option(
+        None,
+        "--config",
+        "-c",
+        help="A directory with configuration file(s) or URL to configuration file.",
+    ),
+    cache_directory: Path = typer.Option(
+        None,
+        "--cache-directory",
+        help="A directory for the cache (defaults to the user's cache directory).",
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+    ),
+    debug_level: debug.DebugLevel = typer.Option(
+        debug.DebugLevel.ERROR.value,
+        "--debug-level",
+        "-l",
+        help="Specify the level of debugging output.",
+    ),
+    debug_destination: debug.DebugDestination = typer.Option(
+        debug.DebugDestination.CONSOLE.value,
+        "--debug-dest",
+        "-t",
+        help="Specify the destination for debugging output.",
+    ),
+    verbose: bool = typer.Option(False, help="Display verbose debugging output"),
+) -> None:
+    """🗃️  Manage chasten's caches of XML trees and matches."""
+    # detect the directories of the caches that analyze --cache uses
+    tree_cache_directory = filesystem.detect_cache_directory(cache_directory)
+    match_cache_directory = filesystem.detect_match_cache_directory(
+        config, cache_directory
+    )
+    # output the preamble, including extra parameters specific to this function
+    output_preamble(
+        verbose,
+        debug_level,
+        debug_destination,
+        task=task.value,
+        cache_directory=tree_cache_directory,
+        match_cache_directory=match_cache_directory,
+    )
+    output.console.print()
+    with cache.TreeCache(tree_cache_directory) as tree_cache, cache.MatchCache(
+        match_cache_directory
+    ) as match_cache:
+        # remove all of the entries and statistics from the caches
+        if task == enumerations.CacheTask.CLEAR:
+            tree_cache.clear()
+            match_cache.clear()
+            output.console.print(
+                f":wastebasket: Cleared the cache of trees in {tree_cache_directory}"
+            )
+            output.console.print(
+                f":wastebasket: Cleared the cache of matches in {match_cache_directory}"
+            )
+        # display the size of the caches and the rate at which they are hit
+        elif task == enumerations.CacheTask.STATS:
+            display_cache_statistics(
+                "trees", tree_cache_directory, tree_cache.statistics()
+            )
+            display_cache_statistics(
+                "matches", match_cache_directory, match_cache.statistics()
+            )
+
+
+@cli.command(name="db")
+def manage_database(  # noqa: PLR0913
+    task: enumerations.DatabaseTask = typer.Argument(
+        help="Task to perform on the database."
+    ),
+    database_path: Path = typer.Argument(
+        help="SQLite database with chasten's results.",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+        writable=True,
+        resolve_path=True,
+    ),
+    search_column: List[str] = typer.Option(
+        [],
+        "--search-column",
+        help="A TABLE.COLUMN for full-text search instead of the default columns of that table.",
+    ),
+    debug_level: debug.DebugLevel = typer.Option(
+        debug.DebugLevel.ERROR.value,
+        "--debug-level",
+        "-l",
+        help="Specify the level of debugging output.",
+    ),
+    debug_destination: debug.DebugDestination = typer.Option(
+        debug.DebugDestination.CONSOLE.value,
+        "--debug-dest",
+        "-t",
+        help="Specify the destination for debugging output.",
+    ),
+    verbose: bool = typer.Option(False, help="Display verbose debugging output"),
+) -> None:
+    """🗄️  Manage a database of chasten's results."""
+    # output the preamble, including extra parameters specific to this function
+    output_preamble(
+        verbose,
+        debug_level,
+        debug_destination,
+        task=task.value,
+        database_path=database_path,
+        search_column=search_column,
+    )
+    output.console.print()
+    # enable the full-text search that was deferred, or replace the full-text
+    # search of the tables whose columns are not the specified columns
+    if task == enumerations.DatabaseTask.INDEX:
+        database.enable_full_text_search(
+            str(database_path), parse_search_columns(search_column)
+        )
+        output.console.print(f":sparkles: Enabled full-text search in {database_path}")
+    # index the tables and then replace the view of all of the results, or
+    # the table that already materializes it, with a table of all its rows
+    if task == enumerations.DatabaseTask.REFRESH:
+        database.create_indexes(database_path)
+        row_count = database.refresh_materialized_view(database_path)
+        output.console.print(
+            f":sparkles: Refreshed the table '{constants.chasten.Chasten_Database_View}' with {row_count} rows in {database_path}"
+        )
+        # roll up the counts of the matches of all of the results again
+        run_count = database.refresh_rollup_tables(database_path)
+        output.console.print(
+            f":sparkles: Refreshed the rollup tables with {run_count} analyses in {database_path}"
+        )
+
+
+@cli.command(name="index")
+def manage_index(  # noqa: PLR0913
+    task: enumerations.IndexTask = typer.Argument(enumerations.IndexTask.BUILD.value),
+    input_path: Path = typer.Option(
+        filesystem.get_default_directory_list(),
+        "--search-path",
+        "-d",
+        help="A path (i.e., directory or file) with Python source code(s).",
+        exists=True,
+        file_okay=True,
+        dir_okay=True,
+        readable=True,
+        resolve_path=True,
+    ),
+    index_directory: Path = typer.Option(
+        None,
+        "--index-directory",
+        help="A directory for the index (defaults to .chasten_index in the search path).",
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+    ),
+    debug_level: debug.DebugLevel = typer.Option(
+        debug.DebugLevel.ERROR.value,
+        "--debug-level",
+        "-l",
+        help="Specify the level of debugging output.",
+    ),
+    debug_destination: debug.DebugDestination = typer.Option(
+        debug.DebugDestination.CONSOLE.value,
+        "--debug-dest",
+        "-t",
+        help="Specify the destination for debugging output.",
+    ),
+    verbose: bool = typer.Option(False, help="Display verbose debugging output"),
+) -> None:
+    """🗂️  Manage the index of the node types and identifiers in Python source code."""
+    # detect the directory of the index that analyze --index uses
+    index_directory = filesystem.detect_index_directory(input_path, index_directory)
+    # output the preamble, including extra parameters specific to this function
+    output_preamble(
+        verbose,
+        debug_level,
+        debug_destination,
+        task=task.value,
+        directory=input_path,
+        index_directory=index_directory,
+    )
+    output.console.print()
+    with index.RepositoryIndex(index_directory) as repository_index:
+        # add the new and changed files to the index and remove the files
+        # that are no longer in the search path
+        if task == enumerations.IndexTask.BUILD:
+            python_files = engine.get_python_files([input_path])
+            index_update = repository_index.update(python_files)
+            removed = repository_index.prune(python_files)
+            output.console.print(
+                f":card_index_dividers:  Indexed {len(python_files)} file(s) in {index_directory}:"
+            )
+            output.console.print(
+                f"{constants.markers.Indent}{small_bullet_unicode} Added: {index_update.added}, Changed: {index_update.changed}, Removed: {removed}"
+            )
+            output.console.print(
+                f"{constants.markers.Indent}{small_bullet_unicode} Parsed: {index_update.parsed}"
+            )
+        # remove all of the files and their terms from the index
+        elif task == enumerations.IndexTask.CLEAR:
+            repository_index.clear()
+            output.console.print(
+                f":wastebasket: Cleared the index in {index_directory}"
+            )
+        # display the size of the index
+        elif task == enumerations.IndexTask.STATS:
+            statistics = repository_index.statistics()
+            output.console.print(f":card_index_dividers:  Index in {index_directory}:")
+            output.console.print(
+                f"{constants.markers.Indent}{small_bullet_unicode} Files: {statistics.files} ({statistics.contents} distinct, {statistics.failures} parse failures)"
+            )
+            output.console.print(
+                f"{constants.markers.Indent}{small_bullet_unicode} Terms: {statistics.terms}"
+            )
+            output.console.print(
+                f"{constants.markers.Indent}{small_bullet_unicode} Size: {statistics.size / constants.cache.Bytes_Per_Megabyte:.2f} MB"
+            )
+
+
 @cli.command()
 def log() -> None:
     """🦚 Start the logging server."""
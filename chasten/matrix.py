@@ -0,0 +1,102 @@
+"""Record the number of matches of every check in every file as a matrix of counts."""
+
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CountMatrix:
+    """Record the number of matches of each check (a column) in each file (a row)."""
+
+    files: List[str]
+    checks: List[str]
+    counts: np.ndarray
+
+    def totals(self) -> np.ndarray:
+        """Count the matches of each check across all of the files."""
+        return self.counts.sum(axis=0, dtype=np.int64)
+
+    def matching_files(self, check_index: int) -> np.ndarray:
+        """Find the ids of the files, in the order they were searched, that a check matched."""
+        return np.flatnonzero(self.counts[:, check_index])
+
+    def rollup_directories(self) -> Tuple[List[str], np.ndarray]:
+        """Count the matches of each check in the files of each directory."""
+        # the files in the same directory share a row of the rolled up counts
+        (directories, directory_ids) = np.unique(
+            np.array([str(Path(file_name).parent) for file_name in self.files], str),
+            return_inverse=True,
+        )
+        directory_counts = np.zeros(
+            (len(directories), len(self.checks)), dtype=np.int64
+        )
+        np.add.at(directory_counts, directory_ids, self.counts)
+        return (directories.tolist(), directory_counts)
+
+
+class CountMatrixBuilder:
+    """Accumulate the number of matches of each check in each file of a search."""
+
+    def __init__(self, checks: List[str]) -> None:
+        """Start a matrix of counts for the checks without any files."""
+        self.checks = checks
+        self.file_ids: Dict[str, int] = {}
+        self.match_counts = [0 for _ in checks]
+        # only the cells with matches are recorded while searching, since most
+        # checks do not match most files, and the matrix is filled in at the end
+        self.rows = array("i")
+        self.columns = array("i")
+        self.values = array("i")
+
+    def add_file(self, file_name: str) -> int:
+        """Add a file, if it was not already added, and return its id."""
+        file_id = self.file_ids.get(file_name, None)
+        if file_id is None:
+            file_id = len(self.file_ids)
+            self.file_ids[file_name] = file_id
+        return file_id
+
+    def add(self, file_id: int, check_index: int, count: int) -> None:
+        """Add the number of matches of a check in a file."""
+        self.rows.append(file_id)
+        self.columns.append(check_index)
+        self.values.append(count)
+        self.match_counts[check_index] += count
+
+    def build(self) -> CountMatrix:
+        """Create the dense matrix of the counts with a row for every file that was added."""
+        counts = np.zeros((len(self.file_ids), len(self.checks)), dtype=np.int32)
+        np.add.at(
+            counts,
+            (np.frombuffer(self.rows, np.intc), np.frombuffer(self.columns, np.intc)),
+            np.frombuffer(self.values, np.intc),
+        )
+        return CountMatrix(list(self.file_ids), list(self.checks), counts)
+
+
+def write_count_matrix(count_matrix: CountMatrix, matrix_path: Path) -> None:
+    """Write the matrix of counts, with the names of its files and checks, to a NumPy archive."""
+    (directories, directory_counts) = count_matrix.rollup_directories()
+    # the archive stores the matrix in NumPy's binary format so that the
+    # counts of a search with many files can be loaded without parsing them
+    with matrix_path.open("wb") as matrix_file:
+        np.savez_compressed(
+            matrix_file,
+            files=np.array(count_matrix.files, str),
+            checks=np.array(count_matrix.checks, str),
+            counts=count_matrix.counts,
+            directories=np.array(directories, str),
+            directory_counts=directory_counts,
+        )
+
+
+def read_count_matrix(matrix_path: Path) -> CountMatrix:
+    """Read the matrix of counts from a NumPy archive."""
+    with np.load(matrix_path) as archive:
+        return CountMatrix(
+            archive["files"].tolist(), archive["checks"].tolist(), archive["counts"]
+        )
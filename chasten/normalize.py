@@ -0,0 +1,142 @@
+"""Normalize the results of an analysis so that each check, file, and snippet of source code is only recorded once."""
+
+import bisect
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from chasten import constants, output, results, snippets, store
+
+
+def find_snippet_regions(
+    linenos: Sequence[int], line_count: int
+) -> List[Tuple[int, int]]:
+    """Find the ranges of line indices that cover the lines around each of the line numbers."""
+    regions: List[Tuple[int, int]] = []
+    for lineno in sorted(set(linenos)):
+        start = max(0, lineno - constants.markers.Code_Context)
+        end = min(line_count, lineno + constants.markers.Code_Context)
+        # the lines around neighbouring matches overlap, or are next to each
+        # other, and so they are combined into the same region of the file
+        if len(regions) > 0 and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def create_normalized_results(
+    configuration: results.Configuration,
+    match_store: store.MatchStore,
+    file_names: Sequence[str],
+    check_templates: Sequence[results.Check],
+    check_statuses: Dict[int, bool],
+) -> results.NormalizedChasten:
+    """Create the normalized results of the reported checks' matches."""
+    normalized_results = results.NormalizedChasten(configuration=configuration)
+    # the table of checks only has the reported checks, with their outcomes
+    check_rows: Dict[int, int] = {}
+    for check_index in sorted(check_statuses):
+        current_check = check_templates[check_index].model_copy(deep=True)
+        current_check.passed = check_statuses[check_index]
+        check_rows[check_index] = len(normalized_results.checks)
+        normalized_results.checks.append(current_check)
+    file_ids = np.frombuffer(match_store.file_ids, np.intc)
+    check_ids = np.frombuffer(match_store.check_ids, np.intc)
+    linenos = np.frombuffer(match_store.linenos, np.intc)
+    reported = np.isin(check_ids, list(check_rows))
+    # find the regions of each file that have the lines around its matches,
+    # reading each of the files only once, so that the lines shared by
+    # neighbouring matches are only recorded once in a snippet
+    file_rows: Dict[int, int] = {}
+    snippet_rows: Dict[Tuple[int, int], int] = {}
+    for file_id in np.unique(file_ids[reported]).tolist():
+        try:
+            source_buffer = snippets.read_source_buffer(Path(file_names[file_id]))
+        except (OSError, SyntaxError, ValueError) as error:
+            output.logger.debug(f"Could not decode {file_names[file_id]}: {error}")
+            continue
+        file_rows[file_id] = len(normalized_results.files)
+        normalized_results.files.append(file_names[file_id])
+        file_linenos = linenos[reported & (file_ids == file_id)].tolist()
+        regions = find_snippet_regions(file_linenos, len(source_buffer))
+        # each matching line is in the last region that starts at or before it
+        region_starts = [start for start, _ in regions]
+        for lineno in file_linenos:
+            snippet_rows[(file_id, lineno)] = (
+                len(normalized_results.snippets)
+                + bisect.bisect_right(region_starts, lineno - 1)
+                - 1
+            )
+        for start, end in regions:
+            normalized_results.snippets.append(
+                results.Snippet(
+                    file=file_rows[file_id],
+                    lineno=start + 1,
+                    text=source_buffer.join_lines(start, end),
+                )
+            )
+    # record the matches ordered by check and then by file, in the order they
+    # were searched, like the sources of the results that are not normalized
+    for index in np.lexsort((file_ids, check_ids)).tolist():
+        file_id = int(file_ids[index])
+        check_index = int(check_ids[index])
+        if check_index not in check_rows or file_id not in file_rows:
+            continue
+        normalized_results.matches.append(
+            (
+                check_rows[check_index],
+                file_rows[file_id],
+                snippet_rows[(file_id, match_store.linenos[index])],
+                match_store.linenos[index],
+                match_store.col_offsets[index],
+            )
+        )
+    return normalized_results
+
+
+def expand_normalized_results(normalized_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Expand the dictionary of normalized results into the dictionary of results that are not normalized."""
+    checks = normalized_dict["checks"]
+    files = normalized_dict["files"]
+    snippet_lines = [
+        snippet["text"].split(constants.markers.Newline)
+        for snippet in normalized_dict["snippets"]
+    ]
+    sources: List[Dict[str, Any]] = []
+    previous_source: Tuple[int, int] = (-1, -1)
+    for row in normalized_dict["matches"]:
+        match_row = dict(zip(normalized_dict["matchcolumns"], row))
+        # the matches of a check in a file are next to each other and so a new
+        # source starts each time that either the check or the file changes
+        if (match_row["check"], match_row["file"]) != previous_source:
+            previous_source = (match_row["check"], match_row["file"])
+            sources.append(
+                {
+                    "filename": files[match_row["file"]],
+                    "check": {**checks[match_row["check"]], "matches": []},
+                }
+            )
+        # slice the matching line and the lines around it from the snippet
+        # of the region of the file that contains them; note that the first
+        # line of the snippet is not always the first line of the file
+        lines = snippet_lines[match_row["snippet"]]
+        offset = normalized_dict["snippets"][match_row["snippet"]]["lineno"] - 1
+        lineno = match_row["lineno"]
+        context_start = max(0, lineno - constants.markers.Code_Context) - offset
+        context_end = lineno + constants.markers.Code_Context - offset
+        sources[-1]["check"]["matches"].append(
+            {
+                "lineno": lineno,
+                "coloffset": match_row["coloffset"],
+                "linematch": lines[lineno - 1 - offset].lstrip(constants.markers.Space),
+                "linematch_context": constants.markers.Newline.join(
+                    lines[context_start:context_end]
+                ),
+            }
+        )
+    return {
+        "configuration": normalized_dict["configuration"],
+        "sources": sources,
+    }
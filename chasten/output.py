@@ -1,7 +1,6 @@
 """Perform logging and/or console output."""
 
 import logging
-from copy import deepcopy
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -224,20 +223,13 @@ def print_analysis_details(chasten: results.Chasten, verbose: bool = False) -> N
                     # extract the column offset for this match
                     column_offset = current_match.position.col_offset
                     # get a pre-defined number of the lines both
-                    # before and after the line that is the closest match;
-                    # note that the use of "*" is an indicator of the
-                    # specific line that is the focus of the search
-                    all_lines = current_match.file_lines
-                    # create a deepcopy of the listing of lines so that
-                    # the annotated version of the lines for this specific
-                    # match does not appear in annotated version of other matches
-                    all_lines_for_marking = deepcopy(all_lines)
-                    lines = all_lines_for_marking[
-                        max(
-                            0, position_end - constants.markers.Code_Context
-                        ) : position_end
-                        + constants.markers.Code_Context
-                    ]
+                    # before and after the line that is the closest match
+                    # as one slice of the buffer that the source shares
+                    # with all of the other sources for the same file
+                    code_lines = current_source._sourcebuffer.join_lines(  # type: ignore
+                        max(0, position_end - constants.markers.Code_Context),
+                        position_end + constants.markers.Code_Context,
+                    )
                     # create a rich panel to display the results:
                     # key features:
                     # --> descriptive label
@@ -246,7 +238,7 @@ def print_analysis_details(chasten: results.Chasten, verbose: bool = False) -> N
                     # --> highlight for the matching position
                     # --> suitable theme (could be customized)
                     code_syntax = Syntax(
-                        "\n".join(str(line) for line in lines),
+                        code_lines,
                         constants.chasten.Programming_Language,
                         theme=constants.chasten.Theme_Colors,
                         background_color=constants.chasten.Theme_Background,
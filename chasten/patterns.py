@@ -0,0 +1,59 @@
+"""Compile the XPath patterns of checks once and evaluate them on many XML trees."""
+
+import functools
+from typing import Any, Dict, List, Tuple, Union
+
+import elementpath  # type: ignore
+from lxml import etree  # type: ignore
+from lxml.etree import _Element  # type: ignore
+from pyastgrep import xml  # type: ignore # noqa: F401
+
+from chasten import constants
+
+# note that importing pyastgrep's xml module registers the re:match and
+# re:search extension functions that XPath 1.0 patterns are able to call
+
+CompiledPattern = Union[etree.XPath, elementpath.Selector]
+
+
+@functools.lru_cache(maxsize=None)
+def compile_pattern(pattern: str, xpath2: bool = True) -> CompiledPattern:
+    """Compile a pattern with the same XPath engine that pyastgrep would use."""
+    # compiling a pattern for XPath 2.0 with elementpath is expensive and
+    # thus each pattern is only compiled once for each version of XPath;
+    # note that a pattern with a syntax error raises an exception here
+    if xpath2:
+        return elementpath.Selector(pattern)
+    return etree.XPath(pattern)
+
+
+def create_document(xml_root: _Element, xpath2: bool = True) -> Any:
+    """Create the document that the compiled patterns are evaluated on."""
+    # elementpath wraps every element of the tree in a node before evaluating
+    # a pattern; wrapping the tree once means that each pattern evaluated on
+    # the same tree does not repeat this work
+    if xpath2:
+        return elementpath.get_node_tree(xml_root)
+    return xml_root
+
+
+def evaluate_pattern(compiled_pattern: CompiledPattern, document: Any) -> Any:
+    """Evaluate a compiled pattern on a document and return its results."""
+    # for XPath 2.0, this is equivalent to elementpath.select and, for XPath 1.0,
+    # this is equivalent to calling the xpath method of the tree's root element
+    if isinstance(compiled_pattern, elementpath.Selector):
+        return compiled_pattern.select(document)
+    return compiled_pattern(document)
+
+
+def validate_patterns(
+    check_list: List[Dict[str, Union[str, Dict[str, int]]]], xpath2: bool = True
+) -> List[Tuple[str, str]]:
+    """Compile the pattern of each check and return the id and error of each invalid check."""
+    invalid_checks: List[Tuple[str, str]] = []
+    for check in check_list:
+        try:
+            compile_pattern(str(check[constants.checks.Check_Pattern]), xpath2)
+        except (etree.XPathError, elementpath.ElementPathError) as error:
+            invalid_checks.append((str(check[constants.checks.Check_Id]), str(error)))
+    return invalid_checks
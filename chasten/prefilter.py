@@ -0,0 +1,193 @@
+"""Skip the checks that cannot match a file because its source code lacks the text they require."""
+
+import codecs
+import functools
+import re
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional, Sequence, Set
+
+from pyastgrep import files  # type: ignore
+
+from chasten import astpath
+
+# the keyword that the source code must contain for the AST to have a node
+# of a type; note that a type that can be written without a keyword, like a
+# Call or a Name, does not require any text in the source code
+NODE_KEYWORDS = {
+    "AsyncFor": b"async",
+    "AsyncFunctionDef": b"async",
+    "AsyncWith": b"async",
+    "Assert": b"assert",
+    "Await": b"await",
+    "Break": b"break",
+    "ClassDef": b"class",
+    "Continue": b"continue",
+    "Delete": b"del",
+    "ExceptHandler": b"except",
+    "For": b"for",
+    "FunctionDef": b"def",
+    "Global": b"global",
+    "If": b"if",
+    "IfExp": b"if",
+    "Import": b"import",
+    "ImportFrom": b"from",
+    "Lambda": b"lambda",
+    "Match": b"match",
+    "NamedExpr": b":=",
+    "Nonlocal": b"nonlocal",
+    "Pass": b"pass",
+    "Raise": b"raise",
+    "Return": b"return",
+    "Try": b"try",
+    "TryStar": b"try",
+    "While": b"while",
+    "With": b"with",
+    "Yield": b"yield",
+    "YieldFrom": b"yield",
+    "comprehension": b"for",
+}
+
+# the attributes whose values are identifiers, or dotted names made of them,
+# that appear as they are in the source code of a file that is only ASCII
+IDENTIFIER_ATTRIBUTES = {"arg", "asname", "attr", "id", "module", "name", "rest"}
+
+IDENTIFIER_TEXT = re.compile(r"[A-Za-z0-9_]+")
+
+# the kinds of terms: a node of a type, an identifier with the text and an
+# identifier that contains the text, like the name of a function with test_
+NODE_TERM = "node"
+IDENTIFIER_TERM = "identifier"
+IDENTIFIER_PART_TERM = "identifier-part"
+
+# the encodings in which the bytes of a file that is only ASCII are the text
+# that Python parses; the filter is not used for the files in other encodings
+ASCII_COMPATIBLE_ENCODINGS = {"ascii", "cp1252", "iso8859-1", "utf-8"}
+
+
+@dataclass(frozen=True)
+class Term:
+    """Describe a node type, or the text of an identifier, that a match requires in a file."""
+
+    kind: str
+    text: str
+
+
+@functools.lru_cache(maxsize=None)
+def get_required_terms(pattern: str) -> Optional[FrozenSet[Term]]:
+    """Get the terms that a file must contain for a pattern to match, if this is provable."""
+    # only a pattern that astpath compiles has a structure that is known
+    # well enough to prove which terms a match requires in the source code
+    query = astpath.compile_query(pattern)
+    if query is None:
+        return None
+    return frozenset(find_query_terms(query))
+
+
+@functools.lru_cache(maxsize=None)
+def get_required_literals(pattern: str) -> Optional[FrozenSet[bytes]]:
+    """Get the literals that a file must contain for a pattern to match, if this is provable."""
+    required_terms = get_required_terms(pattern)
+    if required_terms is None:
+        return None
+    # a node type requires its keyword, if it has one, and the text of an
+    # identifier is in the source code as long as it is only made of ASCII
+    literals: Set[bytes] = set()
+    for term in required_terms:
+        if term.kind == NODE_TERM:
+            keyword = NODE_KEYWORDS.get(term.text, None)
+            if keyword is not None:
+                literals.add(keyword)
+        elif IDENTIFIER_TEXT.fullmatch(term.text):
+            literals.add(term.text.encode("ascii"))
+    return frozenset(literals)
+
+
+def find_query_terms(query: astpath.Query) -> Set[Term]:
+    """Find the terms that every match of a path, or of a union of paths, requires."""
+    if isinstance(query, astpath.UnionPath):
+        # a union matches when one of its paths matches and thus it only
+        # requires the terms that each of its paths requires
+        return set.intersection(*(find_path_terms(path) for path in query.paths))
+    return find_path_terms(query)
+
+
+def find_path_terms(path: astpath.LocationPath) -> Set[Term]:
+    """Find the terms that every match of a path requires."""
+    # each step of a path must select at least one node, and that node must
+    # pass each of the step's predicates, for the path to select any nodes;
+    # note that the name of a step can also be the name of a field
+    terms: Set[Term] = set()
+    for _, step in path.steps:
+        if step.axis != astpath.ATTRIBUTE_AXIS and step.name not in (
+            astpath.NODE_TEST,
+            astpath.WILDCARD,
+        ):
+            terms.add(Term(NODE_TERM, step.name))
+        for predicate in step.predicates:
+            terms.update(find_expression_terms(predicate))
+    return terms
+
+
+def find_expression_terms(expression: object) -> Set[Term]:
+    """Find the terms that a predicate expression requires to be true."""
+    if isinstance(expression, astpath.BooleanOperation):
+        left = find_expression_terms(expression.left)
+        right = find_expression_terms(expression.right)
+        return left | right if expression.operator == "and" else left & right
+    if isinstance(expression, astpath.Comparison):
+        terms = find_path_terms(expression.path)
+        if expression.operator == "=":
+            terms.update(
+                find_attribute_terms(
+                    expression.path, IDENTIFIER_TERM, expression.literal
+                )
+            )
+        return terms
+    if isinstance(expression, astpath.FunctionCall):
+        # nothing is required for not() to be true and the first argument of
+        # contains() and starts-with() must contain the second argument
+        if expression.name in astpath.STRING_FUNCTIONS:
+            (value, part) = expression.arguments
+            if isinstance(value, astpath.LocationPath) and isinstance(
+                part, astpath.Literal
+            ):
+                return find_attribute_terms(value, IDENTIFIER_PART_TERM, part.value)
+        return set()
+    if isinstance(expression, astpath.LocationPath):
+        return find_path_terms(expression)
+    return set()
+
+
+def find_attribute_terms(path: astpath.LocationPath, kind: str, text: str) -> Set[Term]:
+    """Find the term that an attribute with an identifier requires."""
+    (_, step) = path.steps[-1]
+    if step.name in IDENTIFIER_ATTRIBUTES and len(text) > 0:
+        return {Term(kind, text)}
+    return set()
+
+
+def is_filterable(contents: bytes) -> bool:
+    """Determine whether or not the bytes of a file are the text that Python parses."""
+    # an identifier that is not ASCII is normalized by Python and thus it may
+    # not be in the source code as it is in the AST
+    if not contents.isascii():
+        return False
+    try:
+        encoding = codecs.lookup(files.get_encoding(contents)).name
+    except LookupError:
+        return False
+    return encoding in ASCII_COMPATIBLE_ENCODINGS
+
+
+def find_possible_expressions(contents: bytes, expressions: Sequence[str]) -> List[int]:
+    """Find the indices of the expressions that could match the source code of a file."""
+    if not is_filterable(contents):
+        return list(range(len(expressions)))
+    possible: List[int] = []
+    for index, expression in enumerate(expressions):
+        required_literals = get_required_literals(expression)
+        if required_literals is None or all(
+            literal in contents for literal in required_literals
+        ):
+            possible.append(index)
+    return possible
@@ -1,12 +1,13 @@
 """Analyze the abstract syntax tree, its XML-based representation, and/or the search results."""
 
 import json
+from pathlib import Path
 from typing import Any, Dict, List, Tuple, Union
 
 from pyastgrep import search as pyastgrepsearch  # type: ignore
 from thefuzz import fuzz  # type: ignore
 
-from chasten import constants, enumerations
+from chasten import constants, enumerations, results, snippets
 
 
 def include_or_exclude_checks(
@@ -94,6 +95,71 @@ def organize_matches(
     return match_dict
 
 
+def create_result_source(
+    check_template: results.Check,
+    path: Path,
+    source_buffer: snippets.SourceBuffer,
+    positions: List[pyastgrepsearch.Position],
+    verbose: bool = False,
+) -> results.Source:
+    """Create the source that records all of a check's matches in one file."""
+    # create the current check from the template that contains all of the
+    # details about the check other than its matches; note that whether or not
+    # the check passed is only known after all of the files were searched
+    current_check_save = check_template.model_copy(deep=True)
+    # create a source that is solely for this file name
+    current_result_source = results.Source(filename=str(path))
+    # put the current check into the list of checks in the current source
+    current_result_source.check = current_check_save
+    # the buffer of the file is shared by all of the sources for the file
+    # so that the snippets of source code are only sliced from it when
+    # they are displayed or when the matches are saved
+    current_result_source._sourcebuffer = source_buffer
+    for position in positions:
+        # create a match specifically for this file
+        current_match_for_current_check_save = results.Match(
+            lineno=position.lineno,
+            coloffset=position.col_offset,
+        )
+        # add the match to the listing of matches for the current check
+        current_check_save.matches.append(current_match_for_current_check_save)
+        # save the entire match as an instance of pyastgrepsearch.Match
+        # for verbose debugging output as needed; note that the lines
+        # of the file are in the source's buffer instead of in the match
+        if verbose:
+            current_check_save._matches.append(
+                pyastgrepsearch.Match(
+                    path=path,
+                    file_lines=[],
+                    xml_element=None,
+                    position=position,
+                    ast_node=None,
+                )
+            )
+    return current_result_source
+
+
+def fill_match_snippets(sources: List[results.Source]) -> None:
+    """Slice the matching line and the lines around it for each match of the sources."""
+    for current_source in sources:
+        source_buffer = current_source._sourcebuffer
+        if source_buffer is None or current_source.check is None:
+            continue
+        for current_match in current_source.check.matches:
+            # extract the direct line number for this match
+            position_end = current_match.lineno
+            # note that the AST starts line numbering at 1 like the
+            # buffer and that linematch is the result of using
+            # lstrip to remove any blank spaces before the code
+            current_match.linematch = source_buffer.line(position_end).lstrip(
+                constants.markers.Space
+            )
+            current_match.linematch_context = source_buffer.join_lines(
+                max(0, position_end - constants.markers.Code_Context),
+                position_end + constants.markers.Code_Context,
+            )
+
+
 def combine_dicts(dict_list: List[Dict[Any, Any]]) -> str:
     """Combine all dictionaries in the list into a single list of dictionaries as a string."""
     # combine all of the dictionaries in the list into
@@ -0,0 +1,141 @@
+"""Create XML trees that only contain the elements that the patterns of checks can reach."""
+
+import ast
+import functools
+import re
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from lxml import etree  # type: ignore
+from lxml.etree import _Element  # type: ignore
+from pyastgrep import asts  # type: ignore
+from pyastgrep import search as pyastgrepsearch  # type: ignore
+
+# every name in a pattern, including the names of elements, attributes, axes
+# and functions; collecting more names than a pattern can reach only means
+# that the tree keeps more elements than it needs to
+NAME_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_-]*")
+
+# a pattern with a wildcard, or with a test that matches any kind of node,
+# can reach an element without naming it and thus needs the full tree; note
+# that this also conservatively includes the * operator for multiplication
+WILDCARD_PATTERN = re.compile(
+    r"\*|\b(?:node|element|attribute|schema-element|schema-attribute)\s*\("
+    r"|\bdeep-equal\s*\("
+)
+
+# the text of the tree is only in the elements of the literals in lists, like
+# the names of a global statement, and these elements are always kept so that
+# the string value of every element that is kept does not change
+ITEM_NAME = "item"
+
+POSITION_ATTRIBUTES = ("lineno", "col_offset")
+
+TYPE_ATTRIBUTE = "type"
+
+ElementPositions = Dict[_Element, pyastgrepsearch.Position]
+
+
+@functools.lru_cache(maxsize=None)
+def get_projection(patterns: Tuple[str, ...]) -> Optional[FrozenSet[str]]:
+    """Get the names of the elements and attributes that the patterns can reach."""
+    names = {ITEM_NAME}
+    for pattern in patterns:
+        # a wildcard can reach any element or attribute and thus the full
+        # tree is needed by all of the patterns evaluated on the same tree
+        if WILDCARD_PATTERN.search(pattern) is not None:
+            return None
+        names.update(NAME_PATTERN.findall(pattern))
+    return frozenset(names)
+
+
+def create_pruned_xml(
+    parsed_ast: ast.AST, projection: FrozenSet[str]
+) -> Tuple[_Element, ElementPositions]:
+    """Convert an AST to an XML tree that only contains the elements in the projection."""
+    element_positions: ElementPositions = {}
+    xml_root = convert_node(parsed_ast, projection, element_positions)
+    # the root of the tree is always kept since a relative pattern starts there
+    if xml_root is None:
+        xml_root = etree.Element(parsed_ast.__class__.__name__)
+    return (xml_root, element_positions)
+
+
+def convert_node(
+    ast_node: ast.AST, projection: FrozenSet[str], element_positions: ElementPositions
+) -> Optional[_Element]:
+    """Convert an AST node to XML, in the same way as pyastgrep, if the projection reaches it."""
+    node_name = ast_node.__class__.__name__
+    # convert the fields of the node first since the node's element is only
+    # needed when the projection contains its name or one of its fields
+    attributes: List[Tuple[str, str]] = []
+    field_elements: List[_Element] = []
+    for field_name in ast_node._fields:
+        field_value = getattr(ast_node, field_name)
+        if isinstance(field_value, ast.AST):
+            field_values = [field_value]
+        elif isinstance(field_value, list):
+            field_values = field_value
+        else:
+            # like pyastgrep, the type attribute records the type of the last
+            # field of the node with a literal value, like the value of a Constant
+            if field_value is not None:
+                attributes.append(
+                    (TYPE_ATTRIBUTE, asts._encoded_literal(type(field_value).__name__))
+                )
+                attributes.append((field_name, asts._encoded_literal(field_value)))
+            continue
+        field_element = convert_field(
+            field_name, field_values, projection, element_positions
+        )
+        if field_element is not None:
+            field_elements.append(field_element)
+    if node_name not in projection and not field_elements:
+        return None
+    xml_node = create_element(ast_node, attributes, projection)
+    for field_element in field_elements:
+        xml_node.append(field_element)
+    position = pyastgrepsearch.position_from_node(ast_node)
+    if position is not None:
+        element_positions[xml_node] = position
+    return xml_node
+
+
+def create_element(
+    ast_node: ast.AST, attributes: List[Tuple[str, str]], projection: FrozenSet[str]
+) -> _Element:
+    """Create the element of an AST node with the attributes that the projection reaches."""
+    xml_node = etree.Element(ast_node.__class__.__name__)
+    # the positions of the nodes come from the AST instead of the attributes
+    # and thus only the attributes that the projection reaches are added
+    for attribute_name in POSITION_ATTRIBUTES:
+        value = getattr(ast_node, attribute_name, None)
+        if value is not None and attribute_name in projection:
+            xml_node.set(attribute_name, asts._encoded_literal(value))
+    for attribute_name, value in attributes:
+        if attribute_name in projection:
+            xml_node.set(attribute_name, value)
+    return xml_node
+
+
+def convert_field(
+    field_name: str,
+    field_values: List,
+    projection: FrozenSet[str],
+    element_positions: ElementPositions,
+) -> Optional[_Element]:
+    """Convert the nodes and literals of a field to XML if the projection reaches them."""
+    value_elements: List[_Element] = []
+    for field_value in field_values:
+        if isinstance(field_value, ast.AST):
+            node_element = convert_node(field_value, projection, element_positions)
+            if node_element is not None:
+                value_elements.append(node_element)
+        else:
+            item_element = etree.Element(ITEM_NAME)
+            item_element.text = asts._encoded_literal(field_value)
+            value_elements.append(item_element)
+    if field_name not in projection and not value_elements:
+        return None
+    field_element = etree.Element(field_name)
+    field_element.extend(value_elements)
+    return field_element
@@ -3,13 +3,13 @@
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Optional, Tuple, Union
 
 from pyastgrep import search as pyastgrepsearch  # type: ignore
 from pydantic import BaseModel
 from pydantic.types import conint
 
-from chasten import debug
+from chasten import constants, debug, snippets
 
 # Note: the nesting of the class definitions is from the
 # bottom of this file to the top because the top-level
@@ -32,6 +32,7 @@ from chasten import debug
 #           --> confidence
 # --> Source
 #     --> filename
+#     --> _sourcebuffer --> snippets.SourceBuffer [*]
 #     --> check
 #         --> Check
 #             --> id
@@ -80,7 +81,7 @@ class Source(BaseModel):
     """Define a Pydantic model for a Source."""
 
     filename: str
-    _filelines: List[str] = []
+    _sourcebuffer: Optional[snippets.SourceBuffer] = None
     check: Union[None, Check] = None
 
 
@@ -113,3 +114,42 @@ class Chasten(BaseModel):
 
     configuration: Configuration
     sources: list[Source] = []
+
+
+# Note: the normalized results (version 2) record each check and each file
+# only once and each match is a row that refers to them by their index:
+
+# NormalizedChasten
+# --> version
+# --> configuration --> Configuration
+# --> checks
+#     --> Check (without its matches)
+# --> files
+# --> snippets
+#     --> Snippet
+#         --> file
+#         --> lineno
+#         --> text
+# --> matchcolumns
+# --> matches
+#     --> [check, file, snippet, lineno, coloffset]
+
+
+class Snippet(BaseModel):
+    """Define a Pydantic model for a Snippet of the lines around matches in a file."""
+
+    file: int
+    lineno: int
+    text: str
+
+
+class NormalizedChasten(BaseModel):
+    """Define a Pydantic model for a normalized Chasten result."""
+
+    version: int = constants.schema.Normalized_Version
+    configuration: Configuration
+    checks: list[Check] = []
+    files: list[str] = []
+    snippets: list[Snippet] = []
+    matchcolumns: list[str] = ["check", "file", "snippet", "lineno", "coloffset"]
+    matches: list[Tuple[int, int, int, int, int]] = []
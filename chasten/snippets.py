@@ -0,0 +1,68 @@
+"""Slice the snippets of source code around matches from a buffer with an index of its lines."""
+
+from array import array
+from itertools import accumulate
+from pathlib import Path
+from typing import List
+
+from pyastgrep import files  # type: ignore
+
+from chasten import constants
+
+
+class SourceBuffer:
+    """Keep the decoded source code of a file with the offsets where each of its lines starts and ends."""
+
+    def __init__(self, text: str) -> None:
+        """Index the lines of the source code in the same way as str.splitlines."""
+        self.text = text
+        # find the length of each line both with and without its line break
+        # so that the lines have the same boundaries as those of splitlines
+        lines_with_breaks = text.splitlines(keepends=True)
+        line_widths = [len(line) for line in text.splitlines()]
+        line_lengths = [len(line) for line in lines_with_breaks]
+        self.starts = array(
+            "q", accumulate(line_lengths[:-1], initial=0) if line_lengths else []
+        )
+        self.ends = array(
+            "q", (start + width for start, width in zip(self.starts, line_widths))
+        )
+        # a line break other than a newline is either two characters long or
+        # is not a newline and thus the line breaks are all newlines only when
+        # their total length is the same as the number of newlines in the text
+        break_width = sum(line_lengths) - sum(line_widths)
+        self.newlines_only = break_width == text.count(constants.markers.Newline)
+
+    def __len__(self) -> int:
+        """Count the lines of the source code."""
+        return len(self.starts)
+
+    def line(self, lineno: int) -> str:
+        """Slice a line, numbered from 1 like the lines of an AST, without its line break."""
+        return self.text[self.starts[lineno - 1] : self.ends[lineno - 1]]
+
+    def join_lines(self, start: int, end: int) -> str:
+        """Join the lines in the range of indices with newlines, like joining a slice of a list of lines."""
+        indices = range(len(self))[start:end]
+        if len(indices) == 0:
+            return constants.markers.Empty_String
+        # the lines are already separated by newlines in the text and thus
+        # the joined lines are one slice of the text from the first line's
+        # start to the last line's end that does not copy any other lines
+        if self.newlines_only:
+            return self.text[self.starts[indices[0]] : self.ends[indices[-1]]]
+        return constants.markers.Newline.join(self.line(index + 1) for index in indices)
+
+    def lines(self) -> List[str]:
+        """Slice all of the lines of the source code."""
+        return [self.line(lineno) for lineno in range(1, len(self) + 1)]
+
+
+def decode_source_buffer(contents: bytes) -> SourceBuffer:
+    """Decode Python source code into a buffer in the same way as pyastgrep."""
+    return SourceBuffer(contents.decode(files.get_encoding(contents)))
+
+
+def read_source_buffer(path: Path) -> SourceBuffer:
+    """Read a Python source file into a buffer in the same way as pyastgrep."""
+    return decode_source_buffer(path.read_bytes())
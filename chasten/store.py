@@ -0,0 +1,102 @@
+"""Store the positions of the matches of every check in columns of integers until they are reported."""
+
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from pyastgrep import search as pyastgrepsearch  # type: ignore
+
+from chasten import output, process, results, snippets
+
+
+class MatchStore:
+    """Store the check, file, line number, and column offset of each match in its own column."""
+
+    def __init__(self) -> None:
+        """Start a store without any matches."""
+        # the store only has integers, and not the lines of the files or the
+        # trees that were searched, so that those are released after each file
+        self.file_ids = array("i")
+        self.check_ids = array("i")
+        self.linenos = array("i")
+        self.col_offsets = array("i")
+
+    def __len__(self) -> int:
+        """Count the matches in the store."""
+        return len(self.linenos)
+
+    def add(
+        self,
+        file_id: int,
+        check_index: int,
+        positions: Sequence[pyastgrepsearch.Position],
+    ) -> None:
+        """Add the positions of a check's matches in a file."""
+        self.file_ids.extend(file_id for _ in positions)
+        self.check_ids.extend(check_index for _ in positions)
+        self.linenos.extend(position.lineno for position in positions)
+        self.col_offsets.extend(position.col_offset for position in positions)
+
+    def create_sources(
+        self,
+        file_names: Sequence[str],
+        check_templates: Sequence[results.Check],
+        check_statuses: Dict[int, bool],
+        verbose: bool = False,
+    ) -> List[results.Source]:
+        """Create the sources of the reported checks' matches, ordered by check and then by file."""
+        file_ids = np.frombuffer(self.file_ids, np.intc)
+        check_ids = np.frombuffer(self.check_ids, np.intc)
+        # visit the matches by file, and then by check, in the order they were
+        # added so that each file is read into one shared buffer only once; note that
+        # the sort is stable and thus each check's matches keep their order
+        order = np.lexsort((check_ids, file_ids))
+        boundaries = np.flatnonzero(
+            (np.diff(file_ids[order]) != 0) | (np.diff(check_ids[order]) != 0)
+        )
+        check_sources: Dict[int, List[results.Source]] = {}
+        source_buffer: Optional[snippets.SourceBuffer] = None
+        current_file_id = -1
+        for group in np.split(order, boundaries + 1) if len(order) > 0 else []:
+            file_id = int(file_ids[group[0]])
+            check_index = int(check_ids[group[0]])
+            # only the checks that were reported, with their outcomes, have sources
+            if check_index not in check_statuses:
+                continue
+            # a file that can no longer be read does not have any sources
+            if file_id != current_file_id:
+                current_file_id = file_id
+                try:
+                    source_buffer = snippets.read_source_buffer(
+                        Path(file_names[file_id])
+                    )
+                except (OSError, SyntaxError, ValueError) as error:
+                    output.logger.debug(
+                        f"Could not decode {file_names[file_id]}: {error}"
+                    )
+                    source_buffer = None
+            if source_buffer is None or len(source_buffer) == 0:
+                continue
+            current_result_source = process.create_result_source(
+                check_templates[check_index],
+                Path(file_names[file_id]),
+                source_buffer,
+                [
+                    pyastgrepsearch.Position(
+                        self.linenos[index], self.col_offsets[index]
+                    )
+                    for index in group
+                ],
+                verbose,
+            )
+            # record the outcome of the check now that it is known
+            current_result_source.check.passed = check_statuses[  # type: ignore
+                check_index
+            ]
+            check_sources.setdefault(check_index, []).append(current_result_source)
+        return [
+            current_result_source
+            for check_index in sorted(check_sources)
+            for current_result_source in check_sources[check_index]
+        ]
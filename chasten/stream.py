@@ -0,0 +1,138 @@
+"""Write and read the results of an analysis as a stream of newline-delimited JSON records."""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from pyastgrep import search as pyastgrepsearch  # type: ignore
+
+from chasten import constants, output, process, results, snippets
+
+
+class ResultsStream:
+    """Write a record for each check's matches in a file while the files are searched."""
+
+    def __init__(self, results_path: Path) -> None:
+        """Open the file that the records are written to."""
+        self.results_path = results_path
+        self.results_file = results_path.open("w", encoding="utf-8")
+
+    def write_record(self, record_type: str, record: Dict[str, Any]) -> None:
+        """Write one record on its own line, labelled with its type."""
+        self.results_file.write(
+            json.dumps({constants.stream.Record: record_type, **record})
+            + constants.markers.Newline
+        )
+
+    def write_configuration(self, configuration: results.Configuration) -> None:
+        """Write the configuration of the analysis as the header of the stream."""
+        self.write_record(
+            constants.stream.Configuration_Record,
+            {
+                constants.stream.Configuration_Record: configuration.model_dump(
+                    mode="json"
+                )
+            },
+        )
+        self.results_file.flush()
+
+    def write_file_matches(
+        self,
+        path: Path,
+        check_templates: Sequence[results.Check],
+        positions: Sequence[Sequence[pyastgrepsearch.Position]],
+    ) -> None:
+        """Write a record for the matches of each check in a file and flush them."""
+        if not any(len(check_positions) > 0 for check_positions in positions):
+            return
+        try:
+            source_buffer = snippets.read_source_buffer(path)
+        except (OSError, SyntaxError, ValueError) as error:
+            output.logger.debug(f"Could not decode {path}: {error}")
+            return
+        for check_index, check_positions in enumerate(positions):
+            if len(check_positions) == 0:
+                continue
+            current_result_source = process.create_result_source(
+                check_templates[check_index],
+                path,
+                source_buffer,
+                list(check_positions),
+            )
+            process.fill_match_snippets([current_result_source])
+            source_record = current_result_source.model_dump(mode="json")
+            # whether or not the check passed is only known after all of the
+            # files were searched and thus it is recorded by the last record
+            source_record["check"]["passed"] = None
+            source_record[constants.stream.Check_Index] = check_index
+            self.write_record(constants.stream.Source_Record, source_record)
+        # flush the records of each file so that the records of all of the
+        # files searched so far are kept even if the analysis does not finish
+        self.results_file.flush()
+
+    def write_outcomes(self, check_statuses: Dict[int, bool]) -> None:
+        """Write whether or not each reported check passed as the last record of the stream."""
+        self.write_record(
+            constants.stream.Outcome_Record,
+            {
+                constants.stream.Outcome_Record: {
+                    str(check_index): check_status
+                    for check_index, check_status in check_statuses.items()
+                }
+            },
+        )
+        self.results_file.flush()
+
+    def close(self) -> None:
+        """Close the file that the records were written to."""
+        self.results_file.close()
+
+
+def open_results_stream(
+    results_path: Path, results_configuration: results.Configuration
+) -> ResultsStream:
+    """Open a stream of the results of an analysis that starts with its configuration."""
+    results_stream = ResultsStream(results_path)
+    results_stream.write_configuration(results_configuration)
+    return results_stream
+
+
+def read_results_stream(lines: Iterable[str]) -> Dict[str, Any]:
+    """Read the records of a stream into the same dictionary as the JSON results."""
+    configuration: Optional[Dict[str, Any]] = None
+    source_records: List[Dict[str, Any]] = []
+    check_statuses: Optional[Dict[str, bool]] = None
+    for line in lines:
+        if not line.strip():
+            continue
+        # the last line of an analysis that did not finish may only be
+        # partially written and so the records before it are the results
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            break
+        record_type = record.pop(constants.stream.Record, None)
+        if record_type == constants.stream.Configuration_Record:
+            configuration = record[constants.stream.Configuration_Record]
+        elif record_type == constants.stream.Source_Record:
+            source_records.append(record)
+        elif record_type == constants.stream.Outcome_Record:
+            check_statuses = record[constants.stream.Outcome_Record]
+    # order the sources by check, and then by file in the order they were
+    # searched, like the results that are saved after the analysis finishes
+    source_records.sort(key=lambda record: record[constants.stream.Check_Index])
+    sources = []
+    for source_record in source_records:
+        check_index = str(source_record.pop(constants.stream.Check_Index))
+        # the outcomes are only missing when the analysis did not finish and
+        # then whether or not each check passed is not known; otherwise, only
+        # the checks that were reported, with their outcomes, have sources
+        if check_statuses is not None:
+            if check_index not in check_statuses:
+                continue
+            source_record["check"]["passed"] = check_statuses[check_index]
+        sources.append(source_record)
+    return {
+        constants.stream.Configuration_Record: configuration,
+        "sources": sources,
+    }
@@ -3,7 +3,9 @@
 import importlib.metadata
 import platform
 import sys
+from typing import Sequence, Union
 
+import numpy as np
 from urllib3.util import parse_url
 
 from chasten import constants
@@ -103,14 +105,17 @@ def is_url(url: str) -> bool:
     return str(parse_url(url)).lower() == url_reassembled.lower()
 
 
-def total_amount_passed(check_status_list: list[bool]) -> tuple[int, int, float]:
+def total_amount_passed(
+    check_status_list: Union[Sequence[bool], np.ndarray]
+) -> tuple[int, int, float]:
     """Calculate amount of checks passed in analyze"""
     # attempt calculations for percentage of checks passed
     try:
+        check_statuses = np.asarray(check_status_list, dtype=bool)
         # calculate total amount of checks in list
-        count_total = len(check_status_list)
+        count_total = int(check_statuses.size)
         # count total amount of checks counted as true
-        count_passed = check_status_list.count(True)
+        count_passed = int(np.count_nonzero(check_statuses))
         # return tuple of checks passed, total checks, percentage of checks passed
         return (
             count_passed,
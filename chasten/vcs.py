@@ -0,0 +1,71 @@
+"""Find the Python source code files that changed according to git."""
+
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Set
+
+from chasten import constants
+
+
+def run_git(directory: Path, arguments: List[str]) -> str:
+    """Run a git command in the directory and return its output."""
+    # note that a failing command raises a CalledProcessError and
+    # a missing git executable raises a FileNotFoundError
+    completed_process = subprocess.run(
+        [constants.vcs.Git, "-C", str(directory), *arguments],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return completed_process.stdout
+
+
+def split_null_terminated(git_output: str) -> List[str]:
+    """Split the null-terminated output of a git command into its records."""
+    return [record for record in git_output.split(constants.vcs.Null) if record]
+
+
+def find_repository_root(path: Path) -> Path:
+    """Find the root of the git repository that contains the path."""
+    directory = path if path.is_dir() else path.parent
+    return Path(run_git(directory, ["rev-parse", "--show-toplevel"]).strip())
+
+
+def get_blob_ids(repository_root: Path, ref: str) -> Dict[Path, str]:
+    """Get the object id of every file in the tree of the git ref."""
+    blob_ids: Dict[Path, str] = {}
+    # each record has the form "<mode> <type> <object id>\t<path>" and only
+    # the blobs are files; submodules, for instance, are commits instead
+    git_output = run_git(repository_root, ["ls-tree", "-r", "-z", "--full-tree", ref])
+    for record in split_null_terminated(git_output):
+        (metadata, file_name) = record.split(constants.vcs.Tab, 1)
+        (_, object_type, object_id) = metadata.split()
+        if object_type == constants.vcs.Blob:
+            blob_ids[repository_root / file_name] = object_id
+    return blob_ids
+
+
+def get_changed_paths(repository_root: Path, ref: str) -> Set[Path]:
+    """Get the files whose contents in the working tree differ from the git ref."""
+    # compare the ref to the working tree, which includes both the staged and
+    # the unstaged changes; turning off rename detection lists both names
+    git_output = run_git(
+        repository_root, ["diff", "--name-only", "--no-renames", "-z", ref, "--"]
+    )
+    return {
+        repository_root / file_name for file_name in split_null_terminated(git_output)
+    }
+
+
+def get_unchanged_content_ids(path: Path, ref: str) -> Dict[Path, str]:
+    """Get the object ids of the files that have not changed since the git ref."""
+    # the object id of a file that has not changed since the ref is the same as
+    # the identifier of its contents and thus it can be found without reading it
+    repository_root = find_repository_root(path.resolve())
+    blob_ids = get_blob_ids(repository_root, ref)
+    changed_paths = get_changed_paths(repository_root, ref)
+    return {
+        file_path: object_id
+        for file_path, object_id in blob_ids.items()
+        if file_path not in changed_paths
+    }
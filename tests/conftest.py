@@ -0,0 +1,89 @@
+"""Define the fixtures that are shared by the pytest test suites."""
+
+import time
+from typing import Callable
+
+import pytest
+
+from chasten import results
+
+# the number of times that each search is timed by a benchmark
+BENCHMARK_ROUNDS = 3
+
+PYTHON_SOURCE = """
+import os
+global first, second
+
+class Example:
+    def first(self, value):
+        if value:
+            if value > 1:
+                return os.sep
+        elif value is None:
+            return [item for item in value if item]
+        return -value
+
+    def _second(self, *values, **options):
+        for value in values:
+            if value:
+                print(value, sep=options.get("sep"))
+            for item in value:
+                pass
+            if not item:
+                break
+
+
+def test_example():
+    assert Example().first(1) == os.sep
+
+
+if __name__ == "__main__":
+    Example().first(1)
+"""
+
+SMALL_PYTHON_SOURCE = """
+class Example:
+    def first(self, value):
+        if value:
+            return value + 1
+        return -value
+"""
+
+
+@pytest.fixture
+def time_best_round() -> Callable[[Callable[[], None]], float]:
+    """Time the fastest of several rounds of a search, in seconds, for the benchmarks."""
+
+    def time_search(search: Callable[[], None]) -> float:
+        times = []
+        for _ in range(BENCHMARK_ROUNDS):
+            start = time.perf_counter()
+            search()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    return time_search
+
+
+@pytest.fixture
+def python_source() -> str:
+    """Define a test fixture with Python source code that has many types of nodes to search."""
+    return PYTHON_SOURCE
+
+
+@pytest.fixture
+def small_python_source() -> str:
+    """Define a test fixture with Python source code that has a few matches to search."""
+    return SMALL_PYTHON_SOURCE
+
+
+@pytest.fixture
+def create_check_template() -> Callable[..., results.Check]:
+    """Create the template of a check without any matches."""
+
+    def create_template(check_id: str, pattern: str = ".//If") -> results.Check:
+        return results.Check(
+            id=check_id, name=check_id.lower(), pattern=pattern, passed=True
+        )
+
+    return create_template
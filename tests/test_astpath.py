@@ -0,0 +1,178 @@
+"""Pytest test suite for the astpath module."""
+
+import logging
+from pathlib import Path
+
+import pytest
+import yaml
+from pyastgrep import files
+
+from chasten import astpath, engine, filesystem, histogram, patterns
+
+logger = logging.getLogger(__name__)
+
+CHASTEN_DIRECTORY = Path(__file__).parent.parent / ".chasten"
+
+
+def get_check_patterns():
+    """Get the patterns of the default checks and of the checks in the .chasten directory."""
+    check_patterns = set()
+    checks_contents = [filesystem.CHECKS_FILE_DEFAULT_CONTENTS]
+    checks_contents.extend(
+        checks_file.read_text() for checks_file in CHASTEN_DIRECTORY.glob("*.yml")
+    )
+    for contents in checks_contents:
+        checks = (yaml.safe_load(contents) or {}).get("checks", []) or []
+        check_patterns.update(check["pattern"] for check in checks)
+    return sorted(check_patterns)
+
+
+SUPPORTED_PATTERNS = [
+    ".",
+    ".//FunctionDef",
+    "//FunctionDef",
+    "/Module/body/FunctionDef",
+    ".//FunctionDef/body//If",
+    ".//FunctionDef/body//If[ancestor::If and not(parent::orelse)]",
+    './/FunctionDef[not(contains(@name, "test_"))]',
+    ".//FunctionDef[@name='first']",
+    ".//FunctionDef[not(body/Return)]",
+    ".//ClassDef[.//FunctionDef[starts-with(@name, '_')]]",
+    ".//arg[@arg != 'self']",
+    ".//*[@type='str']",
+    ".//*[contains(@id, 'e') and not(starts-with(@id, 'o'))]",
+    "//Call[func/Name/@id='print']",
+    ".//If[orelse/If or test/Compare]",
+    ".//If/following-sibling::*",
+    ".//If/preceding-sibling::For",
+    ".//Name/ancestor::*",
+    ".//Name/parent::*",
+    ".//Return/ancestor-or-self::FunctionDef",
+    ".//FunctionDef/descendant::If",
+    ".//For[.//For]",
+    ".//Global/names/item",
+    ".//ctx/*",
+    "//For[@type]",
+    "//FunctionDef/body/* | //ClassDef",
+    "//FunctionDef//If/following-sibling::If | //FunctionDef//For",
+]
+
+UNSUPPORTED_PATTERNS = [
+    "count(.//If)",
+    ".//Load/..",
+    ".//FunctionDef[1]",
+    ".//FunctionDef[count(body/*) > 2]",
+    ".//FunctionDef[concat(@name, 'x') = 'firstx']",
+    ".//FunctionDef[string-length(@name) > 5]",
+    ".//FunctionDef/@name",
+    "//(FunctionDef | ClassDef)",
+    ".//FunctionDef[@name = 'it''s']",
+    ".//FunctionDef[",
+]
+
+
+@pytest.mark.parametrize("pattern", UNSUPPORTED_PATTERNS)
+def test_compile_query_falls_back_for_unsupported_patterns(pattern):
+    """Confirm that the patterns outside of the supported subset are left to XPath."""
+    assert astpath.compile_query(pattern) is None
+
+
+def test_compile_query_supports_the_default_checks():
+    """Confirm that every one of the default checks is evaluated on the AST."""
+    default_checks = yaml.safe_load(filesystem.CHECKS_FILE_DEFAULT_CONTENTS)
+    for check in default_checks["checks"]:
+        assert astpath.compile_query(check["pattern"]) is not None
+
+
+@pytest.mark.parametrize("pattern", [".//ClassDef", "//If", ".//If/orelse/If"])
+def test_compile_query_supports_the_type_queries(pattern):
+    """Confirm that the patterns answered by a histogram are also evaluated on the AST."""
+    assert histogram.recognize_type_query(pattern) is not None
+    assert astpath.compile_query(pattern) is not None
+
+
+@pytest.mark.parametrize("xpath2", [True, False])
+@pytest.mark.parametrize(
+    "pattern",
+    sorted({*get_check_patterns(), *SUPPORTED_PATTERNS}),
+)
+def test_find_positions_matches_xpath(pattern, xpath2, python_source):
+    """Confirm that the supported patterns find the same positions, in the same order, as XPath."""
+    query = astpath.compile_query(pattern)
+    if query is None:
+        assert pattern not in SUPPORTED_PATTERNS
+        return
+    sources = [python_source.encode(), Path(histogram.__file__).read_bytes()]
+    for contents in sources:
+        (xml_root, element_positions) = engine.parse_python_source(
+            Path("example.py"), contents
+        )
+        expected = engine.query_xml_tree(xml_root, element_positions, pattern, xpath2)
+        # the AST of every file shares the nodes of contexts, like Load, and
+        # thus the file is parsed again right before evaluating the query
+        _, parsed_ast = files.parse_python_file(
+            contents, "example.py", auto_dedent=False
+        )
+        document = astpath.create_document(parsed_ast)
+        assert astpath.find_positions(query, document, xpath2) == expected
+
+
+@pytest.mark.parametrize("xpath2", [True, False])
+def test_find_positions_with_shared_prefixes_matches_separate_documents(
+    xpath2, python_source
+):
+    """Confirm that the patterns sharing the nodes of their prefixes find the same positions."""
+    _, parsed_ast = files.parse_python_file(
+        python_source.encode(), "example.py", auto_dedent=False
+    )
+    shared_document = astpath.create_document(parsed_ast)
+    for pattern in SUPPORTED_PATTERNS:
+        query = astpath.compile_query(pattern)
+        assert query is not None
+        assert astpath.find_positions(
+            query, shared_document, xpath2
+        ) == astpath.find_positions(query, astpath.create_document(parsed_ast), xpath2)
+    # the nodes of the step without its predicates are shared, as are the nodes
+    # of the prefixes of a path, like .//FunctionDef/body for .//FunctionDef/body//If
+    prefixes = {
+        astpath.compile_query(".//FunctionDef"),
+        astpath.compile_query(".//FunctionDef/body"),
+        astpath.compile_query(".//FunctionDef/body//If"),
+    }
+    assert prefixes <= set(shared_document.selections)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("xpath2", [True, False])
+def test_native_evaluation_is_faster_than_xpath_for_default_checks(
+    xpath2, time_best_round
+):
+    """Confirm that evaluating the default checks on the AST is faster than XPath."""
+    default_checks = yaml.safe_load(filesystem.CHECKS_FILE_DEFAULT_CONTENTS)
+    default_patterns = [check["pattern"] for check in default_checks["checks"]]
+    sources = [
+        (path, path.read_bytes())
+        for path in engine.get_python_files([Path(engine.__file__).parent])
+    ]
+
+    def search_with_xpath() -> None:
+        for path, contents in sources:
+            (xml_root, element_positions) = engine.parse_python_source(path, contents)
+            document = patterns.create_document(xml_root, xpath2)
+            for pattern in default_patterns:
+                engine.query_xml_tree(
+                    xml_root, element_positions, pattern, xpath2, document
+                )
+
+    def search_natively() -> None:
+        for path, contents in sources:
+            engine.evaluate_python_source(path, contents, default_patterns, xpath2)
+
+    xpath_time = time_best_round(search_with_xpath)
+    native_time = time_best_round(search_natively)
+    logger.info(
+        f"{len(default_patterns)} default checks, XPath {2.0 if xpath2 else 1.0}:"
+        f" XPath {xpath_time:.3f}s, native {native_time:.3f}s,"
+        f" speedup {xpath_time / native_time:.1f}x"
+    )
+    assert native_time < xpath_time
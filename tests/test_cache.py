@@ -0,0 +1,117 @@
+"""Pytest test suite for the cache module."""
+
+from pathlib import Path
+
+import pytest
+from pyastgrep import search as pyastgrepsearch
+
+from chasten import cache, engine
+
+
+@pytest.fixture
+def tree_cache(tmp_path):
+    """Define a test fixture for a tree cache in a temporary directory."""
+    with cache.TreeCache(tmp_path / "cache") as tree_cache:
+        yield tree_cache
+
+
+def test_create_content_id_matches_git_object_id():
+    """Confirm that the identifier of the contents is the same as the object id used by git."""
+    assert cache.create_content_id(b"") == "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391"
+    assert (
+        cache.create_content_id(b"hello\n")
+        == "ce013625030ba8dba906f756967f9e9ca394464a"
+    )
+
+
+def test_cached_tree_has_the_same_positions(tree_cache, small_python_source):
+    """Confirm that a tree read from the cache has the same elements and positions."""
+    contents = small_python_source.encode()
+    (xml_root, element_positions) = engine.parse_python_source(
+        Path("example.py"), contents
+    )
+    content_id = cache.create_content_id(contents)
+    assert tree_cache.get(content_id) is None
+    tree_cache.put(content_id, xml_root, element_positions)
+    cached_tree = tree_cache.get(content_id)
+    assert cached_tree is not None
+    assert cached_tree.parsed
+    for pattern in [".//FunctionDef", ".//If", ".//BinOp/op/*", ".//body"]:
+        assert engine.query_xml_tree(
+            cached_tree.xml_root, cached_tree.element_positions, pattern
+        ) == engine.query_xml_tree(xml_root, element_positions, pattern)
+
+
+def test_parse_failure_is_cached(tree_cache):
+    """Confirm that the failure to parse source code is cached."""
+    contents = b"def broken(:\n"
+    content_id = cache.create_content_id(contents)
+    with pytest.raises(SyntaxError):
+        engine.convert_python_source(Path("broken.py"), contents, tree_cache)
+    cached_tree = tree_cache.get(content_id)
+    assert cached_tree is not None
+    assert not cached_tree.parsed
+    with pytest.raises(SyntaxError):
+        engine.convert_python_source(Path("broken.py"), contents, tree_cache)
+
+
+def test_statistics_count_hits_and_misses(tmp_path, small_python_source):
+    """Confirm that the statistics of the cache persist across uses of the cache."""
+    contents = small_python_source.encode()
+    for _ in range(3):
+        with cache.TreeCache(tmp_path) as tree_cache:
+            engine.convert_python_source(Path("example.py"), contents, tree_cache)
+    with cache.TreeCache(tmp_path) as tree_cache:
+        statistics = tree_cache.statistics()
+        assert statistics.entries == 1
+        assert statistics.failures == 0
+        assert statistics.hits == 2  # noqa: PLR2004
+        assert statistics.misses == 1
+        tree_cache.clear()
+        statistics = tree_cache.statistics()
+        assert statistics.entries == 0
+        assert statistics.hit_rate == 0
+
+
+def test_evict_removes_least_recently_used_trees(tmp_path):
+    """Confirm that eviction keeps the most recently used trees within the maximum size."""
+    sources = [f"value_{index} = {index}\n".encode() for index in range(5)]
+    with cache.TreeCache(tmp_path) as tree_cache:
+        for contents in sources:
+            engine.convert_python_source(Path("example.py"), contents, tree_cache)
+    # use the first file again so that it becomes the most recently used
+    with cache.TreeCache(tmp_path) as tree_cache:
+        engine.convert_python_source(Path("example.py"), sources[0], tree_cache)
+    with cache.TreeCache(tmp_path) as tree_cache:
+        entry_size = tree_cache.statistics().size // len(sources)
+        evicted = tree_cache.evict(2 * entry_size)
+        assert evicted == 3  # noqa: PLR2004
+        assert tree_cache.get(cache.create_content_id(sources[0])) is not None
+        assert tree_cache.statistics().entries == 2  # noqa: PLR2004
+
+
+def test_match_cache_stores_positions_for_each_pattern(tmp_path, small_python_source):
+    """Confirm that the match cache returns the positions stored for each pattern."""
+    content_id = cache.create_content_id(small_python_source.encode())
+    positions = [pyastgrepsearch.Position(3, 4), pyastgrepsearch.Position(5, 8)]
+    with cache.MatchCache(tmp_path) as match_cache:
+        assert match_cache.get(content_id, [".//If", ".//Return"]) == [None, None]
+        match_cache.put(content_id, ".//If", [])
+        match_cache.put(content_id, ".//Return", positions)
+    with cache.MatchCache(tmp_path) as match_cache:
+        assert match_cache.get(content_id, [".//Return", ".//If", ".//For"]) == [
+            positions,
+            [],
+            None,
+        ]
+
+
+def test_match_cache_is_invalidated_by_xpath_version(tmp_path, small_python_source):
+    """Confirm that the matches found with one version of XPath are not reused for another."""
+    content_id = cache.create_content_id(small_python_source.encode())
+    with cache.MatchCache(tmp_path, xpath2=True) as match_cache:
+        match_cache.put(content_id, ".//If", [pyastgrepsearch.Position(3, 4)])
+    with cache.MatchCache(tmp_path, xpath2=False) as match_cache:
+        assert match_cache.get(content_id, [".//If"]) == [None]
+    with cache.MatchCache(tmp_path, xpath2=True) as match_cache:
+        assert match_cache.get(content_id, [".//If"]) != [None]
@@ -1,12 +1,17 @@
 """Pytest test suite for the checks module."""
 
 import hypothesis.strategies as st
+import numpy as np
 import pytest
 from hypothesis import HealthCheck, given, settings
 from hypothesis_jsonschema import from_schema
 
 from chasten.checks import (
+    are_checkable,
     check_match_count,
+    check_match_counts,
+    exceed_maxes,
+    exceeds_max,
     extract_description,
     extract_min_max,
     is_in_closed_interval,
@@ -147,3 +152,45 @@ def test_check_match_count(count, min, max):
     confirmation = check_match_count(count, min, max)
     if is_in_closed_interval(count, min, max):
         assert confirmation
+
+
+@given(
+    st.integers(min_value=0, max_value=50),
+    st.one_of(st.none(), st.integers(min_value=0, max_value=25)),
+    st.integers(min_value=0, max_value=25),
+)
+@pytest.mark.fuzz
+def test_exceeds_max_means_check_cannot_pass(count, max, more):
+    """Use Hypothesis to confirm that a count above the maximum fails no matter how many more matches."""
+    if exceeds_max(count, max):
+        assert not check_match_count(count + more, None, max)
+    else:
+        assert check_match_count(count, None, max)
+
+
+@given(
+    st.lists(
+        st.tuples(
+            st.integers(min_value=0, max_value=50),
+            st.one_of(st.none(), st.integers(min_value=0, max_value=25)),
+            st.one_of(st.none(), st.integers(min_value=0, max_value=25)),
+        )
+    )
+)
+@pytest.mark.fuzz
+def test_check_match_counts_matches_each_check(checks):
+    """Use Hypothesis to confirm that checking all of the counts at once matches checking each count."""
+    counts = np.array([count for count, _, _ in checks], dtype=np.int64)
+    min_values = [min_value for _, min_value, _ in checks]
+    max_values = [max_value for _, _, max_value in checks]
+    assert check_match_counts(counts, min_values, max_values).tolist() == [
+        check_match_count(count, min_value, max_value)
+        for count, min_value, max_value in checks
+    ]
+    assert exceed_maxes(counts, max_values).tolist() == [
+        exceeds_max(count, max_value) for count, _, max_value in checks
+    ]
+    assert are_checkable(min_values, max_values).tolist() == [
+        min_value is not None or max_value is not None
+        for _, min_value, max_value in checks
+    ]
@@ -1,8 +1,12 @@
 """Pytest test suite for the database module."""
 
 import os
+import sqlite3
+from typing import Any, Dict
 
-from chasten import database
+import pytest
+
+from chasten import constants, database
 
 
 def test_create_chasten_view():
@@ -14,3 +18,297 @@ def test_create_chasten_view():
     database.create_chasten_view(chasten_database_name)
     # remove the example variable made
     os.remove(".example_database")
+
+
+def create_results_dict(fileuuid: str) -> Dict[str, Any]:
+    """Create the dictionary of the results of an analysis with one match."""
+    return {
+        "configuration": {
+            "chastenversion": "0.0.0",
+            "projectname": "testing",
+            "configdirectory": "config",
+            "searchpath": "src",
+            "debuglevel": "ERROR",
+            "debugdestination": "CONSOLE",
+            "fileuuid": fileuuid,
+            "datetime": "2026-01-01 00:00:00.000000",
+        },
+        "sources": [
+            {
+                "filename": "src/example.py",
+                "check": {
+                    "id": "C001",
+                    "name": "count-functions",
+                    "description": "Count the functions",
+                    "min": 1,
+                    "max": None,
+                    "pattern": "//FunctionDef",
+                    "passed": True,
+                    "matches": [
+                        {
+                            "lineno": 1,
+                            "coloffset": 0,
+                            "linematch": "def example():",
+                            "linematch_context": "def example():\n    pass",
+                        }
+                    ],
+                },
+            }
+        ],
+    }
+
+
+def test_write_results_database_links_rows(tmp_path):
+    """Confirm that the rows of the results are linked to the analysis that they came from."""
+    database_path = tmp_path / "chasten.db"
+    (added_count, skipped_count) = database.write_results_database(
+        database_path, [create_results_dict("first"), create_results_dict("second")]
+    )
+    assert added_count == 2  # noqa: PLR2004
+    assert skipped_count == 0
+    connection = sqlite3.connect(database_path)
+    assert connection.execute("SELECT _link FROM main").fetchall() == [
+        ("first",),
+        ("second",),
+    ]
+    assert connection.execute(
+        "SELECT _link, _link_main, check_id, check_max, check_passed FROM sources"
+    ).fetchall() == [
+        ("first.sources.0", "first", "C001", None, "true"),
+        ("second.sources.0", "second", "C001", None, "true"),
+    ]
+    assert connection.execute(
+        "SELECT _link, _link_sources, lineno FROM sources_check_matches"
+    ).fetchall() == [
+        ("first.sources.0.check.matches.0", "first.sources.0", 1),
+        ("second.sources.0.check.matches.0", "second.sources.0", 1),
+    ]
+    # the view combines the tables and the full-text search finds the matches
+    view_rows = connection.execute(
+        f"SELECT * FROM {constants.chasten.Chasten_Database_View}"
+    ).fetchall()
+    assert len(view_rows) == 2  # noqa: PLR2004
+    search_rows = connection.execute(
+        "SELECT * FROM sources_check_matches_fts WHERE sources_check_matches_fts MATCH 'example'"
+    ).fetchall()
+    assert len(search_rows) == 2  # noqa: PLR2004
+    connection.close()
+
+
+def test_write_results_database_adds_to_existing_database(tmp_path):
+    """Confirm that writing into an existing database adds the results and updates its full-text search."""
+    database_path = tmp_path / "chasten.db"
+    database.write_results_database(database_path, [create_results_dict("first")])
+    database.write_results_database(database_path, [create_results_dict("second")])
+    connection = sqlite3.connect(database_path)
+    assert connection.execute("SELECT COUNT(*) FROM sources").fetchone() == (2,)
+    search_rows = connection.execute(
+        "SELECT * FROM sources_fts WHERE sources_fts MATCH 'functions'"
+    ).fetchall()
+    assert len(search_rows) == 2  # noqa: PLR2004
+    connection.close()
+
+
+def test_write_results_database_skips_recorded_results(tmp_path):
+    """Confirm that the results that are already in the database are not added again."""
+    database_path = tmp_path / "chasten.db"
+    database.write_results_database(database_path, [create_results_dict("first")])
+    (added_count, skipped_count) = database.write_results_database(
+        database_path,
+        [
+            create_results_dict("first"),
+            create_results_dict("second"),
+            create_results_dict("second"),
+        ],
+    )
+    assert (added_count, skipped_count) == (1, 2)
+    connection = sqlite3.connect(database_path)
+    assert connection.execute("SELECT COUNT(*) FROM main").fetchone() == (2,)
+    # the full-text search has each of the rows of its table once
+    assert connection.execute(
+        "SELECT COUNT(*) FROM sources_check_matches_fts"
+    ).fetchone() == (2,)
+    connection.execute(
+        "INSERT INTO sources_check_matches_fts(sources_check_matches_fts) VALUES('integrity-check')"
+    )
+    connection.close()
+
+
+def test_write_results_database_adds_missing_columns(tmp_path):
+    """Confirm that results are added to a database whose tables do not have all of the columns."""
+    database_path = tmp_path / "chasten.db"
+    connection = sqlite3.connect(database_path)
+    connection.execute(
+        "CREATE TABLE main (_link TEXT PRIMARY KEY, configuration_fileuuid TEXT)"
+    )
+    connection.execute("INSERT INTO main VALUES ('0', 'first')")
+    connection.commit()
+    connection.close()
+    (added_count, skipped_count) = database.write_results_database(
+        database_path, [create_results_dict("first"), create_results_dict("second")]
+    )
+    assert (added_count, skipped_count) == (1, 1)
+    connection = sqlite3.connect(database_path)
+    assert connection.execute(
+        "SELECT _link, configuration_projectname FROM main"
+    ).fetchall() == [("0", None), ("second", "testing")]
+    connection.close()
+
+
+def test_write_results_database_migrates_outcomes(tmp_path):
+    """Confirm that the outcomes of the checks that were written as 1 and 0 are migrated to text."""
+    database_path = tmp_path / "chasten.db"
+    database.write_results_database(
+        database_path, [create_results_dict("first")], materialize=True
+    )
+    # the outcomes of the checks were written as 1 and 0 by earlier versions
+    connection = sqlite3.connect(database_path)
+    for table_name in ("sources", constants.chasten.Chasten_Database_View):
+        connection.execute(f"UPDATE {table_name} SET check_passed = 1")
+    connection.commit()
+    connection.close()
+    database.write_results_database(database_path, [create_results_dict("second")])
+    connection = sqlite3.connect(database_path)
+    for table_name in ("sources", constants.chasten.Chasten_Database_View):
+        assert connection.execute(
+            f"SELECT DISTINCT typeof(check_passed), check_passed FROM {table_name}"
+        ).fetchall() == [("text", "true")]
+    connection.close()
+
+
+def test_write_results_database_creates_indexes(tmp_path):
+    """Confirm that the columns that link and filter the rows of the results are indexed."""
+    database_path = tmp_path / "chasten.db"
+    database.write_results_database(database_path, [create_results_dict("first")])
+    connection = sqlite3.connect(database_path)
+    index_names = {
+        row[0]
+        for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )
+    }
+    assert {
+        "idx_sources__link_main",
+        "idx_sources_check_matches__link_sources",
+        "idx_main_configuration_datetime",
+        "idx_sources_check_id",
+    } <= index_names
+    # the matches of a source are found through the index of their link
+    query_plan = connection.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM sources_check_matches WHERE _link_sources = ?",
+        ("first.sources.0",),
+    ).fetchall()
+    assert "idx_sources_check_matches__link_sources" in str(query_plan)
+    connection.close()
+
+
+def test_write_results_database_updates_materialized_view(tmp_path):
+    """Confirm that the table that materializes the view has the same rows as the view after results are added."""
+    database_path = tmp_path / "chasten.db"
+    database.write_results_database(
+        database_path, [create_results_dict("first")], materialize=True
+    )
+    assert database.is_materialized(database_path)
+    database.write_results_database(database_path, [create_results_dict("second")])
+    connection = sqlite3.connect(database_path)
+    table_rows = connection.execute(
+        f"SELECT * FROM {constants.chasten.Chasten_Database_View} ORDER BY datetime, projectname"
+    ).fetchall()
+    view_rows = connection.execute(database.CHASTEN_SQL_SELECT_QUERY).fetchall()
+    connection.close()
+    assert len(table_rows) == 2  # noqa: PLR2004
+    assert sorted(table_rows) == sorted(view_rows)
+    # refreshing the table creates all of its rows again
+    assert database.refresh_materialized_view(database_path) == 2  # noqa: PLR2004
+    assert database.is_materialized(database_path)
+
+
+def test_parse_search_columns():
+    """Confirm that the specified columns replace the default columns of only their tables."""
+    search_columns = database.parse_search_columns(
+        ["sources_check_matches.linematch", "sources_check_matches.linematch_context"]
+    )
+    assert search_columns["sources_check_matches"] == [
+        "linematch",
+        "linematch_context",
+    ]
+    assert search_columns["sources"] == database.FULL_TEXT_SEARCH_COLUMNS["sources"]
+    # the numbers of the lines and columns are not searched by default
+    assert "lineno" not in database.parse_search_columns([])["sources_check_matches"]
+    for column_name in ("matches.linematch", "sources.unknown", "sources"):
+        with pytest.raises(ValueError):
+            database.parse_search_columns([column_name])
+
+
+def test_write_results_database_defers_full_text_search(tmp_path):
+    """Confirm that the full-text search is only enabled after the results are added when it is deferred."""
+    database_path = tmp_path / "chasten.db"
+    database.write_results_database(
+        database_path, [create_results_dict("first")], defer_search=True
+    )
+    connection = sqlite3.connect(database_path)
+    assert (
+        connection.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name LIKE '%_fts'"
+        ).fetchone()[0]
+        == 0
+    )
+    database.enable_full_text_search(
+        str(database_path),
+        database.parse_search_columns(["sources_check_matches.linematch_context"]),
+    )
+    # the search of the matches only stores the index of the specified column
+    assert database.find_table_columns(connection, "sources_check_matches_fts") == [
+        "linematch_context"
+    ]
+    search_rows = connection.execute(
+        "SELECT * FROM sources_check_matches_fts WHERE sources_check_matches_fts MATCH 'pass'"
+    ).fetchall()
+    assert len(search_rows) == 1
+    connection.close()
+
+
+def test_write_results_database_rolls_up_results(tmp_path):
+    """Confirm that the counts of the matches of each analysis are rolled up as its results are added."""
+    database_path = tmp_path / "chasten.db"
+    database.write_results_database(database_path, [create_results_dict("first")])
+    failed_results = create_results_dict("second")
+    failed_results["sources"][0]["check"]["passed"] = False
+    failed_results["sources"][0]["check"]["matches"].append(
+        {"lineno": 5, "coloffset": 0, "linematch": "", "linematch_context": ""}
+    )
+    database.write_results_database(database_path, [failed_results])
+    connection = sqlite3.connect(database_path)
+    assert connection.execute(
+        "SELECT _link_main, check_id, check_passed, file_count, match_count FROM rollup_run_checks ORDER BY _link_main"
+    ).fetchall() == [("first", "C001", 1, 1, 1), ("second", "C001", 0, 1, 2)]
+    assert connection.execute(
+        "SELECT _link_main, check_count, passed_count, failed_count, match_count FROM rollup_runs ORDER BY _link_main"
+    ).fetchall() == [("first", 1, 1, 0, 1), ("second", 1, 0, 1, 2)]
+    rollup_rows = connection.execute("SELECT * FROM rollup_run_file_checks").fetchall()
+    connection.close()
+    # rolling up all of the results again creates the same rows
+    assert database.refresh_rollup_tables(database_path) == 2  # noqa: PLR2004
+    connection = sqlite3.connect(database_path)
+    assert (
+        connection.execute("SELECT * FROM rollup_run_file_checks").fetchall()
+        == rollup_rows
+    )
+    connection.close()
+
+
+def test_update_rollup_tables_rolls_up_existing_results(tmp_path):
+    """Confirm that the results in a database without the tables that roll them up are all rolled up."""
+    database_path = tmp_path / "chasten.db"
+    database.write_results_database(database_path, [create_results_dict("first")])
+    connection = sqlite3.connect(database_path)
+    for table_name in database.CHASTEN_ROLLUP_TABLES:
+        connection.execute(f"DROP TABLE {table_name}")
+    connection.commit()
+    connection.close()
+    database.write_results_database(database_path, [create_results_dict("second")])
+    connection = sqlite3.connect(database_path)
+    assert connection.execute(
+        "SELECT _link_main FROM rollup_runs ORDER BY _link_main"
+    ).fetchall() == [("first",), ("second",)]
+    connection.close()
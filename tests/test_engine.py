@@ -0,0 +1,269 @@
+"""Pytest test suite for the engine module."""
+
+from pathlib import Path
+
+import pytest
+from pyastgrep import search as pyastgrepsearch
+
+from chasten import cache, engine
+
+PYTHON_SOURCE_ONE = """
+class Example:
+    def test_first(self):
+        if True:
+            if False:
+                pass
+        return 1
+
+    def second(self):
+        return 2
+"""
+
+PYTHON_SOURCE_TWO = """
+def helper(value):
+    if value:
+        return value
+    else:
+        if value is None:
+            return 0
+    return -1
+"""
+
+PYTHON_SOURCE_INVALID = """
+def broken(:
+    pass
+"""
+
+PATTERNS = [
+    ".//ClassDef",
+    ".//FunctionDef",
+    './/FunctionDef[not(contains(@name, "test_"))]',
+    ".//FunctionDef/body//If",
+    ".//FunctionDef/body//If[ancestor::If and not(parent::orelse)]",
+    ".//body",
+    "count(.//If)",
+]
+
+
+@pytest.fixture
+def source_directory(tmp_path):
+    """Define a test fixture with a directory of Python source code files."""
+    (tmp_path / "one.py").write_text(PYTHON_SOURCE_ONE)
+    (tmp_path / "two.py").write_text(PYTHON_SOURCE_TWO)
+    (tmp_path / "invalid.py").write_text(PYTHON_SOURCE_INVALID)
+    (tmp_path / "notes.txt").write_text("not a Python source code file")
+    return tmp_path
+
+
+def search_with_pyastgrep(directory: Path, pattern: str, xpath2: bool):
+    """Search for a pattern with pyastgrep, one pattern at a time."""
+    return [
+        (str(match.path), match.position.lineno, match.position.col_offset)
+        for match in pyastgrepsearch.search_python_files(
+            paths=[directory], expression=pattern, xpath2=xpath2
+        )
+        if isinstance(match, pyastgrepsearch.Match)
+    ]
+
+
+def test_get_python_files_finds_only_python_files(source_directory):
+    """Confirm that walking the search path only finds the Python source code files."""
+    python_files = engine.get_python_files([source_directory])
+    assert sorted(path.name for path in python_files) == [
+        "invalid.py",
+        "one.py",
+        "two.py",
+    ]
+
+
+@pytest.mark.parametrize("xpath2", [True, False])
+def test_search_python_files_matches_pyastgrep(source_directory, xpath2):
+    """Confirm that parsing once for all patterns finds the same matches as pyastgrep."""
+    file_matches_list = list(
+        engine.search_python_files([source_directory], PATTERNS, xpath2)
+    )
+    for index, pattern in enumerate(PATTERNS):
+        found = [
+            (str(file_matches.path), position.lineno, position.col_offset)
+            for file_matches in file_matches_list
+            for position in file_matches.positions[index]
+        ]
+        assert found == search_with_pyastgrep(source_directory, pattern, xpath2)
+
+
+def test_search_python_file_invalid_source_has_no_matches(source_directory):
+    """Confirm that a file that cannot be parsed does not have any matches."""
+    file_matches = engine.search_python_file(source_directory / "invalid.py", PATTERNS)
+    assert file_matches.file_lines == []
+    assert all(positions == [] for positions in file_matches.positions)
+
+
+def test_search_python_files_with_workers_matches_serial_search(source_directory):
+    """Confirm that searching with a pool of worker processes finds the same matches in the same order."""
+    serial = list(engine.search_python_files([source_directory], PATTERNS))
+    parallel = list(engine.search_python_files([source_directory], PATTERNS, workers=2))
+    assert parallel == serial
+
+
+def test_search_python_file_chunk_returns_compact_records(source_directory):
+    """Confirm that a worker only returns the check index and the position of each match."""
+    file_records = engine.search_python_file_chunk(
+        [str(source_directory / "one.py"), str(source_directory / "invalid.py")],
+        PATTERNS,
+    )
+    assert [record.path for record in file_records] == [
+        str(source_directory / "one.py"),
+        str(source_directory / "invalid.py"),
+    ]
+    assert (0, 2, 0) in file_records[0].matches
+    assert file_records[1].matches == []
+
+
+def test_convert_file_record_unreadable_file_has_no_matches(source_directory):
+    """Confirm that a file that cannot be read after a worker searched it does not have any matches."""
+    (file_record,) = engine.search_python_file_chunk(
+        [str(source_directory / "one.py")], PATTERNS
+    )
+    (source_directory / "one.py").unlink()
+    file_matches = engine.convert_file_record(file_record, len(PATTERNS))
+    assert file_matches.file_lines == []
+    assert all(positions == [] for positions in file_matches.positions)
+
+
+@pytest.mark.parametrize("path_count,workers", [(1, 2), (10, 2), (1000, 3)])
+def test_create_chunks_covers_all_paths_in_order(path_count, workers):
+    """Confirm that the chunks contain all of the paths in their original order."""
+    paths = [Path(f"file_{index}.py") for index in range(path_count)]
+    chunks = engine.create_chunks(paths, workers)
+    assert [path for chunk in chunks for path in chunk] == [str(p) for p in paths]
+    assert len(chunks) >= min(path_count, workers)
+
+
+def test_search_python_files_with_cache_matches_uncached_search(
+    source_directory, tmp_path
+):
+    """Confirm that the trees from the cache produce the same matches as parsing the files."""
+    cache_directory = tmp_path / "cache"
+    uncached = list(engine.search_python_files([source_directory], PATTERNS))
+    for _ in range(2):
+        cached = list(
+            engine.search_python_files(
+                [source_directory], PATTERNS, cache_directory=cache_directory
+            )
+        )
+        assert cached == uncached
+
+
+def test_search_python_files_with_match_cache_only_evaluates_changed_patterns(
+    source_directory, tmp_path
+):
+    """Confirm that only the patterns without cached matches are evaluated again."""
+    match_cache_directory = tmp_path / "matches"
+    changed_patterns = [*PATTERNS[:-1], ".//Return"]
+    for patterns in (PATTERNS, PATTERNS, changed_patterns):
+        uncached = list(engine.search_python_files([source_directory], patterns))
+        cached = list(
+            engine.search_python_files(
+                [source_directory],
+                patterns,
+                match_cache_directory=match_cache_directory,
+            )
+        )
+        assert cached == uncached
+    # the first search evaluated all of the patterns on each of the three files
+    # and the last search only needed to evaluate the pattern that changed
+    with cache.MatchCache(match_cache_directory) as match_cache:
+        statistics = match_cache.statistics()
+        assert statistics.misses == len(PATTERNS) * 3 + 3
+        assert statistics.hits == len(PATTERNS) * 3 + (len(PATTERNS) - 1) * 3
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_search_python_files_stops_evaluating_expressions_above_maximum(
+    tmp_path, workers
+):
+    """Confirm that an expression is not evaluated on more files once its count exceeds its maximum."""
+    for index in range(6):
+        (tmp_path / f"file_{index}.py").write_text("def first():\n    pass\n")
+    expressions = [".//FunctionDef", ".//Pass"]
+    file_matches_list = list(
+        engine.search_python_files(
+            [tmp_path], expressions, workers=workers, maximum_counts=[1, None]
+        )
+    )
+    function_counts = [len(fm.positions[0]) for fm in file_matches_list]
+    pass_counts = [len(fm.positions[1]) for fm in file_matches_list]
+    # the expression without a maximum is evaluated on every one of the files
+    assert pass_counts == [1] * 6
+    # the expression with a maximum of one stops after it reaches two matches
+    assert function_counts[:2] == [1, 1]
+    assert sum(function_counts) < len(file_matches_list)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_search_python_files_without_reading_lines_has_same_positions(
+    source_directory, workers
+):
+    """Confirm that only counting the matches finds the same positions without reading any lines."""
+    with_lines = list(
+        engine.search_python_files([source_directory], PATTERNS, workers=workers)
+    )
+    without_lines = list(
+        engine.search_python_files(
+            [source_directory], PATTERNS, workers=workers, read_lines=False
+        )
+    )
+    assert [fm.positions for fm in without_lines] == [fm.positions for fm in with_lines]
+    assert all(fm.file_lines == [] for fm in without_lines)
+    assert any(fm.file_lines != [] for fm in with_lines)
+
+
+@pytest.mark.parametrize("xpath2", [True, False])
+def test_search_python_files_with_only_type_patterns_matches_pyastgrep(
+    source_directory, xpath2
+):
+    """Confirm that answering every pattern from the histogram finds the same matches as pyastgrep."""
+    type_patterns = [".//ClassDef", "//If", ".//FunctionDef/body/If", ".//body"]
+    file_matches_list = list(
+        engine.search_python_files([source_directory], type_patterns, xpath2)
+    )
+    for index, pattern in enumerate(type_patterns):
+        found = [
+            (str(file_matches.path), position.lineno, position.col_offset)
+            for file_matches in file_matches_list
+            for position in file_matches.positions[index]
+        ]
+        assert found == search_with_pyastgrep(source_directory, pattern, xpath2)
+
+
+@pytest.mark.parametrize("xpath2", [True, False])
+def test_search_python_files_with_only_native_patterns_matches_pyastgrep(
+    source_directory, xpath2
+):
+    """Confirm that evaluating every pattern on the AST finds the same matches as pyastgrep."""
+    native_patterns = [
+        pattern for pattern in PATTERNS if not pattern.startswith("count")
+    ]
+    file_matches_list = list(
+        engine.search_python_files([source_directory], native_patterns, xpath2)
+    )
+    for index, pattern in enumerate(native_patterns):
+        found = [
+            (str(file_matches.path), position.lineno, position.col_offset)
+            for file_matches in file_matches_list
+            for position in file_matches.positions[index]
+        ]
+        assert found == search_with_pyastgrep(source_directory, pattern, xpath2)
+
+
+def test_search_python_files_with_duplicate_patterns_matches_each_pattern(
+    source_directory,
+):
+    """Confirm that a pattern in several checks gives each of them the same matches."""
+    duplicate_patterns = [*PATTERNS, *PATTERNS]
+    duplicate_matches = list(
+        engine.search_python_files([source_directory], duplicate_patterns)
+    )
+    matches = list(engine.search_python_files([source_directory], PATTERNS))
+    for file_matches, duplicate_file_matches in zip(matches, duplicate_matches):
+        assert duplicate_file_matches.positions == file_matches.positions * 2
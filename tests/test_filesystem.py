@@ -242,3 +242,11 @@ def test_create_checks_configuration_file(mock_user_config_dir, tmp_path):
     assert main_configuation_file.exists()
     # confirm that the configuration file has correct text
     assert main_configuation_file.read_text() == filesystem.CHECKS_FILE_DEFAULT_CONTENTS
+
+
+def test_is_results_file():
+    """Confirm that only the files with the extensions of saved results are results files."""
+    assert filesystem.is_results_file(Path("chasten-results-testing.json"))
+    assert filesystem.is_results_file(Path("chasten-results-testing.ndjson"))
+    assert not filesystem.is_results_file(Path("chasten-results-testing.npz"))
+    assert not filesystem.is_results_file(Path("results"))
@@ -0,0 +1,112 @@
+"""Pytest test suite for the histogram module."""
+
+import logging
+from pathlib import Path
+
+import pytest
+import yaml
+from pyastgrep import files
+
+from chasten import engine, filesystem, histogram, patterns
+
+logger = logging.getLogger(__name__)
+
+TYPE_PATTERNS = [
+    ".//ClassDef",
+    "//FunctionDef",
+    ".//If",
+    "//If",
+    ".//Name",
+    ".//Load",
+    ".//arguments",
+    ".//comprehension",
+    ".//keyword",
+    ".//Module",
+    ".//body",
+    ".//FunctionDef/body/If",
+    ".//If/orelse/If",
+    ".//If/body/If",
+    ".//Call/args/Name",
+    ".//Module/body/ClassDef",
+]
+
+
+@pytest.mark.parametrize(
+    "pattern,type_query",
+    [
+        (".//ClassDef", histogram.TypeQuery("ClassDef")),
+        ("//ClassDef", histogram.TypeQuery("ClassDef", absolute=True)),
+        (" .//If ", histogram.TypeQuery("If")),
+        (".//FunctionDef/body/If", histogram.TypeQuery("If", "FunctionDef", "body")),
+        (".//FunctionDef/body//If", None),
+        ("//FunctionDef/body/If", None),
+        ('.//FunctionDef[not(contains(@name, "test_"))]', None),
+        (".//*", None),
+        ("count(.//If)", None),
+    ],
+)
+def test_recognize_type_query(pattern, type_query):
+    """Confirm that only the patterns looking for types of AST nodes are recognized."""
+    assert histogram.recognize_type_query(pattern) == type_query
+
+
+@pytest.mark.parametrize("xpath2", [True, False])
+def test_histogram_matches_xpath(xpath2, python_source):
+    """Confirm that both histograms find the same positions, in the same order, as XPath."""
+    contents = python_source.encode()
+    (xml_root, element_positions) = engine.parse_python_source(
+        Path("example.py"), contents
+    )
+    _, parsed_ast = files.parse_python_file(contents, "example.py", auto_dedent=False)
+    node_histogram = histogram.create_histogram(parsed_ast, xpath2)
+    xml_histogram = histogram.create_histogram_from_xml(
+        xml_root, element_positions, xpath2
+    )
+    for pattern in TYPE_PATTERNS:
+        type_query = histogram.recognize_type_query(pattern)
+        assert type_query is not None
+        positions = engine.query_xml_tree(xml_root, element_positions, pattern, xpath2)
+        assert node_histogram.positions(type_query) == positions
+        assert xml_histogram.positions(type_query) == positions
+        assert node_histogram.count(type_query) == len(positions)
+
+
+@pytest.mark.benchmark
+def test_histogram_is_faster_than_xpath_for_default_checks(time_best_round):
+    """Confirm that the histogram answers the recognized default checks faster than XPath."""
+    # use the default checks that only look for types of AST nodes and search
+    # the source code of chasten itself, timing the best of several rounds
+    default_checks = yaml.safe_load(filesystem.CHECKS_FILE_DEFAULT_CONTENTS)
+    default_patterns = [check["pattern"] for check in default_checks["checks"]]
+    type_patterns = [
+        pattern
+        for pattern in default_patterns
+        if histogram.recognize_type_query(pattern) is not None
+    ]
+    assert len(type_patterns) > 0
+    sources = [
+        (path, path.read_bytes())
+        for path in engine.get_python_files([Path(engine.__file__).parent])
+    ]
+
+    def search_with_xpath() -> None:
+        for path, contents in sources:
+            (xml_root, element_positions) = engine.parse_python_source(path, contents)
+            document = patterns.create_document(xml_root)
+            for pattern in type_patterns:
+                engine.query_xml_tree(
+                    xml_root, element_positions, pattern, document=document
+                )
+
+    def search_with_histogram() -> None:
+        for path, contents in sources:
+            engine.evaluate_python_source(path, contents, type_patterns)
+
+    xpath_time = time_best_round(search_with_xpath)
+    histogram_time = time_best_round(search_with_histogram)
+    logger.info(
+        f"{len(type_patterns)} of {len(default_patterns)} default checks:"
+        f" XPath {xpath_time:.3f}s, histogram {histogram_time:.3f}s,"
+        f" speedup {xpath_time / histogram_time:.1f}x"
+    )
+    assert histogram_time < xpath_time
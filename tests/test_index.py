@@ -0,0 +1,172 @@
+"""Pytest test suite for the index module."""
+
+import os
+
+import pytest
+
+from chasten import engine, index
+
+PYTHON_SOURCES = {
+    "example.py": """
+import os
+
+class Example:
+    def first(self, value):
+        if value:
+            return os.sep
+        return eval(value)
+
+    def test_second(self):
+        assert self.first(1) == os.sep
+""",
+    "other.py": """
+def helper(values):
+    for value in values:
+        print(value)
+""",
+    "broken.py": "def broken(:\n",
+}
+
+PATTERNS = [
+    ".//ClassDef",
+    ".//For",
+    './/FunctionDef[contains(@name, "test_")]',
+    './/FunctionDef[contains(@name, "Test")]',
+    './/Call/func/Name[@id="eval"]',
+    './/Call/func/Name[@id="print"]',
+    ".//Name[@id='os' or @id='sys']",
+    "/Module/body/FunctionDef",
+    ".//FunctionDef/args/arguments",
+    "count(.//Lambda)",
+]
+
+
+@pytest.fixture
+def python_files(tmp_path):
+    """Define a test fixture for the Python source files in a temporary directory."""
+    source_directory = tmp_path / "source"
+    source_directory.mkdir()
+    for file_name, python_source in PYTHON_SOURCES.items():
+        (source_directory / file_name).write_text(python_source)
+    return engine.get_python_files([source_directory])
+
+
+@pytest.fixture
+def repository_index(tmp_path):
+    """Define a test fixture for an index in a temporary directory."""
+    with index.RepositoryIndex(tmp_path / "index") as repository_index:
+        yield repository_index
+
+
+@pytest.mark.parametrize(
+    "name,indexed",
+    [("FunctionDef", True), ("keyword", True), ("Module", False), ("arg", False)],
+)
+def test_is_indexed_node_type(name, indexed):
+    """Confirm that only the types of the nodes that are not also the names of fields are indexed."""
+    assert index.is_indexed_node_type(name) == indexed
+
+
+def test_update_only_parses_new_and_changed_files(python_files, repository_index):
+    """Confirm that an update skips the files that did not change since they were indexed."""
+    assert repository_index.update(python_files) == index.IndexUpdate(3, 0, 3)
+    assert repository_index.update(python_files) == index.IndexUpdate(0, 0, 0)
+    # a file that changed is parsed again, unless another file has its contents
+    changed_file = python_files[0]
+    changed_file.write_text(PYTHON_SOURCES["other.py"])
+    os.utime(changed_file, ns=(0, 0))
+    assert repository_index.update(python_files).changed == 1
+    statistics = repository_index.statistics()
+    assert statistics.files == len(python_files)
+    assert statistics.failures == 1
+
+
+def test_find_candidate_expressions_matches_search(python_files, repository_index):
+    """Confirm that each of the files can only match the candidate expressions."""
+    repository_index.update(python_files)
+    candidate_expressions = repository_index.find_candidate_expressions(
+        python_files, PATTERNS
+    )
+    for file_matches in engine.search_python_files(python_files, PATTERNS):
+        candidates = candidate_expressions[file_matches.path.resolve()]
+        for pattern_index, positions in enumerate(file_matches.positions):
+            if len(positions) > 0:
+                assert pattern_index in candidates
+    assert {
+        file_path.name: sorted(PATTERNS[pattern_index] for pattern_index in candidates)
+        for file_path, candidates in candidate_expressions.items()
+    } == {
+        "broken.py": ["count(.//Lambda)"],
+        "example.py": sorted(
+            [
+                ".//ClassDef",
+                './/FunctionDef[contains(@name, "test_")]',
+                './/Call/func/Name[@id="eval"]',
+                ".//Name[@id='os' or @id='sys']",
+                "/Module/body/FunctionDef",
+                ".//FunctionDef/args/arguments",
+                "count(.//Lambda)",
+            ]
+        ),
+        "other.py": sorted(
+            [
+                ".//For",
+                './/Call/func/Name[@id="print"]',
+                ".//Name[@id='os' or @id='sys']",
+                "/Module/body/FunctionDef",
+                ".//FunctionDef/args/arguments",
+                "count(.//Lambda)",
+            ]
+        ),
+    }
+
+
+def test_search_with_candidate_expressions_matches_search(
+    python_files, repository_index
+):
+    """Confirm that only searching each file with its candidate expressions finds the same matches."""
+    repository_index.update(python_files)
+    candidate_expressions = repository_index.find_candidate_expressions(
+        python_files, PATTERNS
+    )
+    expected = list(engine.search_python_files(python_files, PATTERNS))
+    for workers in (1, 2):
+        assert (
+            list(
+                engine.search_python_files(
+                    python_files,
+                    PATTERNS,
+                    workers=workers,
+                    candidate_expressions=candidate_expressions,
+                )
+            )
+            == expected
+        )
+
+
+@pytest.mark.parametrize("pattern", [".//FunctionDef", "//Name", ".//Load", ".//body"])
+def test_count_nodes_matches_search(python_files, repository_index, pattern):
+    """Confirm that the index counts as many nodes of a type as a pattern matches."""
+    repository_index.update(python_files)
+    node_type = index.find_counted_node_type(pattern)
+    assert node_type is not None
+    assert repository_index.count_nodes(python_files, node_type) == [
+        len(file_matches.positions[0])
+        for file_matches in engine.search_python_files(python_files, [pattern])
+    ]
+
+
+def test_count_nodes_requires_every_file(python_files, repository_index):
+    """Confirm that the nodes are not counted when one of the files is not indexed."""
+    repository_index.update(python_files[1:])
+    assert repository_index.count_nodes(python_files, "FunctionDef") is None
+
+
+def test_prune_and_clear_remove_files(python_files, repository_index):
+    """Confirm that the files that are no longer searched, or all files, are removed."""
+    repository_index.update(python_files)
+    assert repository_index.prune(python_files[1:]) == 1
+    assert repository_index.statistics().files == len(python_files) - 1
+    repository_index.clear()
+    statistics = repository_index.statistics()
+    assert (statistics.files, statistics.contents, statistics.terms) == (0, 0, 0)
@@ -1,6 +1,11 @@
 """Pytest test suite for the main module."""
 
+import json
 import os
+import re
+import shutil
+import sqlite3
+import subprocess
 from pathlib import Path
 from unittest.mock import patch
 
@@ -8,7 +13,7 @@ import pytest
 from hypothesis import HealthCheck, given, settings, strategies
 from typer.testing import CliRunner
 
-from chasten import main
+from chasten import database, filesystem, main, matrix
 
 runner = CliRunner()
 
@@ -532,3 +537,602 @@ def test_analyze_store_results_valid_path(directory, cwd):
         ],
     )
     assert result.exit_code == 0
+
+
+def test_cli_analyze_with_workers_matches_serial_output(cwd):
+    """Confirm that analyzing with several worker processes produces the same output as a serial analysis."""
+    project_name = "testing"
+    configuration_directory = str(cwd) + "/.chasten"
+    search_path = Path(cwd) / "chasten"
+    arguments = [
+        "analyze",
+        project_name,
+        "--search-path",
+        search_path,
+        "--config",
+        configuration_directory,
+    ]
+    serial_result = runner.invoke(main.cli, arguments)
+    parallel_result = runner.invoke(main.cli, [*arguments, "--workers", "2"])
+    assert parallel_result.exit_code == serial_result.exit_code
+    assert parallel_result.output.split("Elapsed Time")[0] == (
+        serial_result.output.split("Elapsed Time")[0]
+    )
+
+
+def test_cli_analyze_counting_matches_reports_same_counts_as_saving(cwd, tmpdir):
+    """Confirm that only counting the matches reports the same results as saving their details."""
+    arguments = [
+        "analyze",
+        "testing",
+        "--search-path",
+        Path(cwd) / "chasten",
+        "--config",
+        str(cwd) + "/.chasten",
+    ]
+    count_result = runner.invoke(main.cli, arguments)
+    save_result = runner.invoke(
+        main.cli,
+        [*arguments, "--save-directory", Path(tmpdir), "--save", "--save-matrix"],
+    )
+    assert count_result.exit_code == save_result.exit_code
+    # the saved results also include the name of the file after the summary
+    assert count_result.output.split("checks passed")[0] == (
+        save_result.output.split("checks passed")[0]
+    )
+    # the saved matrix has the number of matches of each check in each file
+    (matrix_path,) = Path(tmpdir).glob("*.npz")
+    count_matrix = matrix.read_count_matrix(matrix_path)
+    assert count_matrix.totals().tolist() == [
+        int(total)
+        for total in re.findall(r"= (\d+) total matches", count_result.output)
+    ]
+
+
+@pytest.mark.parametrize("results_format", ["ndjson", "json-v2"])
+def test_cli_analyze_other_formats_match_saved_results(cwd, tmpdir, results_format):
+    """Confirm that the results streamed as NDJSON records, or normalized, are the same as the saved JSON results."""
+    arguments = [
+        "analyze",
+        "testing",
+        "--search-path",
+        Path(cwd) / "chasten",
+        "--config",
+        str(cwd) + "/.chasten",
+        "--save",
+    ]
+    json_directory = Path(tmpdir) / "json"
+    other_directory = Path(tmpdir) / "other"
+    json_directory.mkdir()
+    other_directory.mkdir()
+    json_result = runner.invoke(
+        main.cli, [*arguments, "--save-directory", json_directory]
+    )
+    other_result = runner.invoke(
+        main.cli,
+        [*arguments, "--save-directory", other_directory, "--format", results_format],
+    )
+    assert other_result.exit_code == json_result.exit_code
+    (json_path,) = json_directory.glob("*.json")
+    (other_path,) = other_directory.iterdir()
+    assert other_path.name in other_result.output
+    # the records of the stream, or the normalized results, are
+    # combined into the same results that integrate reads
+    (json_results, other_results) = filesystem.get_json_results([json_path, other_path])
+    for current_results in (json_results, other_results):
+        del current_results["configuration"]["fileuuid"]
+        del current_results["configuration"]["datetime"]
+    assert other_results == json_results
+    # the normalized results are smaller than the results that are not
+    if results_format == "json-v2":
+        assert other_path.stat().st_size < json_path.stat().st_size
+
+
+def test_cli_analyze_save_db_matches_integrate(cwd, tmpdir):
+    """Confirm that the database saved by analyze has the same rows as the database that integrate writes."""
+    database_path = Path(tmpdir) / "databases" / "chasten.db"
+    result = runner.invoke(
+        main.cli,
+        [
+            "analyze",
+            "testing",
+            "--search-path",
+            Path(cwd) / "chasten",
+            "--config",
+            str(cwd) + "/.chasten",
+            "--save-directory",
+            Path(tmpdir),
+            "--save",
+            "--save-db",
+            str(database_path),
+        ],
+    )
+    assert result.exit_code == 0
+    assert "Saved the database" in result.output
+    (json_path,) = Path(tmpdir).glob("*.json")
+    result = runner.invoke(
+        main.cli,
+        ["integrate", "testing", str(json_path), "--save-directory", str(tmpdir)],
+    )
+    assert result.exit_code == 0
+    (integrated_path,) = Path(tmpdir).glob("chasten-flattened-*/chasten.db")
+    # both of the databases have the rows of the same analysis
+    for table_name in ("main", "sources", "sources_check_matches"):
+        rows = []
+        for current_path in (database_path, integrated_path):
+            connection = sqlite3.connect(current_path)
+            rows.append(
+                connection.execute(
+                    f"SELECT * FROM {table_name} ORDER BY _link"
+                ).fetchall()
+            )
+            connection.close()
+        assert len(rows[0]) > 0
+        assert rows[0] == rows[1]
+    # the matrix of the counts is only saved when it is requested
+    assert list(Path(tmpdir).glob("*.npz")) == []
+    # integrating into the database that already has the results adds nothing
+    result = runner.invoke(
+        main.cli,
+        ["integrate", "testing", str(json_path), "--into", str(database_path)],
+    )
+    assert result.exit_code == 0
+    assert "Added 0 result file(s)" in result.output
+    connection = sqlite3.connect(database_path)
+    assert connection.execute("SELECT COUNT(*) FROM main").fetchone() == (1,)
+    connection.close()
+
+
+def test_cli_db_refresh_and_index(cwd, tmpdir):
+    """Confirm that a database can be refreshed, materializing its view, and indexed for full-text search."""
+    database_path = Path(tmpdir) / "chasten.db"
+    result = runner.invoke(
+        main.cli,
+        [
+            "analyze",
+            "testing",
+            "--search-path",
+            Path(cwd) / "chasten" / "checks.py",
+            "--config",
+            str(cwd) + "/.chasten",
+            "--save-db",
+            str(database_path),
+        ],
+    )
+    assert "Saved the database" in result.output
+    assert not database.is_materialized(database_path)
+    result = runner.invoke(main.cli, ["db", "refresh", str(database_path)])
+    assert result.exit_code == 0
+    assert "Refreshed the table" in result.output
+    assert "Refreshed the rollup tables with 1 analyses" in result.output
+    assert database.is_materialized(database_path)
+    # the full-text search can only use the columns of the tables
+    result = runner.invoke(
+        main.cli,
+        ["db", "index", str(database_path), "--search-column", "sources.unknown"],
+    )
+    assert result.exit_code == 1
+    result = runner.invoke(
+        main.cli,
+        ["db", "index", str(database_path), "--search-column", "sources.filename"],
+    )
+    assert result.exit_code == 0
+    assert "Enabled full-text search" in result.output
+
+
+def test_cli_integrate_into_flattened_database_keeps_outcomes(cwd, tmpdir):
+    """Confirm that adding results to a database created by flatterer writes the outcomes of the checks in the same way."""
+    arguments = [
+        "analyze",
+        "testing",
+        "--search-path",
+        Path(cwd) / "chasten" / "checks.py",
+        "--config",
+        str(cwd) + "/.chasten",
+        "--save",
+    ]
+    results_directory = Path(tmpdir) / "results"
+    results_directory.mkdir()
+    runner.invoke(main.cli, [*arguments, "--save-directory", results_directory])
+    (results_path,) = results_directory.glob("*.json")
+    # the results of another analysis have their own unique identifier
+    other_results = json.loads(results_path.read_text("utf-8"))
+    other_results["configuration"]["fileuuid"] = "other"
+    other_results_path = results_directory / "other.json"
+    other_results_path.write_text(json.dumps(other_results), "utf-8")
+    json_paths = [str(results_path), str(other_results_path)]
+    result = runner.invoke(
+        main.cli,
+        [
+            "integrate",
+            "testing",
+            json_paths[0],
+            "--save-directory",
+            str(tmpdir),
+            "--csv",
+        ],
+    )
+    assert result.exit_code == 0
+    (database_path,) = Path(tmpdir).glob("chasten-flattened-*/chasten.db")
+    result = runner.invoke(
+        main.cli,
+        ["integrate", "testing", json_paths[1], "--into", str(database_path)],
+    )
+    assert result.exit_code == 0
+    assert "Added 1 result file(s)" in result.output
+    # the outcomes of both of the results are the text that flatterer writes
+    connection = sqlite3.connect(database_path)
+    outcomes = connection.execute(
+        "SELECT DISTINCT _link_main = '0', typeof(check_passed), check_passed FROM sources"
+    ).fetchall()
+    connection.close()
+    assert {outcome[0] for outcome in outcomes} == {0, 1}
+    assert {outcome[1:] for outcome in outcomes} <= {
+        ("text", "true"),
+        ("text", "false"),
+    }
+
+
+def test_cli_integrate_outcomes_match_flattened_database(cwd, tmpdir):
+    """Confirm that the database written by chasten has the same outcomes of the checks as the one written by flatterer."""
+    arguments = [
+        "analyze",
+        "testing",
+        "--search-path",
+        Path(cwd) / "chasten",
+        "--config",
+        str(cwd) + "/.chasten",
+        "--save",
+    ]
+    results_directory = Path(tmpdir) / "results"
+    results_directory.mkdir()
+    runner.invoke(main.cli, [*arguments, "--save-directory", results_directory])
+    (results_path,) = results_directory.glob("*.json")
+    outcomes = []
+    for csv_option in ("--no-csv", "--csv"):
+        save_directory = Path(tmpdir) / csv_option.strip("-")
+        save_directory.mkdir()
+        result = runner.invoke(
+            main.cli,
+            [
+                "integrate",
+                "testing",
+                str(results_path),
+                "--save-directory",
+                str(save_directory),
+                csv_option,
+            ],
+        )
+        assert result.exit_code == 0
+        (database_path,) = save_directory.glob("chasten-flattened-*/chasten.db")
+        connection = sqlite3.connect(database_path)
+        outcomes.append(
+            connection.execute(
+                "SELECT filename, check_id, typeof(check_passed), check_passed "
+                "FROM sources ORDER BY filename, check_id"
+            ).fetchall()
+        )
+        connection.close()
+    assert len(outcomes[0]) > 0
+    assert outcomes[0] == outcomes[1]
+    assert {outcome[2:] for outcome in outcomes[0]} <= {
+        ("text", "true"),
+        ("text", "false"),
+    }
+
+
+def test_cli_integrate_flattened_database_rolls_up_results(cwd, tmpdir):
+    """Confirm that the database created by integrate with flatterer rolls up the results."""
+    arguments = [
+        "analyze",
+        "testing",
+        "--search-path",
+        Path(cwd) / "chasten" / "checks.py",
+        "--config",
+        str(cwd) + "/.chasten",
+        "--save",
+    ]
+    results_directory = Path(tmpdir) / "results"
+    results_directory.mkdir()
+    runner.invoke(main.cli, [*arguments, "--save-directory", results_directory])
+    (results_path,) = results_directory.glob("*.json")
+    result = runner.invoke(
+        main.cli,
+        [
+            "integrate",
+            "testing",
+            str(results_path),
+            "--save-directory",
+            str(tmpdir),
+            "--csv",
+        ],
+    )
+    assert result.exit_code == 0
+    (database_path,) = Path(tmpdir).glob("chasten-flattened-*/chasten.db")
+    # each of the tables that roll up the results has rows
+    connection = sqlite3.connect(database_path)
+    for table_name in database.CHASTEN_ROLLUP_TABLES:
+        row_count = connection.execute(
+            f"SELECT COUNT(*) FROM [{table_name}]"
+        ).fetchone()[0]
+        assert row_count > 0
+    run_count = connection.execute("SELECT COUNT(*) FROM rollup_runs").fetchone()[0]
+    connection.close()
+    assert run_count == 1
+
+
+def test_cli_integrate_skips_files_that_are_not_results(tmpdir):
+    """Confirm that integrate skips the files that are not results instead of crashing."""
+    matrix_path = Path(tmpdir) / "chasten-results-testing.npz"
+    matrix_path.write_bytes(b"\xb1\x00")
+    result = runner.invoke(
+        main.cli,
+        ["integrate", "testing", str(matrix_path), "--save-directory", str(tmpdir)],
+    )
+    assert result.exit_code == 1
+    assert "Skipping the file(s) that are not JSON or NDJSON results" in result.output
+    assert "Cannot integrate without any" in result.output
+
+
+def test_cli_integrate_requires_one_destination(tmpdir):
+    """Confirm that integrate needs either a directory or a database for the results, but not both."""
+    result = runner.invoke(main.cli, ["integrate", "testing", str(tmpdir)])
+    assert result.exit_code == 1
+    assert "--save-directory" in result.output
+
+
+def test_cli_cache_stats_and_clear(cwd, tmpdir):
+    """Confirm that analyzing with the cache records statistics that can be displayed and cleared."""
+    cache_directory = Path(tmpdir) / "cache"
+    # copy the configuration so that the cache of matches, which is
+    # stored next to the configuration, is inside of the temporary directory
+    configuration_directory = Path(tmpdir) / ".chasten"
+    shutil.copytree(Path(cwd) / ".chasten", configuration_directory)
+    result = runner.invoke(
+        main.cli,
+        [
+            "analyze",
+            "testing",
+            "--search-path",
+            Path(cwd) / "chasten" / "checks.py",
+            "--config",
+            configuration_directory,
+            "--cache",
+            "--cache-directory",
+            cache_directory,
+        ],
+    )
+    # note that the exit code depends on whether or not the checks pass
+    assert "checks passed" in result.output
+    cache_arguments = [
+        "--cache-directory",
+        cache_directory,
+        "--config",
+        configuration_directory,
+    ]
+    result = runner.invoke(main.cli, ["cache", "stats", *cache_arguments])
+    assert result.exit_code == 0
+    assert "Entries: 1 " in result.output
+    assert "Misses: 1\n" in result.output
+    assert (Path(tmpdir) / ".chasten_cache" / "matches.db").exists()
+    result = runner.invoke(main.cli, ["cache", "clear", *cache_arguments])
+    assert result.exit_code == 0
+    assert "Cleared the cache of trees" in result.output
+    assert "Cleared the cache of matches" in result.output
+
+
+def test_cli_analyze_changed_since_matches_full_analysis(cwd, tmpdir):
+    """Confirm that only analyzing the files changed since a git ref reports the same totals."""
+    repository = Path(tmpdir) / "repository"
+    shutil.copytree(Path(cwd) / "chasten", repository / "chasten")
+    configuration_directory = Path(tmpdir) / ".chasten"
+    shutil.copytree(Path(cwd) / ".chasten", configuration_directory)
+    for arguments in (
+        ["init", "--quiet"],
+        ["add", "."],
+        ["commit", "--quiet", "-m", "Add the source code"],
+    ):
+        subprocess.run(
+            [
+                "git",
+                "-c",
+                "user.name=chasten",
+                "-c",
+                "user.email=chasten@example.com",
+                "-C",
+                str(repository),
+                *arguments,
+            ],
+            check=True,
+            capture_output=True,
+        )
+    # change one of the committed files after the commit
+    with open(repository / "chasten" / "util.py", "a") as util_file:
+        util_file.write("\n\ndef added_function():\n    pass\n")
+    arguments = [
+        "analyze",
+        "testing",
+        "--search-path",
+        repository,
+        "--config",
+        configuration_directory,
+    ]
+    full_result = runner.invoke(main.cli, arguments)
+    for _ in range(2):
+        changed_result = runner.invoke(
+            main.cli, [*arguments, "--changed-since", "HEAD"]
+        )
+        assert changed_result.exit_code == full_result.exit_code
+        assert changed_result.output.split("Elapsed Time")[0] == (
+            full_result.output.split("Elapsed Time")[0]
+        )
+    result = runner.invoke(main.cli, [*arguments, "--changed-since", "no-such-ref"])
+    assert result.exit_code == 1
+
+
+@pytest.mark.parametrize("verbose", [False, True])
+def test_cli_analyze_with_index_matches_full_analysis(cwd, tmpdir, verbose):
+    """Confirm that analyzing with the index of the search path reports the same results."""
+    index_directory = Path(tmpdir) / "index"
+    arguments = [
+        "analyze",
+        "testing",
+        "--search-path",
+        Path(cwd) / "chasten",
+        "--config",
+        Path(cwd) / ".chasten",
+    ]
+    if verbose:
+        arguments.append("--verbose")
+    full_result = runner.invoke(main.cli, arguments)
+    result = runner.invoke(
+        main.cli,
+        [
+            "index",
+            "build",
+            "--search-path",
+            Path(cwd) / "chasten",
+            "--index-directory",
+            index_directory,
+        ],
+    )
+    assert result.exit_code == 0
+    assert "Added:" in result.output
+    for _ in range(2):
+        indexed_result = runner.invoke(
+            main.cli, [*arguments, "--index", "--index-directory", index_directory]
+        )
+        assert indexed_result.exit_code == full_result.exit_code
+        assert indexed_result.output.split("Elapsed Time")[0] == (
+            full_result.output.split("Elapsed Time")[0]
+        )
+    result = runner.invoke(
+        main.cli,
+        [
+            "index",
+            "stats",
+            "--search-path",
+            Path(cwd) / "chasten",
+            "--index-directory",
+            index_directory,
+        ],
+    )
+    assert result.exit_code == 0
+    assert "Files:" in result.output
+
+
+def test_cli_analyze_save_db_with_index_stores_all_matches(cwd, tmpdir):
+    """Confirm that the database saved when analyzing with the index has the same matches as without it."""
+    index_directory = Path(tmpdir) / "index"
+    arguments = [
+        "analyze",
+        "testing",
+        "--search-path",
+        Path(cwd) / "chasten",
+        "--config",
+        Path(cwd) / ".chasten",
+    ]
+    full_database_path = Path(tmpdir) / "full.db"
+    indexed_database_path = Path(tmpdir) / "indexed.db"
+    runner.invoke(main.cli, [*arguments, "--save-db", str(full_database_path)])
+    runner.invoke(
+        main.cli,
+        [
+            *arguments,
+            "--index",
+            "--index-directory",
+            index_directory,
+            "--save-db",
+            str(indexed_database_path),
+        ],
+    )
+    # the checks that only look for one type of node still have their matches
+    # saved even though the index could have counted them without searching
+    rows = []
+    for database_path in (full_database_path, indexed_database_path):
+        connection = sqlite3.connect(database_path)
+        rows.append(
+            connection.execute(
+                "SELECT sources.filename, sources.check_id, sources.check_name, "
+                "sources_check_matches.lineno, sources_check_matches.coloffset, "
+                "sources_check_matches.linematch FROM sources_check_matches "
+                "JOIN sources ON sources._link = sources_check_matches._link_sources "
+                "ORDER BY 1, 2, 3, 4, 5"
+            ).fetchall()
+        )
+        connection.close()
+    assert len(rows[0]) > 0
+    assert rows[0] == rows[1]
+
+
+def test_cli_analyze_invalid_pattern_fails_before_analysis(cwd, tmpdir):
+    """Confirm that a check with a pattern that is not valid XPath stops the analysis."""
+    configuration_directory = Path(tmpdir) / ".chasten"
+    configuration_directory.mkdir()
+    (configuration_directory / "config.yml").write_text(
+        "chasten:\n  checks-file:\n    - checks.yml\n"
+    )
+    (configuration_directory / "checks.yml").write_text(
+        "checks:\n"
+        '  - name: "broken"\n'
+        '    code: "BRK"\n'
+        '    id: "B001"\n'
+        "    pattern: './/FunctionDef[@name ='\n"
+    )
+    result = runner.invoke(
+        main.cli,
+        [
+            "analyze",
+            "testing",
+            "--search-path",
+            Path(cwd) / "chasten",
+            "--config",
+            configuration_directory,
+        ],
+    )
+    assert result.exit_code == 1
+    assert "Invalid XPath pattern for check 'B001'" in result.output
+    assert "Analyzing Python source code" not in result.output
+
+
+@pytest.mark.parametrize("fail_fast_option", ["--fail-fast", "--exit-first"])
+def test_cli_analyze_fail_fast_stops_at_maximum(cwd, tmpdir, fail_fast_option):
+    """Confirm that a check stops at one more match than its maximum when failing fast."""
+    configuration_directory = Path(tmpdir) / ".chasten"
+    configuration_directory.mkdir()
+    (configuration_directory / "config.yml").write_text(
+        "chasten:\n  checks-file:\n    - checks.yml\n"
+    )
+    (configuration_directory / "checks.yml").write_text(
+        "checks:\n"
+        '  - name: "few-functions"\n'
+        '    code: "FF"\n'
+        '    id: "F001"\n'
+        "    pattern: './/FunctionDef'\n"
+        "    count:\n"
+        "      min: null\n"
+        "      max: 2\n"
+        '  - name: "class-definition"\n'
+        '    code: "CDF"\n'
+        '    id: "C001"\n'
+        "    pattern: './/ClassDef'\n"
+        "    count:\n"
+        "      min: 1\n"
+        "      max: null\n"
+    )
+    result = runner.invoke(
+        main.cli,
+        [
+            "analyze",
+            "testing",
+            "--search-path",
+            Path(cwd) / "chasten",
+            "--config",
+            configuration_directory,
+            fail_fast_option,
+        ],
+    )
+    assert result.exit_code == 1
+    assert "= ≥3 total matches" in result.output
+    # only the check that failed is reported when exiting at the first failure
+    assert ("id: 'C001'" in result.output) == (fail_fast_option == "--fail-fast")
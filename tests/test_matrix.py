@@ -0,0 +1,56 @@
+"""Pytest test suite for the matrix module."""
+
+import numpy as np
+
+from chasten import matrix
+
+
+def create_count_matrix() -> matrix.CountMatrix:
+    """Create a matrix of counts for three files in two directories and two checks."""
+    count_builder = matrix.CountMatrixBuilder(["C001", "F001"])
+    first_id = count_builder.add_file("source/first.py")
+    second_id = count_builder.add_file("source/second.py")
+    third_id = count_builder.add_file("tests/test_first.py")
+    count_builder.add(first_id, 1, 3)
+    count_builder.add(third_id, 0, 2)
+    count_builder.add(third_id, 1, 1)
+    assert count_builder.add_file("source/second.py") == second_id
+    assert count_builder.match_counts == [2, 4]
+    return count_builder.build()
+
+
+def test_build_creates_dense_matrix_of_counts():
+    """Confirm that the matrix has a row for every file, even one without matches."""
+    count_matrix = create_count_matrix()
+    assert count_matrix.counts.dtype == np.int32
+    assert count_matrix.counts.tolist() == [[0, 3], [0, 0], [2, 1]]
+    assert count_matrix.totals().tolist() == [2, 4]
+    assert count_matrix.matching_files(0).tolist() == [2]
+    assert count_matrix.matching_files(1).tolist() == [0, 2]
+
+
+def test_build_without_matches():
+    """Confirm that a search without any files or matches has an empty matrix."""
+    count_matrix = matrix.CountMatrixBuilder(["C001"]).build()
+    assert count_matrix.counts.shape == (0, 1)
+    assert count_matrix.totals().tolist() == [0]
+
+
+def test_rollup_directories_counts_the_files_in_each_directory():
+    """Confirm that the counts of the files in the same directory are added together."""
+    (directories, directory_counts) = create_count_matrix().rollup_directories()
+    assert directories == ["source", "tests"]
+    assert directory_counts.tolist() == [[0, 3], [2, 1]]
+
+
+def test_write_and_read_count_matrix(tmp_path):
+    """Confirm that a matrix of counts is the same after writing and reading it."""
+    count_matrix = create_count_matrix()
+    matrix_path = tmp_path / "counts.npz"
+    matrix.write_count_matrix(count_matrix, matrix_path)
+    read_matrix = matrix.read_count_matrix(matrix_path)
+    assert read_matrix.files == count_matrix.files
+    assert read_matrix.checks == count_matrix.checks
+    assert np.array_equal(read_matrix.counts, count_matrix.counts)
+    with np.load(matrix_path) as archive:
+        assert archive["directories"].tolist() == ["source", "tests"]
@@ -0,0 +1,69 @@
+"""Pytest test suite for the normalize module."""
+
+from pathlib import Path
+
+from pyastgrep import search as pyastgrepsearch
+
+from chasten import debug, filesystem, normalize, process, results, store
+
+PYTHON_SOURCE = "\n".join(f"value_{lineno} = {lineno}" for lineno in range(1, 31))
+
+
+def test_find_snippet_regions_combines_neighbouring_matches():
+    """Confirm that the lines around matches that overlap, or are next to each other, are one region."""
+    assert normalize.find_snippet_regions([], 30) == []
+    assert normalize.find_snippet_regions([3, 1, 3], 30) == [(0, 8)]
+    assert normalize.find_snippet_regions([3, 13, 26], 30) == [(0, 18), (21, 30)]
+    assert normalize.find_snippet_regions([3, 20], 30) == [(0, 8), (15, 25)]
+
+
+def test_normalized_results_expand_into_saved_results(tmp_path, create_check_template):
+    """Confirm that the normalized results expand into the same sources as the saved results."""
+    file_names = []
+    for file_name in ("first.py", "second.py"):
+        (tmp_path / file_name).write_text(PYTHON_SOURCE)
+        file_names.append(str(tmp_path / file_name))
+    configuration = results.Configuration(
+        chastenversion="0.0.0",
+        debuglevel=debug.DebugLevel.ERROR,
+        debugdestination=debug.DebugDestination.CONSOLE,
+        projectname="testing",
+        configdirectory=Path(".chasten"),
+        searchpath=tmp_path,
+    )
+    check_templates = [
+        create_check_template(check_id, ".//Assign")
+        for check_id in ("C001", "C002", "C003")
+    ]
+    match_store = store.MatchStore()
+    match_store.add(1, 0, [pyastgrepsearch.Position(3, 0)])
+    match_store.add(0, 2, [pyastgrepsearch.Position(1, 0)])
+    match_store.add(0, 0, [pyastgrepsearch.Position(4, 0)])
+    match_store.add(0, 1, [pyastgrepsearch.Position(30, 0)])
+    match_store.add(0, 0, [pyastgrepsearch.Position(20, 0)])
+    # the second check is not reported and so it does not have any matches
+    check_statuses = {0: True, 2: False}
+    normalized_results = normalize.create_normalized_results(
+        configuration, match_store, file_names, check_templates, check_statuses
+    )
+    assert [check.id for check in normalized_results.checks] == ["C001", "C003"]
+    assert normalized_results.files == file_names
+    assert [
+        (snippet.file, snippet.lineno) for snippet in normalized_results.snippets
+    ] == [(0, 1), (0, 16), (1, 1)]
+    assert normalized_results.matches == [
+        (0, 0, 0, 4, 0),
+        (0, 0, 1, 20, 0),
+        (0, 1, 2, 3, 0),
+        (1, 0, 0, 1, 0),
+    ]
+    # the sources of the results that are not normalized
+    sources = match_store.create_sources(file_names, check_templates, check_statuses)
+    process.fill_match_snippets(sources)
+    saved_results = results.Chasten(configuration=configuration, sources=sources)
+    # write and then read the normalized results like integrate does
+    results_file_name = filesystem.write_normalized_results(
+        tmp_path, "testing", normalized_results
+    )
+    (expanded_results,) = filesystem.get_json_results([tmp_path / results_file_name])
+    assert expanded_results == saved_results.model_dump(mode="json")
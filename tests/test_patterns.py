@@ -0,0 +1,85 @@
+"""Pytest test suite for the patterns module."""
+
+from pathlib import Path
+
+import pytest
+from lxml import etree
+from pyastgrep import search as pyastgrepsearch
+
+from chasten import engine, patterns
+
+PYTHON_SOURCE = """
+def first(value):
+    if value:
+        return value
+    return None
+
+
+def test_second():
+    assert first(1) == 1
+"""
+
+PATTERNS = [
+    ".//FunctionDef",
+    './/FunctionDef[starts-with(@name, "test_")]/body/Assert',
+    ".//FunctionDef/body/*",
+    "count(.//If)",
+]
+
+
+@pytest.fixture
+def xml_root():
+    """Define a test fixture for the XML tree of Python source code."""
+    (xml_root, _) = engine.parse_python_source(
+        Path("example.py"), PYTHON_SOURCE.encode()
+    )
+    return xml_root
+
+
+def test_compile_pattern_compiles_each_pattern_once():
+    """Confirm that compiling the same pattern again reuses the compiled pattern."""
+    for xpath2 in (True, False):
+        compiled_pattern = patterns.compile_pattern(".//ClassDef", xpath2)
+        assert patterns.compile_pattern(".//ClassDef", xpath2) is compiled_pattern
+    assert patterns.compile_pattern(".//ClassDef", True) is not (
+        patterns.compile_pattern(".//ClassDef", False)
+    )
+
+
+@pytest.mark.parametrize("xpath2", [True, False])
+def test_evaluate_pattern_matches_pyastgrep_query(xml_root, xpath2):
+    """Confirm that evaluating a compiled pattern gives the same results as pyastgrep."""
+    query_function = pyastgrepsearch.get_query_func(xpath2=xpath2)
+    document = patterns.create_document(xml_root, xpath2)
+    for pattern in PATTERNS:
+        compiled_pattern = patterns.compile_pattern(pattern, xpath2)
+        assert patterns.evaluate_pattern(compiled_pattern, document) == (
+            query_function(xml_root, pattern)
+        )
+
+
+def test_evaluate_pattern_supports_regular_expressions(xml_root):
+    """Confirm that XPath 1.0 patterns can call pyastgrep's regular expression functions."""
+    compiled_pattern = patterns.compile_pattern(
+        './/FunctionDef[re:match("^test_", @name)]', False
+    )
+    matches = patterns.evaluate_pattern(compiled_pattern, xml_root)
+    assert [element.get("name") for element in matches] == ["test_second"]
+
+
+def test_invalid_pattern_raises_error_when_compiled():
+    """Confirm that a pattern that is not a valid XPath expression fails to compile."""
+    with pytest.raises(etree.XPathError):
+        patterns.compile_pattern(".//FunctionDef[", False)
+
+
+@pytest.mark.parametrize("xpath2", [True, False])
+def test_validate_patterns_reports_invalid_checks(xpath2):
+    """Confirm that only the checks with an invalid pattern are reported."""
+    check_list = [
+        {"id": "V001", "pattern": ".//ClassDef"},
+        {"id": "I001", "pattern": ".//FunctionDef[@name ="},
+        {"id": "V002", "pattern": "count(.//If)"},
+    ]
+    invalid_checks = patterns.validate_patterns(check_list, xpath2)
+    assert [check_id for check_id, _ in invalid_checks] == ["I001"]
@@ -0,0 +1,108 @@
+"""Pytest test suite for the prefilter module."""
+
+from pathlib import Path
+
+import pytest
+
+from chasten import engine, prefilter
+
+PYTHON_SOURCE = """
+import os
+
+class Example:
+    def first(self, value):
+        if value:
+            return os.sep
+        return eval(value)
+
+    def test_second(self):
+        assert self.first(1) == os.sep
+"""
+
+PATTERNS = [
+    ".//ClassDef",
+    ".//FunctionDef/body//If",
+    './/FunctionDef[contains(@name, "test_")]',
+    './/Call/func/Name[@id="eval"]',
+    './/Call/func/Name[@id="exec"]',
+    ".//AsyncFunctionDef",
+    ".//While | .//For",
+    ".//Return | .//Yield",
+    ".//Name[@id='os' or @id='sys']",
+    ".//Attribute[@attr != 'path']",
+    ".//FunctionDef[not(.//Lambda)]",
+    "count(.//Lambda)",
+]
+
+
+@pytest.mark.parametrize(
+    "pattern,literals",
+    [
+        (".//ClassDef", frozenset({b"class"})),
+        (".//Call", frozenset()),
+        (
+            './/FunctionDef[contains(@name, "test_")]',
+            frozenset({b"def", b"test_"}),
+        ),
+        ('.//Call/func/Name[@id="eval"]', frozenset({b"eval"})),
+        (".//FunctionDef/body//If", frozenset({b"def", b"if"})),
+        (".//While | .//For", frozenset()),
+        (".//Try/body/Return | .//Try/orelse/Return", frozenset({b"try", b"return"})),
+        (".//Name[@id='os' or @id='sys']", frozenset()),
+        (".//Name[@id='os' and .//Load]", frozenset({b"os"})),
+        (".//Attribute[@attr != 'path']", frozenset()),
+        (".//alias[@name='os.path']", frozenset()),
+        (".//FunctionDef[not(.//Lambda)]", frozenset({b"def"})),
+        ("count(.//Lambda)", None),
+    ],
+)
+def test_get_required_literals(pattern, literals):
+    """Confirm that a pattern only requires the literals that every one of its matches needs."""
+    assert prefilter.get_required_literals(pattern) == literals
+
+
+def test_find_possible_expressions_skips_patterns_without_their_literals():
+    """Confirm that only the patterns whose literals are in the file are possible."""
+    possible = prefilter.find_possible_expressions(PYTHON_SOURCE.encode(), PATTERNS)
+    assert [PATTERNS[index] for index in possible] == [
+        ".//ClassDef",
+        ".//FunctionDef/body//If",
+        './/FunctionDef[contains(@name, "test_")]',
+        './/Call/func/Name[@id="eval"]',
+        ".//While | .//For",
+        ".//Return | .//Yield",
+        ".//Name[@id='os' or @id='sys']",
+        ".//Attribute[@attr != 'path']",
+        ".//FunctionDef[not(.//Lambda)]",
+        "count(.//Lambda)",
+    ]
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        "def café(): pass\n".encode(),
+        b"# -*- coding: cp037 -*-\npass\n",
+    ],
+)
+def test_find_possible_expressions_does_not_filter_other_files(contents):
+    """Confirm that a file that is not ASCII, or not in an ASCII encoding, is not filtered."""
+    possible = prefilter.find_possible_expressions(contents, PATTERNS)
+    assert possible == list(range(len(PATTERNS)))
+
+
+@pytest.mark.parametrize("xpath2", [True, False])
+def test_evaluate_python_source_with_prefilter_matches_xpath(xpath2):
+    """Confirm that skipping the patterns that cannot match does not change any matches."""
+    contents = PYTHON_SOURCE.encode()
+    (xml_root, element_positions) = engine.parse_python_source(
+        Path("example.py"), contents
+    )
+    expected = [
+        engine.query_xml_tree(xml_root, element_positions, pattern, xpath2)
+        for pattern in PATTERNS
+    ]
+    assert (
+        engine.evaluate_python_source(Path("example.py"), contents, PATTERNS, xpath2)
+        == expected
+    )
@@ -7,7 +7,7 @@ from hypothesis import given
 from hypothesis import strategies as st
 from pyastgrep import search as pyastgrepsearch
 
-from chasten import process
+from chasten import process, results, snippets
 
 
 @given(
@@ -55,3 +55,28 @@ def test_filter_matches_only_int_matches(match_list, data_type):
         assert filtered == []
     else:
         assert filtered != []
+
+
+@pytest.mark.parametrize("verbose", [True, False])
+def test_create_result_source_records_matches(verbose):
+    """Confirm that the source for a check and a file records each of the matches."""
+    file_lines = ["class Example:", "    def first(self):", "        return 1"]
+    source_buffer = snippets.SourceBuffer("\n".join(file_lines))
+    positions = [pyastgrepsearch.Position(1, 0), pyastgrepsearch.Position(2, 4)]
+    check_template = results.Check(
+        id="C001", name="example", pattern=".//ClassDef", passed=True
+    )
+    result_source = process.create_result_source(
+        check_template, Path("example.py"), source_buffer, positions, verbose
+    )
+    assert result_source.filename == "example.py"
+    assert [match.lineno for match in result_source.check.matches] == [1, 2]
+    # the snippets are only sliced from the shared buffer when they are saved
+    assert result_source.check.matches[1].linematch == ""
+    assert result_source._sourcebuffer is source_buffer
+    process.fill_match_snippets([result_source])
+    assert result_source.check.matches[1].linematch == "def first(self):"
+    assert result_source.check.matches[0].linematch_context == "\n".join(file_lines)
+    # the template is not modified and the details are only kept for verbose output
+    assert check_template.matches == []
+    assert len(result_source.check._matches) == (len(positions) if verbose else 0)
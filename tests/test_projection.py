@@ -0,0 +1,84 @@
+"""Pytest test suite for the projection module."""
+
+from pathlib import Path
+
+import pytest
+
+from chasten import engine, projection
+
+PRUNED_PATTERNS = [
+    ".//FunctionDef/body//If[ancestor::If and not(parent::orelse)]",
+    "count(.//If)",
+    ".//Load/..",
+    ".//FunctionDef[1]",
+    ".//FunctionDef/body/If[last()]",
+    ".//FunctionDef[count(body/If) > 1]",
+    ".//FunctionDef[string-length(@name) > 5]",
+    ".//Global[names='first']",
+    ".//Global[contains(string(.), 'sec')]",
+    "//FunctionDef[@lineno > 10]",
+    ".//Constant[@type='str']",
+    ".//Name[@id='os']/..",
+    ".//If/following-sibling::If[1]",
+    "//If/body/If[position()=1]",
+    "//Constant[@value = '1']",
+    ".//Compare/ops/Gt",
+]
+
+
+@pytest.mark.parametrize(
+    "patterns,names",
+    [
+        ((".//ClassDef",), frozenset({"item", "ClassDef"})),
+        (
+            ('.//FunctionDef[not(contains(@name, "test_"))]', "count(.//If)"),
+            frozenset(
+                {
+                    "item",
+                    "FunctionDef",
+                    "not",
+                    "contains",
+                    "name",
+                    "test_",
+                    "count",
+                    "If",
+                }
+            ),
+        ),
+        ((".//ClassDef", ".//FunctionDef/body/*"), None),
+        ((".//If/following-sibling::node()",), None),
+        (("count(.//If) * 2",), None),
+    ],
+)
+def test_get_projection_collects_names_unless_there_is_a_wildcard(patterns, names):
+    """Confirm that the projection has every name in the patterns unless one has a wildcard."""
+    assert projection.get_projection(patterns) == names
+
+
+@pytest.mark.parametrize("xpath2", [True, False])
+@pytest.mark.parametrize("pattern", PRUNED_PATTERNS)
+def test_pruned_tree_matches_full_tree(pattern, xpath2, python_source):
+    """Confirm that a pattern finds the same positions, in the same order, in the pruned tree."""
+    contents = python_source.encode()
+    names = projection.get_projection((pattern,))
+    assert names is not None
+    (xml_root, element_positions) = engine.parse_python_source(
+        Path("example.py"), contents
+    )
+    (pruned_root, pruned_positions) = engine.parse_python_source(
+        Path("example.py"), contents, names
+    )
+    assert len(list(pruned_root.iter())) < len(list(xml_root.iter()))
+    assert engine.query_xml_tree(
+        pruned_root, pruned_positions, pattern, xpath2
+    ) == engine.query_xml_tree(xml_root, element_positions, pattern, xpath2)
+
+
+def test_pruned_tree_always_has_root():
+    """Confirm that the root of the tree is kept when the projection reaches no element."""
+    (pruned_root, pruned_positions) = engine.parse_python_source(
+        Path("example.py"), b"x = 1\n", frozenset({"ClassDef"})
+    )
+    assert pruned_root.tag == "Module"
+    assert len(pruned_root) == 0
+    assert pruned_positions == {}
@@ -0,0 +1,56 @@
+"""Pytest test suite for the snippets module."""
+
+import pytest
+from hypothesis import given, strategies
+
+from chasten import snippets
+
+LINE_BREAKS = ["\n", "\r\n", "\r", "\x0c", "\x85", "\u2028"]
+
+
+def test_source_buffer_slices_lines():
+    """Confirm that the lines of the buffer are slices of its text without their line breaks."""
+    source_buffer = snippets.SourceBuffer("import os\n\nclass Example:\n    pass\n")
+    assert len(source_buffer) == 4  # noqa: PLR2004
+    assert source_buffer.line(1) == "import os"
+    assert source_buffer.line(2) == ""
+    assert source_buffer.line(4) == "    pass"
+    assert source_buffer.newlines_only
+    assert source_buffer.join_lines(0, 3) == "import os\n\nclass Example:"
+    assert source_buffer.join_lines(2, 10) == "class Example:\n    pass"
+    assert source_buffer.join_lines(5, 10) == ""
+
+
+def test_source_buffer_without_lines():
+    """Confirm that the buffer of an empty file does not have any lines."""
+    source_buffer = snippets.SourceBuffer("")
+    assert len(source_buffer) == 0
+    assert source_buffer.lines() == []
+    assert source_buffer.join_lines(0, 5) == ""
+
+
+@pytest.mark.parametrize("line_break", LINE_BREAKS)
+def test_source_buffer_joins_other_line_breaks_with_newlines(line_break):
+    """Confirm that lines with any other line break are joined with newlines."""
+    source_buffer = snippets.SourceBuffer(line_break.join(["a = 1", "b = 2", "c"]))
+    assert source_buffer.newlines_only == (line_break == "\n")
+    assert source_buffer.join_lines(1, 3) == "b = 2\nc"
+
+
+@given(
+    lines=strategies.lists(strategies.text(alphabet="ab \t")),
+    line_breaks=strategies.lists(strategies.sampled_from(LINE_BREAKS)),
+    start=strategies.integers(-3, 8),
+    end=strategies.integers(-3, 8),
+)
+def test_fuzz_source_buffer_is_the_same_as_splitlines(lines, line_breaks, start, end):
+    """Use Hypothesis to confirm that the buffer has the same lines as splitlines."""
+    text = "".join(
+        line + line_breaks[index % len(line_breaks)] if line_breaks else line
+        for index, line in enumerate(lines)
+    )
+    source_buffer = snippets.SourceBuffer(text)
+    assert source_buffer.lines() == text.splitlines()
+    assert source_buffer.join_lines(start, end) == "\n".join(
+        text.splitlines()[start:end]
+    )
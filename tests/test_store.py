@@ -0,0 +1,88 @@
+"""Pytest test suite for the store module."""
+
+from array import array
+
+from pyastgrep import search as pyastgrepsearch
+
+from chasten import process, snippets, store
+
+
+def test_match_store_only_keeps_columns_of_integers():
+    """Confirm that the store only has integers and not the lines of the files."""
+    match_store = store.MatchStore()
+    match_store.add(0, 1, [pyastgrepsearch.Position(2, 0)])
+    match_store.add(
+        1, 0, [pyastgrepsearch.Position(3, 4), pyastgrepsearch.Position(5, 8)]
+    )
+    assert len(match_store) == 3  # noqa: PLR2004
+    assert vars(match_store) == {
+        "file_ids": array("i", [0, 1, 1]),
+        "check_ids": array("i", [1, 0, 0]),
+        "linenos": array("i", [2, 3, 5]),
+        "col_offsets": array("i", [0, 4, 8]),
+    }
+
+
+def test_create_sources_matches_result_sources(
+    tmp_path, small_python_source, create_check_template
+):
+    """Confirm that the sources are the same as those created while searching, ordered by check."""
+    file_names = []
+    for file_name in ("first.py", "second.py"):
+        (tmp_path / file_name).write_text(small_python_source)
+        file_names.append(str(tmp_path / file_name))
+    source_buffer = snippets.read_source_buffer(tmp_path / "first.py")
+    check_templates = [create_check_template("C001"), create_check_template("C002")]
+    first_positions = [pyastgrepsearch.Position(4, 8)]
+    second_positions = [pyastgrepsearch.Position(5, 12), pyastgrepsearch.Position(6, 8)]
+    match_store = store.MatchStore()
+    match_store.add(0, 1, first_positions)
+    match_store.add(1, 0, second_positions)
+    match_store.add(1, 1, first_positions)
+    for verbose in (False, True):
+        sources = match_store.create_sources(
+            file_names, check_templates, {0: False, 1: True}, verbose
+        )
+        expected = [
+            process.create_result_source(
+                check_templates[check_index],
+                tmp_path / file_name,
+                source_buffer,
+                positions,
+                verbose,
+            )
+            for check_index, file_name, positions in (
+                (0, "second.py", second_positions),
+                (1, "first.py", first_positions),
+                (1, "second.py", first_positions),
+            )
+        ]
+        for expected_source, passed in zip(expected, (False, True, True)):
+            expected_source.check.passed = passed  # type: ignore
+        process.fill_match_snippets(sources)
+        process.fill_match_snippets(expected)
+        assert [source.model_dump() for source in sources] == [
+            source.model_dump() for source in expected
+        ]
+        assert [len(source.check._matches) for source in sources] == (  # type: ignore
+            [2, 1, 1] if verbose else [0, 0, 0]
+        )
+        # the sources for the same file share one buffer of its source code
+        assert sources[0]._sourcebuffer is sources[2]._sourcebuffer
+
+
+def test_create_sources_only_for_reported_checks(
+    tmp_path, small_python_source, create_check_template
+):
+    """Confirm that a check without an outcome, because it was not reported, has no sources."""
+    (tmp_path / "first.py").write_text(small_python_source)
+    match_store = store.MatchStore()
+    match_store.add(0, 0, [pyastgrepsearch.Position(4, 8)])
+    match_store.add(0, 1, [pyastgrepsearch.Position(4, 8)])
+    sources = match_store.create_sources(
+        [str(tmp_path / "first.py")],
+        [create_check_template("C001"), create_check_template("C002")],
+        {1: False},
+    )
+    assert [source.check.id for source in sources] == ["C002"]  # type: ignore
+    assert store.MatchStore().create_sources([], [], {}) == []
@@ -0,0 +1,112 @@
+"""Pytest test suite for the stream module."""
+
+from pathlib import Path
+from typing import List
+
+from pyastgrep import search as pyastgrepsearch
+
+from chasten import debug, process, results, store, stream
+
+
+def create_configuration(search_path: Path) -> results.Configuration:
+    """Create the configuration of an analysis of a search path."""
+    return results.Configuration(
+        chastenversion="0.0.0",
+        debuglevel=debug.DebugLevel.ERROR,
+        debugdestination=debug.DebugDestination.CONSOLE,
+        projectname="testing",
+        configdirectory=Path(".chasten"),
+        searchpath=search_path,
+    )
+
+
+def create_check_templates() -> List[results.Check]:
+    """Create the templates of two checks without any matches."""
+    return [
+        results.Check(id=check_id, name=check_id.lower(), pattern=".//If", passed=True)
+        for check_id in ("C001", "C002")
+    ]
+
+
+def write_results_stream(
+    tmp_path: Path, python_source: str, finish: bool = True
+) -> Path:
+    """Write the stream of the results of an analysis of two files."""
+    check_templates = create_check_templates()
+    results_stream = stream.open_results_stream(
+        tmp_path / "results.ndjson", create_configuration(tmp_path)
+    )
+    for file_name in ("first.py", "second.py"):
+        (tmp_path / file_name).write_text(python_source)
+        results_stream.write_file_matches(
+            tmp_path / file_name,
+            check_templates,
+            [[pyastgrepsearch.Position(5, 12)], [pyastgrepsearch.Position(4, 8)]],
+        )
+    if finish:
+        results_stream.write_outcomes({0: False, 1: True})
+    results_stream.close()
+    return results_stream.results_path
+
+
+def test_read_results_stream_matches_saved_results(tmp_path, small_python_source):
+    """Confirm that the records of a stream are combined into the same results as the saved JSON."""
+    results_path = write_results_stream(tmp_path, small_python_source)
+    streamed_results = stream.read_results_stream(
+        results_path.read_text("utf-8").splitlines()
+    )
+    # create the same results from the positions of the matches in the store
+    match_store = store.MatchStore()
+    for file_id in range(2):
+        match_store.add(file_id, 0, [pyastgrepsearch.Position(5, 12)])
+        match_store.add(file_id, 1, [pyastgrepsearch.Position(4, 8)])
+    saved_results = results.Chasten(
+        configuration=create_configuration(tmp_path),
+        sources=match_store.create_sources(
+            [str(tmp_path / "first.py"), str(tmp_path / "second.py")],
+            create_check_templates(),
+            {0: False, 1: True},
+        ),
+    )
+    process.fill_match_snippets(saved_results.sources)
+    assert (
+        streamed_results["sources"] == saved_results.model_dump(mode="json")["sources"]
+    )
+    assert [source["check"]["id"] for source in streamed_results["sources"]] == [
+        "C001",
+        "C001",
+        "C002",
+        "C002",
+    ]
+    assert streamed_results["sources"][0]["check"]["matches"][0]["linematch"] == (
+        "return value + 1"
+    )
+
+
+def test_read_results_stream_of_unfinished_analysis(tmp_path, small_python_source):
+    """Confirm that the records of an analysis that did not finish are still results."""
+    results_path = write_results_stream(tmp_path, small_python_source, finish=False)
+    # a crash while writing a record leaves only a part of its line
+    with results_path.open("a", encoding="utf-8") as results_file:
+        results_file.write('{"record": "source", "filename": ')
+    streamed_results = stream.read_results_stream(
+        results_path.read_text("utf-8").splitlines()
+    )
+    assert streamed_results["configuration"]["projectname"] == "testing"
+    assert len(streamed_results["sources"]) == 4  # noqa: PLR2004
+    # whether or not the checks passed is not known without the last record
+    assert {source["check"]["passed"] for source in streamed_results["sources"]} == {
+        None
+    }
+
+
+def test_write_file_matches_without_matches(tmp_path):
+    """Confirm that a file without any matches does not have any records."""
+    results_stream = stream.open_results_stream(
+        tmp_path / "results.ndjson", create_configuration(tmp_path)
+    )
+    results_stream.write_file_matches(
+        tmp_path / "missing.py", create_check_templates(), [[], []]
+    )
+    results_stream.close()
+    assert len(results_stream.results_path.read_text("utf-8").splitlines()) == 1
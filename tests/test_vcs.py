@@ -0,0 +1,59 @@
+"""Pytest test suite for the vcs module."""
+
+import subprocess
+
+import pytest
+
+from chasten import cache, vcs
+
+
+def run_git(directory, *arguments):
+    """Run a git command with a fixed identity in the directory."""
+    subprocess.run(
+        [
+            "git",
+            "-c",
+            "user.name=chasten",
+            "-c",
+            "user.email=chasten@example.com",
+            "-C",
+            str(directory),
+            *arguments,
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repository(tmp_path):
+    """Define a test fixture for a git repository with a committed Python file."""
+    (tmp_path / "package").mkdir()
+    (tmp_path / "package" / "first.py").write_text("def first():\n    pass\n")
+    (tmp_path / "package" / "second.py").write_text("def second():\n    pass\n")
+    run_git(tmp_path, "init", "--quiet")
+    run_git(tmp_path, "add", ".")
+    run_git(tmp_path, "commit", "--quiet", "-m", "Add the package")
+    return tmp_path.resolve()
+
+
+def test_unchanged_content_ids_are_the_content_ids_of_the_files(repository):
+    """Confirm that git's object id of an unchanged file is the identifier of its contents."""
+    content_ids = vcs.get_unchanged_content_ids(repository / "package", "HEAD")
+    assert sorted(path.name for path in content_ids) == ["first.py", "second.py"]
+    for path, content_id in content_ids.items():
+        assert content_id == cache.create_content_id(path.read_bytes())
+
+
+def test_changed_files_do_not_have_known_content_ids(repository):
+    """Confirm that modified and new files are not treated as unchanged files."""
+    (repository / "package" / "first.py").write_text("def changed():\n    pass\n")
+    (repository / "package" / "third.py").write_text("def third():\n    pass\n")
+    content_ids = vcs.get_unchanged_content_ids(repository, "HEAD")
+    assert list(content_ids) == [repository / "package" / "second.py"]
+
+
+def test_unknown_ref_raises_an_error(repository):
+    """Confirm that a ref that git cannot find causes an error."""
+    with pytest.raises(subprocess.CalledProcessError):
+        vcs.get_unchanged_content_ids(repository, "no-such-ref")